@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import threading
+import time
+from typing import Deque, Optional, Set, Tuple
+
+from .resumable_download import DownloadError, download_file
+from .stream_probe import shared_session
+
+AUDIO_CACHE_BUDGET = 1024 * 1024 * 1024
+# Recency updates from lookups are written at most this often; losing a few only reorders eviction.
+INDEX_SAVE_INTERVAL = 30.0
+CLOSE_WAIT = 5.0
+
+
+@dataclass
+class CachedTrack:
+    server_id: str
+    rating_key: str
+    part_key: str
+    size: int
+    filename: str
+    last_used: float = 0.0
+
+
+class AudioCache:
+    """Byte-budgeted LRU cache of streamed tracks, filled by one background worker."""
+
+    def __init__(self, root: Path, *, budget_bytes: int = AUDIO_CACHE_BUDGET) -> None:
+        self._root = root
+        self._index_path = root / "index.json"
+        self._budget = max(0, budget_bytes)
+        self._entries: "OrderedDict[Tuple[str, str], CachedTrack]" = OrderedDict()
+        self._pending: Deque[Tuple[CachedTrack, str]] = deque()
+        self._queued: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._closed = False
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._load()
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._budget
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self._budget = max(0, budget_bytes)
+            self._evict_locked()
+            self._save_locked()
+
+    def lookup(self, server_id: str, rating_key: str, part_key: str, size: Optional[int]) -> Optional[Path]:
+        """Return the cached file when it is for the same media part and has the expected size."""
+        key = (server_id, rating_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._closed:
+                return None
+            path = self._root / entry.filename
+            try:
+                on_disk = path.stat().st_size
+            except OSError:
+                on_disk = -1
+            if entry.part_key != part_key or (size and size != entry.size) or on_disk != entry.size:
+                # The library item was replaced or the file was damaged; refetch on next play.
+                del self._entries[key]
+                self._remove_file(path)
+                self._save_locked()
+                return None
+            entry.last_used = time.time()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= INDEX_SAVE_INTERVAL:
+                self._save_locked()
+            return path
+
+    def contains(self, server_id: str, rating_key: str) -> bool:
+        with self._lock:
+            return (server_id, rating_key) in self._entries
+
+    def fetch(self, server_id: str, rating_key: str, part_key: str, size: int, url: str) -> bool:
+        """Queue a background copy of the track; returns False when it is cached, queued or too large."""
+        key = (server_id, rating_key)
+        with self._lock:
+            if self._closed or size <= 0 or size > self._budget or key in self._queued:
+                return False
+            existing = self._entries.get(key)
+            if existing is not None and existing.part_key == part_key and existing.size == size:
+                return False
+            suffix = Path(part_key).suffix
+            filename = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{server_id}-{rating_key}") + (suffix or ".audio")
+            track = CachedTrack(server_id, rating_key, part_key, size, filename)
+            self._pending.append((track, url))
+            self._queued.add(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="PlexAudioCache", daemon=True)
+                self._worker.start()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                self._remove_file(self._root / entry.filename)
+            self._entries.clear()
+            self._save_locked()
+
+    def flush(self) -> None:
+        """Write recency changes that are still only held in memory."""
+        with self._lock:
+            if self._dirty and not self._closed:
+                self._save_locked()
+
+    def close(self, *, purge: bool = False) -> None:
+        """Stop the worker; purge also deletes every cached file and the index.
+
+        Blocks while the current download is cancelled, so call it off the UI thread.
+        """
+        with self._lock:
+            if not self._closed and self._dirty:
+                self._save_locked()
+            self._closed = True
+            self._pending.clear()
+            self._queued.clear()
+            worker = self._worker
+        self._cancel.set()
+        if worker is not None:
+            worker.join(timeout=CLOSE_WAIT)
+        if not purge:
+            return
+        with self._lock:
+            self._entries.clear()
+            shutil.rmtree(self._root, ignore_errors=True)
+        print("[AudioCache] Removed cached tracks.")
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending or self._closed:
+                    self._worker = None
+                    return
+                track, url = self._pending.popleft()
+            dest = self._root / track.filename
+            try:
+                download_file(url, dest, session=shared_session(), cancel=self._cancel)
+                stored = dest.stat().st_size == track.size
+            except (DownloadError, OSError) as exc:
+                print(f"[AudioCache] Unable to cache track {track.rating_key}: {exc}")
+                stored = False
+            with self._lock:
+                self._queued.discard((track.server_id, track.rating_key))
+                if not stored or self._closed:
+                    self._remove_file(dest)
+                    continue
+                track.last_used = time.time()
+                self._entries[(track.server_id, track.rating_key)] = track
+                self._entries.move_to_end((track.server_id, track.rating_key))
+                self._evict_locked()
+                self._save_locked()
+
+    def _evict_locked(self) -> None:
+        total = sum(entry.size for entry in self._entries.values())
+        while total > self._budget and self._entries:
+            _key, entry = self._entries.popitem(last=False)
+            total -= entry.size
+            self._remove_file(self._root / entry.filename)
+
+    @staticmethod
+    def _remove_file(path: Path) -> None:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as exc:
+            print(f"[AudioCache] Unable to remove {path.name}: {exc}")
+
+    def _load(self) -> None:
+        try:
+            records = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for record in records if isinstance(records, list) else []:
+            try:
+                entry = CachedTrack(**record)
+            except TypeError:
+                continue
+            self._entries[(entry.server_id, entry.rating_key)] = entry
+
+    def _save_locked(self) -> None:
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        temp_path = self._index_path.with_name(self._index_path.name + ".tmp")
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps([asdict(entry) for entry in self._entries.values()]), encoding="utf-8")
+            os.replace(temp_path, self._index_path)
+        except OSError as exc:
+            print(f"[AudioCache] Unable to save cache index: {exc}")
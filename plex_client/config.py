@@ -1,15 +1,24 @@
+import atexit
+from contextlib import contextmanager
+import copy
 import json
 import os
 import sys
+import threading
 import uuid
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .progress_journal import ProgressJournal
 
 
 class ConfigStore:
     """Handles reading and writing lightweight configuration for the client."""
 
     CONFIG_FILENAME = "config.json"
+    PROGRESS_JOURNAL_FILENAME = "pending_progress.journal"
+    # Changes are written this long after the last one, so bursts of settings cost one write.
+    SAVE_DELAY = 0.5
     LEGACY_DIR = Path.home() / "AppData" / "Roaming" / "PlexWxClient"
 
     def __init__(self) -> None:
@@ -17,7 +26,13 @@ class ConfigStore:
         self._config_path = self._config_dir / self.CONFIG_FILENAME
         self._data: Dict[str, Any] = {}
         self._loaded = False
+        self._progress_journal: Optional[ProgressJournal] = None
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._batch_depth = 0
+        self._save_timer: Optional[threading.Timer] = None
         self._migrate_legacy_config()
+        atexit.register(self.flush)
 
     def _resolve_config_dir(self) -> Path:
         candidates = list(self._iter_candidate_dirs())
@@ -70,22 +85,80 @@ class ConfigStore:
 
     @property
     def data(self) -> Dict[str, Any]:
-        if not self._loaded:
-            self._data = self._load_from_disk()
-            self._loaded = True
-        return self._data
+        with self._lock:
+            if not self._loaded:
+                self._data = self._load_from_disk()
+                self._loaded = True
+            return self._data
 
     def get(self, key: str, default: Any = None) -> Any:
         return self.data.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
-        self.data[key] = value
-        self._save_to_disk()
+        with self._lock:
+            self.data[key] = value
+            self._mark_dirty()
 
     def clear(self, key: str) -> None:
-        if key in self.data:
-            del self.data[key]
-            self._save_to_disk()
+        with self._lock:
+            if key in self.data:
+                del self.data[key]
+                self._mark_dirty()
+
+    @contextmanager
+    def batch(self) -> Iterator["ConfigStore"]:
+        """Group updates into one write; if the block raises, its changes are rolled back."""
+        with self._lock:
+            outermost = self._batch_depth == 0
+            snapshot = (copy.deepcopy(self.data), self._dirty) if outermost else None
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if snapshot is not None:
+                    self._data, self._dirty = snapshot
+                raise
+            finally:
+                self._batch_depth -= 1
+            if outermost and self._dirty:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes now; call before the process exits."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._dirty:
+                try:
+                    self._save_to_disk()
+                except OSError as exc:
+                    print(f"[Config] Unable to save configuration: {exc}")
+                else:
+                    self._dirty = False
+        self.sync_pending_progress()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self._batch_depth or self._save_timer is not None:
+            return
+        timer = threading.Timer(self.SAVE_DELAY, self._flush_from_timer)
+        timer.name = "PlexConfigSave"
+        timer.daemon = True
+        self._save_timer = timer
+        timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            if self._save_timer is not threading.current_thread():
+                return
+            self._save_timer = None
+        self.flush()
+
+    def cache_dir(self, name: str) -> Path:
+        path = self._config_dir / "cache" / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
 
     def _default_config(self) -> Dict[str, Any]:
         return {
@@ -95,8 +168,9 @@ class ConfigStore:
             "selected_server_name": None,
             "preferred_servers": [],
             "vlc_path": None,
-            "pending_progress": {},
             "auto_check_updates": True,
+            "audio_cache_enabled": False,
+            "audio_cache_budget_mb": 1024,
         }
 
     def _load_from_disk(self) -> Dict[str, Any]:
@@ -203,11 +277,30 @@ class ConfigStore:
         else:
             self.clear("vlc_path")
 
+    def _pending_journal(self) -> ProgressJournal:
+        journal = self._progress_journal
+        if journal is not None:
+            return journal
+        # Flush workers and the UI thread both get here; only one of them may open the file.
+        with self._lock:
+            if self._progress_journal is None:
+                journal = ProgressJournal(self._config_dir / self.PROGRESS_JOURNAL_FILENAME)
+                # Older versions kept pending progress inside config.json; move it over once.
+                legacy = self.data.get("pending_progress")
+                if isinstance(legacy, dict):
+                    if legacy and not journal.snapshot():
+                        journal.replace({str(k): v for k, v in legacy.items() if isinstance(v, dict)})
+                    self.clear("pending_progress")
+                self._progress_journal = journal
+            return self._progress_journal
+
     def get_pending_progress(self) -> Dict[str, Dict[str, int]]:
-        stored = self.get("pending_progress", {})
-        if isinstance(stored, dict):
-            return {str(k): dict(v) for k, v in stored.items() if isinstance(v, dict)}
-        return {}
+        return self._pending_journal().snapshot()
+
+    def sync_pending_progress(self) -> None:
+        """Make sure every journaled progress change is on disk."""
+        if self._progress_journal is not None:
+            self._progress_journal.sync()
 
     def get_auto_check_updates(self) -> bool:
         stored = self.get("auto_check_updates", True)
@@ -216,25 +309,35 @@ class ConfigStore:
     def set_auto_check_updates(self, enabled: bool) -> None:
         self.set("auto_check_updates", bool(enabled))
 
+    def get_audio_cache_enabled(self) -> bool:
+        return bool(self.get("audio_cache_enabled", False))
+
+    def set_audio_cache_enabled(self, enabled: bool) -> None:
+        self.set("audio_cache_enabled", bool(enabled))
+
+    def get_audio_cache_budget(self) -> int:
+        """Return the audio cache budget in bytes."""
+        try:
+            megabytes = int(self.get("audio_cache_budget_mb", 1024))
+        except (TypeError, ValueError):
+            megabytes = 1024
+        return max(0, megabytes) * 1024 * 1024
+
+    def get_audio_cache_budget_mb(self) -> int:
+        return self.get_audio_cache_budget() // (1024 * 1024)
+
+    def set_audio_cache_budget_mb(self, megabytes: int) -> None:
+        self.set("audio_cache_budget_mb", max(0, int(megabytes)))
+
     def get_pending_entry(self, rating_key: str) -> Dict[str, int]:
-        progress = self.get_pending_progress()
-        return progress.get(str(rating_key), {})
+        return self._pending_journal().get(rating_key)
 
     def upsert_pending_progress(self, rating_key: str, position: int, duration: int, state: str = "playing") -> None:
-        progress = self.get_pending_progress()
-        progress[str(rating_key)] = {
-            "position": int(max(0, position)),
-            "duration": int(max(0, duration)),
-            "state": state,
-        }
-        self.set("pending_progress", progress)
+        self._pending_journal().upsert(rating_key, position, duration, state)
 
     def remove_pending_progress(self, rating_key: str) -> None:
-        progress = self.get_pending_progress()
-        if str(rating_key) in progress:
-            del progress[str(rating_key)]
-            self.set("pending_progress", progress)
+        self._pending_journal().remove(rating_key)
 
     def clear_pending_progress(self) -> None:
-        self.set("pending_progress", {})
+        self._pending_journal().clear()
 
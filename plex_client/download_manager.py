@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+import json
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .resumable_download import DownloadCancelled, DownloadError, download_file
+from .stream_probe import shared_session
+
+DOWNLOAD_PER_SERVER = 2
+DOWNLOAD_MAX_TOTAL = 4
+PROGRESS_INTERVAL = 0.5
+
+QUEUED = "queued"
+WAITING = "waiting"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+UrlResolver = Callable[["DownloadJob"], Optional[str]]
+JobListener = Callable[["DownloadJob"], None]
+
+
+@dataclass
+class DownloadJob:
+    job_id: str
+    server_id: str
+    rating_key: str
+    title: str
+    part_key: str
+    filename: str
+    size: Optional[int] = None
+    status: str = QUEUED
+    received: int = 0
+    error: str = ""
+    added_at: float = 0.0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return min(1.0, self.received / self.size)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, object]) -> Optional["DownloadJob"]:
+        names = {item.name for item in fields(cls)}
+        try:
+            return cls(**{key: value for key, value in record.items() if key in names})  # type: ignore[arg-type]
+        except TypeError:
+            return None
+
+
+def safe_filename(name: str) -> str:
+    cleaned = re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", name).strip(" .")
+    return cleaned[:150] or "download"
+
+
+class BandwidthLimiter:
+    """Token bucket shared by every download worker; a rate of None or 0 means unlimited."""
+
+    def __init__(self, kbps: Optional[int] = None) -> None:
+        self._lock = threading.Lock()
+        self._rate = 0.0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(kbps)
+
+    @property
+    def kbps(self) -> Optional[int]:
+        return int(self._rate * 8 / 1000) or None
+
+    def set_rate(self, kbps: Optional[int]) -> None:
+        with self._lock:
+            self._rate = max(0, int(kbps or 0)) * 1000 / 8
+            self._tokens = min(self._tokens, self._rate)
+            self._updated = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        while True:
+            with self._lock:
+                if self._rate <= 0:
+                    return
+                now = time.monotonic()
+                # Allow at most one second of burst so an idle period does not flood the link.
+                self._tokens = min(self._rate, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                self._tokens -= size
+                if self._tokens >= 0:
+                    return
+                delay = -self._tokens / self._rate
+                size = 0
+            time.sleep(min(delay, 1.0))
+
+
+class DownloadManager:
+    """Persistent offline download queue with per-server concurrency and resumable transfers."""
+
+    def __init__(
+        self,
+        root: Path,
+        resolver: UrlResolver,
+        *,
+        per_server: int = DOWNLOAD_PER_SERVER,
+        max_total: int = DOWNLOAD_MAX_TOTAL,
+        rate_limit_kbps: Optional[int] = None,
+    ) -> None:
+        self._root = root
+        self._store_path = root / "jobs.json"
+        self._resolver = resolver
+        self._per_server = max(1, per_server)
+        self._max_total = max(1, max_total)
+        self.limiter = BandwidthLimiter(rate_limit_kbps)
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._listeners: List[JobListener] = []
+        self._lock = threading.RLock()
+        self._load()
+
+    def jobs(self) -> List[DownloadJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.added_at)
+
+    def job(self, job_id: str) -> Optional[DownloadJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def enqueue(
+        self,
+        server_id: str,
+        rating_key: str,
+        title: str,
+        part_key: str,
+        filename: str,
+        size: Optional[int] = None,
+    ) -> DownloadJob:
+        """Queue one media part, returning the existing job when it is already queued or done."""
+        job_id = f"{server_id}:{rating_key}"
+        with self._lock:
+            existing = self._jobs.get(job_id)
+            if existing is not None and existing.part_key == part_key and existing.status not in (FAILED, CANCELLED):
+                return existing
+            job = DownloadJob(
+                job_id=job_id,
+                server_id=server_id,
+                rating_key=rating_key,
+                title=title,
+                part_key=part_key,
+                filename=safe_filename(f"{rating_key}-{filename}"),
+                size=size,
+                added_at=time.time(),
+            )
+            self._jobs[job_id] = job
+            self._save()
+        self._notify(job)
+        self._schedule()
+        return job
+
+    def pause(self, job_id: str) -> None:
+        self._stop(job_id, PAUSED)
+
+    def cancel(self, job_id: str) -> None:
+        """Stop a job and discard its partial data; completed files are left in place."""
+        with self._lock:
+            running = job_id in self._cancel_events
+        job = self._stop(job_id, CANCELLED)
+        # A running worker discards its own partial once it has closed the file.
+        if job is not None and job.status == CANCELLED and not running:
+            self._discard_partial(job)
+
+    def resume(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (PAUSED, FAILED, CANCELLED, WAITING):
+                return
+            job.status = QUEUED
+            job.error = ""
+            self._save()
+        self._notify(job)
+        self._schedule()
+
+    def retry_waiting(self, server_id: Optional[str] = None) -> None:
+        """Requeue jobs that were parked because their server was not reachable."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == WAITING and (server_id is None or job.server_id == server_id):
+                    job.status = QUEUED
+            self._save()
+        self._schedule()
+
+    def remove(self, job_id: str, *, delete_file: bool = False) -> None:
+        self.cancel(job_id)
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            self._save()
+        if job is not None and delete_file:
+            self.destination(job).unlink(missing_ok=True)
+
+    def set_rate_limit(self, kbps: Optional[int]) -> None:
+        self.limiter.set_rate(kbps)
+
+    def add_listener(self, listener: JobListener) -> None:
+        """Register a callback for job status and progress changes; it runs on worker threads."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: JobListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def destination(self, job: DownloadJob) -> Path:
+        return self._root / safe_filename(job.server_id) / job.filename
+
+    def local_path(self, server_id: str, rating_key: str, part_key: str = "") -> Optional[Path]:
+        """Return the completed local file for the item, if it is still on disk and intact."""
+        with self._lock:
+            job = self._jobs.get(f"{server_id}:{rating_key}")
+        if job is None or job.status != DONE:
+            return None
+        if part_key and job.part_key and part_key != job.part_key:
+            return None
+        path = self.destination(job)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        if job.size and size != job.size:
+            return None
+        return path
+
+    def _schedule(self) -> None:
+        started: List[DownloadJob] = []
+        with self._lock:
+            running = [job for job in self._jobs.values() if job.status == RUNNING]
+            per_server: Dict[str, int] = {}
+            for job in running:
+                per_server[job.server_id] = per_server.get(job.server_id, 0) + 1
+            total = len(running)
+            for job in sorted(self._jobs.values(), key=lambda item: item.added_at):
+                if total >= self._max_total:
+                    break
+                if job.status != QUEUED or per_server.get(job.server_id, 0) >= self._per_server:
+                    continue
+                if job.job_id in self._cancel_events:
+                    # The previous run is still closing its partial file; it reschedules when done.
+                    continue
+                job.status = RUNNING
+                job.error = ""
+                self._cancel_events[job.job_id] = threading.Event()
+                per_server[job.server_id] = per_server.get(job.server_id, 0) + 1
+                total += 1
+                started.append(job)
+            if started:
+                self._save()
+        for job in started:
+            self._notify(job)
+            threading.Thread(target=self._run, args=(job,), name="PlexDownload", daemon=True).start()
+
+    def _run(self, job: DownloadJob) -> None:
+        with self._lock:
+            cancel = self._cancel_events[job.job_id]
+        last_report = 0.0
+
+        def progress(received: int, total: Optional[int]) -> None:
+            nonlocal last_report
+            job.received = received
+            if total:
+                job.size = total
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                self._notify(job)
+
+        try:
+            url = self._resolver(job)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Downloads] Unable to resolve '{job.title}': {exc}")
+            url = None
+        if not url:
+            self._finish(job, cancel, WAITING, "Server is not connected.")
+            return
+        try:
+            download_file(
+                url,
+                self.destination(job),
+                session=shared_session(),
+                progress=progress,
+                cancel=cancel,
+                rate_limit=self.limiter.consume,
+            )
+        except DownloadCancelled:
+            with self._lock:
+                status = job.status if job.status in (PAUSED, CANCELLED) else PAUSED
+            if status == CANCELLED:
+                self._discard_partial(job)
+            self._finish(job, cancel, status)
+            return
+        except (DownloadError, OSError) as exc:
+            print(f"[Downloads] '{job.title}' failed: {exc}")
+            self._finish(job, cancel, FAILED, str(exc))
+            return
+        job.received = job.size or job.received
+        print(f"[Downloads] Finished '{job.title}'.")
+        self._finish(job, cancel, DONE)
+
+    def _stop(self, job_id: str, status: str) -> Optional[DownloadJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == DONE:
+                return job
+            job.status = status
+            event = self._cancel_events.get(job_id)
+            self._save()
+        if event is not None:
+            event.set()
+        self._notify(job)
+        return job
+
+    def _discard_partial(self, job: DownloadJob) -> None:
+        dest = self.destination(job)
+        for path in (dest.with_name(dest.name + ".part"), dest.with_name(dest.name + ".part.json")):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as exc:
+                print(f"[Downloads] Unable to remove partial download {path.name}: {exc}")
+
+    def _finish(self, job: DownloadJob, cancel: threading.Event, status: str, error: str = "") -> None:
+        with self._lock:
+            if self._cancel_events.get(job.job_id) is not cancel:
+                # A newer run of this job owns it now.
+                return
+            del self._cancel_events[job.job_id]
+            # pause()/cancel() already recorded the user's choice; keep it.
+            if job.status == RUNNING or status in (DONE, FAILED):
+                job.status = status
+            job.error = error
+            self._save()
+        self._notify(job)
+        self._schedule()
+
+    def _notify(self, job: DownloadJob) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Downloads] Listener failed: {exc}")
+
+    def _load(self) -> None:
+        try:
+            records = json.loads(self._store_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for record in records if isinstance(records, list) else []:
+            job = DownloadJob.from_record(record) if isinstance(record, dict) else None
+            if job is None:
+                continue
+            if job.status == RUNNING:
+                # The app closed mid-transfer; the partial file lets the next run resume it.
+                job.status = QUEUED
+            self._jobs[job.job_id] = job
+
+    def _save(self) -> None:
+        records = [asdict(job) for job in self._jobs.values()]
+        temp_path = self._store_path.with_name(self._store_path.name + ".tmp")
+        try:
+            self._root.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(records), encoding="utf-8")
+            os.replace(temp_path, self._store_path)
+        except OSError as exc:
+            print(f"[Downloads] Unable to save download queue: {exc}")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from plexapi.base import PlexObject
+
+
+@dataclass(frozen=True)
+class EpisodeRecord:
+    season: int
+    episode: int
+    rating_key: str
+    season_key: str
+    view_offset: int
+    view_count: int
+
+    @property
+    def watched(self) -> bool:
+        return self.view_count > 0
+
+
+class EpisodeIndex:
+    """Every episode of one show in play order, built from a single allLeaves listing."""
+
+    def __init__(self, show_key: str, episodes: Iterable[PlexObject]) -> None:
+        self.show_key = show_key
+        self.built_at = time.monotonic()
+        self._items: Dict[str, PlexObject] = {}
+        records: List[EpisodeRecord] = []
+        for episode in episodes:
+            rating_key = getattr(episode, "ratingKey", None)
+            if not rating_key:
+                continue
+            rating_key = str(rating_key)
+            records.append(
+                EpisodeRecord(
+                    season=_as_int(getattr(episode, "parentIndex", 0)),
+                    episode=_as_int(getattr(episode, "index", 0)),
+                    rating_key=rating_key,
+                    season_key=str(getattr(episode, "parentRatingKey", "") or ""),
+                    view_offset=_as_int(getattr(episode, "viewOffset", 0)),
+                    view_count=_as_int(getattr(episode, "viewCount", 0)),
+                )
+            )
+            self._items[rating_key] = episode
+        records.sort(key=lambda record: (record.season, record.episode, record.rating_key))
+        self.records: Sequence[EpisodeRecord] = tuple(records)
+        self._positions = {record.rating_key: position for position, record in enumerate(self.records)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, rating_key: object) -> bool:
+        return str(rating_key) in self._positions
+
+    def keys(self) -> Iterable[str]:
+        """Rating keys of every episode and season in the show."""
+        for record in self.records:
+            yield record.rating_key
+            if record.season_key:
+                yield record.season_key
+
+    def item(self, rating_key: str) -> Optional[PlexObject]:
+        return self._items.get(str(rating_key))
+
+    def next_after(self, rating_key: str) -> Optional[EpisodeRecord]:
+        """The episode to play after rating_key, skipping ones already watched unless all of them are."""
+        position = self._positions.get(str(rating_key))
+        if position is None or position + 1 >= len(self.records):
+            return None
+        for record in self.records[position + 1 :]:
+            if not record.watched:
+                return record
+        return self.records[position + 1]
+
+
+def _as_int(value: object) -> int:
+    try:
+        return int(value or 0)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,617 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+import json
+import mmap
+import os
+from pathlib import Path
+import random
+import shutil
+import threading
+import time
+import unicodedata
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from plexapi.base import PlexObject
+
+
+INDEX_FORMAT_VERSION = 3
+INDEX_MANIFEST = "index.json"
+# Alpha buckets in display order; bucket_letter() only ever returns one of these.
+BUCKET_LETTERS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_BUCKET_RANKS: Dict[int, int] = {ord(letter): rank for rank, letter in enumerate(BUCKET_LETTERS)}
+
+_TRACK_SCHEMA: Dict[str, str] = {
+    "rating_key": "q",
+    "titles": "B",
+    "title_offsets": "q",
+    "letter": "B",
+    "title_order": "i",
+    "artist_id": "q",
+    "album_id": "q",
+    "year": "h",
+    "duration": "q",
+    "view_count": "i",
+    "last_viewed_at": "d",
+    "added_at": "d",
+    "genre_ids": "i",
+    "genre_offsets": "q",
+    "letter_rows": "i",
+    "letter_keys": "q",
+    "letter_offsets": "q",
+    "key_rows": "i",
+    "sorted_keys": "q",
+    "artist_rows": "i",
+    "artist_keys": "q",
+}
+
+_ALBUM_SCHEMA: Dict[str, str] = {
+    "rating_key": "q",
+    "titles": "B",
+    "title_offsets": "q",
+    "letter": "B",
+    "title_order": "i",
+    "artist_id": "q",
+    "year": "h",
+    "added_at": "d",
+    "genre_ids": "i",
+    "genre_offsets": "q",
+    "letter_rows": "i",
+    "letter_keys": "q",
+    "letter_offsets": "q",
+    "key_rows": "i",
+    "sorted_keys": "q",
+}
+# Columns computed by finalize() rather than appended per row.
+_DERIVED_COLUMNS = {
+    "title_order",
+    "letter_rows",
+    "letter_keys",
+    "letter_offsets",
+    "key_rows",
+    "sorted_keys",
+    "artist_rows",
+    "artist_keys",
+}
+# Per-row columns appended by _ColumnTable.append() itself.
+_ROW_COLUMNS = {"rating_key", "titles", "title_offsets", "letter", "genre_ids", "genre_offsets"}
+# Artists whose genre sets artist_similarity() keeps; a radio session scores a few hundred.
+_ARTIST_GENRE_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class LocalTrack:
+    rating_key: str
+    title: str
+    artist_key: str
+    album_key: str
+    year: Optional[int] = None
+    genres: Tuple[str, ...] = ()
+    view_count: int = 0
+    last_viewed_at: float = 0.0
+    added_at: float = 0.0
+    duration: int = 0
+
+    @property
+    def decade(self) -> Optional[int]:
+        if not self.year:
+            return None
+        return (self.year // 10) * 10
+
+
+def _timestamp(value: Any) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value.timestamp())
+    except Exception:
+        try:
+            return float(value)
+        except Exception:
+            return 0.0
+
+
+def _int_or_zero(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _tag_names(values: Any) -> Tuple[str, ...]:
+    names: List[str] = []
+    try:
+        iterator = iter(values or [])
+    except TypeError:
+        return ()
+    for tag in iterator:
+        name = getattr(tag, "tag", None) or (tag if isinstance(tag, str) else None)
+        if name:
+            names.append(str(name).strip().lower())
+    return tuple(dict.fromkeys(names))
+
+
+def bucket_letter(title: str) -> str:
+    """Return the alpha bucket ('A'-'Z' or '#') a sort title belongs to."""
+    for char in unicodedata.normalize("NFKD", title or ""):
+        if unicodedata.combining(char):
+            continue
+        upper = char.upper()
+        return upper if "A" <= upper <= "Z" else "#"
+    return "#"
+
+
+def _release_maps(views: List[memoryview], maps: List[mmap.mmap]) -> None:
+    for view in views:
+        view.release()
+    for mapped in maps:
+        try:
+            mapped.close()
+        except BufferError:
+            # A caller still holds a slice of the map; it is closed when that is collected.
+            pass
+    views.clear()
+    maps.clear()
+
+
+class _ColumnTable:
+    """Fixed-schema set of parallel typed columns, backed by arrays or read-only mmaps."""
+
+    def __init__(self, schema: Dict[str, str]) -> None:
+        self.schema = schema
+        self.columns: Dict[str, Any] = {name: array(code) for name, code in schema.items()}
+        self.columns["title_offsets"].append(0)
+        self.columns["genre_offsets"].append(0)
+        self._views: List[memoryview] = []
+        self._maps: List[mmap.mmap] = []
+        # Maps are released on close() or, for an index still shared with a running radio,
+        # once the last reference to the table goes away.
+        self._finalizer = weakref.finalize(self, _release_maps, self._views, self._maps)
+
+    def __len__(self) -> int:
+        return len(self.columns["rating_key"])
+
+    def append(self, rating_key: int, title: str, genre_ids: Iterable[int], **values: Any) -> None:
+        columns = self.columns
+        encoded = (title or "").encode("utf-8")
+        columns["rating_key"].append(rating_key)
+        columns["titles"].frombytes(encoded)
+        columns["title_offsets"].append(len(columns["titles"]))
+        columns["letter"].append(ord(bucket_letter(title)))
+        columns["genre_ids"].extend(genre_ids)
+        columns["genre_offsets"].append(len(columns["genre_ids"]))
+        for name, value in values.items():
+            columns[name].append(value)
+
+    def append_row(self, source: "_ColumnTable", row: int) -> None:
+        """Copy one row of another table with the same schema (and genre ids) onto the end."""
+        values = {
+            name: source.columns[name][row]
+            for name in self.schema
+            if name not in _DERIVED_COLUMNS and name not in _ROW_COLUMNS
+        }
+        self.append(int(source.columns["rating_key"][row]), source.title(row), source.genre_ids(row), **values)
+
+    def finalize(self) -> None:
+        order = sorted(range(len(self)), key=lambda row: self.title(row).casefold())
+        self.columns["title_order"] = array("i", order)
+        # Group title order by bucket once here so browsing a letter is a slice, not a scan.
+        letters = self.columns["letter"]
+        by_letter = sorted(order, key=lambda row: _BUCKET_RANKS.get(letters[row], 0))
+        keys = self.columns["rating_key"]
+        offsets = array("q", [0] * (len(BUCKET_LETTERS) + 1))
+        for row in by_letter:
+            offsets[_BUCKET_RANKS.get(letters[row], 0) + 1] += 1
+        for rank in range(len(BUCKET_LETTERS)):
+            offsets[rank + 1] += offsets[rank]
+        self.columns["letter_rows"] = array("i", by_letter)
+        self.columns["letter_keys"] = array("q", (keys[row] for row in by_letter))
+        self.columns["letter_offsets"] = offsets
+        # Sorted key columns let lookups bisect the (possibly mapped) file instead of building dicts.
+        by_key = sorted(range(len(self)), key=lambda row: keys[row])
+        self.columns["key_rows"] = array("i", by_key)
+        self.columns["sorted_keys"] = array("q", (keys[row] for row in by_key))
+        if "artist_rows" in self.schema:
+            artists = self.columns["artist_id"]
+            by_artist = sorted(range(len(self)), key=lambda row: artists[row])
+            self.columns["artist_rows"] = array("i", by_artist)
+            self.columns["artist_keys"] = array("q", (artists[row] for row in by_artist))
+
+    def find(self, rating_key: int) -> Optional[int]:
+        keys = self.columns["sorted_keys"]
+        position = bisect_left(keys, rating_key)
+        if position < len(keys) and keys[position] == rating_key:
+            return int(self.columns["key_rows"][position])
+        return None
+
+    def artist_rows(self, artist_id: int) -> Sequence[int]:
+        keys = self.columns["artist_keys"]
+        return self.columns["artist_rows"][bisect_left(keys, artist_id):bisect_right(keys, artist_id)]
+
+    def letter_range(self, letter: str) -> Tuple[int, int]:
+        offsets = self.columns["letter_offsets"]
+        rank = _BUCKET_RANKS.get(ord(letter[:1] or "#"))
+        if rank is None or len(offsets) <= len(BUCKET_LETTERS):
+            return 0, 0
+        return int(offsets[rank]), int(offsets[rank + 1])
+
+    def title(self, row: int) -> str:
+        offsets = self.columns["title_offsets"]
+        raw = self.columns["titles"][offsets[row]:offsets[row + 1]]
+        return bytes(raw).decode("utf-8", errors="replace")
+
+    def genre_ids(self, row: int) -> Sequence[int]:
+        offsets = self.columns["genre_offsets"]
+        return self.columns["genre_ids"][offsets[row]:offsets[row + 1]]
+
+    def lengths(self) -> Dict[str, int]:
+        return {name: len(column) for name, column in self.columns.items()}
+
+    def save(self, directory: Path, prefix: str) -> None:
+        for name, column in self.columns.items():
+            path = directory / f"{prefix}.{name}.bin"
+            with path.open("wb") as handle:
+                handle.write(memoryview(column).cast("B"))
+
+    @classmethod
+    def load(cls, directory: Path, prefix: str, schema: Dict[str, str], lengths: Dict[str, int]) -> "_ColumnTable":
+        table = cls(schema)
+        for name, code in schema.items():
+            expected = int(lengths.get(name, -1))
+            path = directory / f"{prefix}.{name}.bin"
+            if expected == 0:
+                table.columns[name] = array(code)
+                continue
+            with path.open("rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped).cast(code)
+            if len(view) != expected:
+                raise ValueError(f"Column {prefix}.{name} has {len(view)} entries, expected {expected}.")
+            table._maps.append(mapped)
+            table._views.append(view)
+            table.columns[name] = view
+        return table
+
+    def close(self) -> None:
+        self.columns = {name: array(code) for name, code in self.schema.items()}
+        self._finalizer()
+
+
+class MusicIndex:
+    """Columnar track and album index for one music section.
+
+    Rows are stored as parallel typed columns so that even very large libraries
+    stay compact; a persisted index is memory-mapped instead of read into memory.
+    """
+
+    def __init__(self, section_id: str) -> None:
+        self.section_id = section_id
+        self.built_at: float = 0.0
+        # When the rows were last rebuilt from scratch rather than updated with changes.
+        self.full_built_at: float = 0.0
+        self._tracks = _ColumnTable(_TRACK_SCHEMA)
+        self._albums = _ColumnTable(_ALBUM_SCHEMA)
+        self._genres: List[str] = []
+        self._genre_lookup: Dict[str, int] = {}
+        # Only used while rows are being added; a built index looks rows up by bisecting.
+        self._album_rows: Dict[int, int] = {}
+        self._track_keys: Set[int] = set()
+        self._artist_genres: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def close(self) -> None:
+        """Unmap the persisted columns; the index reads as empty afterwards."""
+        self._tracks.close()
+        self._albums.close()
+
+    @property
+    def album_count(self) -> int:
+        return len(self._albums)
+
+    def is_stale(self, max_age: float) -> bool:
+        return not self.built_at or (time.time() - self.built_at) > max_age
+
+    def needs_rebuild(self, max_age: float) -> bool:
+        """Whether incremental updates have been stacked long enough to start over from scratch."""
+        return not self.full_built_at or (time.time() - self.full_built_at) > max_age
+
+    def _genre_id(self, name: str) -> int:
+        existing = self._genre_lookup.get(name)
+        if existing is not None:
+            return existing
+        self._genres.append(name)
+        self._genre_lookup[name] = len(self._genres) - 1
+        return len(self._genres) - 1
+
+    def add_albums(self, albums: Iterable[PlexObject]) -> None:
+        for album in albums:
+            rating_key = _int_or_zero(getattr(album, "ratingKey", None))
+            if not rating_key or rating_key in self._album_rows:
+                continue
+            title = getattr(album, "titleSort", None) or getattr(album, "title", "") or ""
+            genres = [self._genre_id(name) for name in _tag_names(getattr(album, "genres", None))]
+            self._album_rows[rating_key] = len(self._albums)
+            self._albums.append(
+                rating_key,
+                str(title),
+                genres,
+                artist_id=_int_or_zero(getattr(album, "parentRatingKey", None)),
+                year=_int_or_zero(getattr(album, "year", None)),
+                added_at=_timestamp(getattr(album, "addedAt", None)),
+            )
+
+    def add_tracks(self, tracks: Iterable[PlexObject]) -> None:
+        for track in tracks:
+            rating_key = _int_or_zero(getattr(track, "ratingKey", None))
+            if not rating_key or rating_key in self._track_keys:
+                continue
+            album_id = _int_or_zero(getattr(track, "parentRatingKey", None))
+            album_row = self._album_rows.get(album_id)
+            genres: Sequence[int] = [self._genre_id(name) for name in _tag_names(getattr(track, "genres", None))]
+            if not genres and album_row is not None:
+                genres = self._albums.genre_ids(album_row)
+            year = _int_or_zero(getattr(track, "year", None))
+            if not year and album_row is not None:
+                year = int(self._albums.columns["year"][album_row])
+            title = getattr(track, "titleSort", None) or getattr(track, "title", "") or ""
+            self._track_keys.add(rating_key)
+            self._tracks.append(
+                rating_key,
+                str(title),
+                genres,
+                artist_id=_int_or_zero(getattr(track, "grandparentRatingKey", None)),
+                album_id=album_id,
+                year=year,
+                duration=_int_or_zero(getattr(track, "duration", None)),
+                view_count=_int_or_zero(getattr(track, "viewCount", None)),
+                last_viewed_at=_timestamp(getattr(track, "lastViewedAt", None)),
+                added_at=_timestamp(getattr(track, "addedAt", None)),
+            )
+
+    def mark_built(self, built_at: Optional[float] = None) -> None:
+        self._tracks.finalize()
+        self._albums.finalize()
+        self._album_rows = {}
+        self._track_keys = set()
+        self.built_at = built_at or time.time()
+        if not self.full_built_at:
+            self.full_built_at = self.built_at
+
+    def updated(
+        self,
+        albums: Iterable[PlexObject],
+        tracks: Iterable[PlexObject],
+        *,
+        built_at: float,
+    ) -> "MusicIndex":
+        """A new index with the given changed albums and tracks replacing or adding to these rows."""
+        index = MusicIndex(self.section_id)
+        index.full_built_at = self.full_built_at
+        index._genres = list(self._genres)
+        index._genre_lookup = dict(self._genre_lookup)
+        index.add_albums(albums)
+        changed_albums = set(index._album_rows)
+        for row in range(len(self._albums)):
+            rating_key = int(self._albums.columns["rating_key"][row])
+            if rating_key not in changed_albums:
+                index._album_rows[rating_key] = len(index._albums)
+                index._albums.append_row(self._albums, row)
+        index.add_tracks(tracks)
+        changed_tracks = set(index._track_keys)
+        for row in range(len(self._tracks)):
+            if int(self._tracks.columns["rating_key"][row]) not in changed_tracks:
+                index._tracks.append_row(self._tracks, row)
+        index.mark_built(built_at)
+        return index
+
+    def _table(self, kind: str) -> _ColumnTable:
+        if kind == "tracks":
+            return self._tracks
+        if kind == "albums":
+            return self._albums
+        raise ValueError(f"Unsupported music index kind '{kind}'.")
+
+    def record(self, row: int) -> LocalTrack:
+        columns = self._tracks.columns
+        year = int(columns["year"][row])
+        return LocalTrack(
+            rating_key=str(columns["rating_key"][row]),
+            title=self._tracks.title(row),
+            artist_key=str(columns["artist_id"][row] or ""),
+            album_key=str(columns["album_id"][row] or ""),
+            year=year or None,
+            genres=tuple(self._genres[gid] for gid in self._tracks.genre_ids(row)),
+            view_count=int(columns["view_count"][row]),
+            last_viewed_at=float(columns["last_viewed_at"][row]),
+            added_at=float(columns["added_at"][row]),
+            duration=int(columns["duration"][row]),
+        )
+
+    def get(self, rating_key: Any) -> Optional[LocalTrack]:
+        row = self._tracks.find(_int_or_zero(rating_key))
+        if row is None:
+            return None
+        return self.record(row)
+
+    def random_rows(self, count: int, rng: Optional[random.Random] = None) -> List[int]:
+        total = len(self._tracks)
+        return (rng or random).sample(range(total), min(count, total))
+
+    def _artist_genre_ids(self, artist_id: int) -> Set[int]:
+        with self._lock:
+            cached = self._artist_genres.get(artist_id)
+        if cached is not None:
+            return cached
+        genres: Set[int] = set()
+        for row in self._tracks.artist_rows(artist_id):
+            genres.update(self._tracks.genre_ids(row))
+        with self._lock:
+            if len(self._artist_genres) >= _ARTIST_GENRE_CACHE_SIZE:
+                self._artist_genres.clear()
+            self._artist_genres[artist_id] = genres
+        return genres
+
+    def artist_similarity(self, first: Any, second: Any) -> float:
+        left_id = _int_or_zero(first)
+        right_id = _int_or_zero(second)
+        if not left_id or not right_id:
+            return 0.0
+        if left_id == right_id:
+            return 1.0
+        left = self._artist_genre_ids(left_id)
+        right = self._artist_genre_ids(right_id)
+        if not left or not right:
+            return 0.0
+        return len(left & right) / len(left | right)
+
+    def filter_rows(
+        self,
+        kind: str = "tracks",
+        *,
+        letter: Optional[str] = None,
+        genre: Optional[str] = None,
+        decade: Optional[int] = None,
+        artist_key: Any = None,
+        added_since: Optional[float] = None,
+    ) -> List[int]:
+        table = self._table(kind)
+        columns = table.columns
+        genre_id = self._genre_lookup_for(genre) if genre else None
+        if genre and genre_id is None:
+            return []
+        artist_id = _int_or_zero(artist_key) if artist_key else None
+        candidates: Iterable[int] = range(len(table))
+        if letter:
+            start, end = table.letter_range(letter)
+            candidates = sorted(columns["letter_rows"][start:end])
+        rows: List[int] = []
+        for row in candidates:
+            if artist_id is not None and columns["artist_id"][row] != artist_id:
+                continue
+            if decade is not None and (int(columns["year"][row]) // 10) * 10 != decade:
+                continue
+            if added_since is not None and columns["added_at"][row] < added_since:
+                continue
+            if genre_id is not None and genre_id not in table.genre_ids(row):
+                continue
+            rows.append(row)
+        return rows
+
+    def _genre_lookup_for(self, name: str) -> Optional[int]:
+        return self._genre_lookup.get(name.strip().lower())
+
+    def count(self, kind: str = "tracks", **filters: Any) -> int:
+        if not filters:
+            return len(self._table(kind))
+        return len(self.filter_rows(kind, **filters))
+
+    def sorted_rating_keys(
+        self,
+        kind: str = "tracks",
+        *,
+        rows: Optional[Iterable[int]] = None,
+        sort: str = "title",
+        descending: bool = False,
+    ) -> List[int]:
+        table = self._table(kind)
+        columns = table.columns
+        if sort == "title":
+            order: Iterable[int] = columns["title_order"]
+            if rows is not None:
+                wanted = set(rows)
+                order = [row for row in order if row in wanted]
+            ordered = list(order)
+            if descending:
+                ordered.reverse()
+        else:
+            if sort not in columns:
+                raise ValueError(f"Unsupported music index sort '{sort}'.")
+            column = columns[sort]
+            candidates = list(rows) if rows is not None else list(range(len(table)))
+            ordered = sorted(candidates, key=lambda row: column[row], reverse=descending)
+        keys = columns["rating_key"]
+        return [int(keys[row]) for row in ordered]
+
+    def letter_buckets(self, kind: str = "tracks") -> List[Tuple[str, array]]:
+        """Group rating keys by first sort-title letter, each bucket in title order."""
+        table = self._table(kind)
+        keys = table.columns["letter_keys"]
+        buckets: List[Tuple[str, array]] = []
+        for letter in BUCKET_LETTERS:
+            start, end = table.letter_range(letter)
+            if end > start:
+                # Copied out so a bucket held by the UI never pins the mapped file.
+                bucket = array("q")
+                bucket.frombytes(memoryview(keys[start:end]).cast("B"))
+                buckets.append((letter, bucket))
+        return buckets
+
+    def save(self, directory: Path) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        generation = f"gen-{int(self.built_at * 1000)}"
+        target = directory / generation
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+        target.mkdir(parents=True)
+        self._tracks.save(target, "tracks")
+        self._albums.save(target, "albums")
+        manifest = {
+            "version": INDEX_FORMAT_VERSION,
+            "section_id": self.section_id,
+            "built_at": self.built_at,
+            "full_built_at": self.full_built_at,
+            "generation": generation,
+            "genres": self._genres,
+            "tracks": self._tracks.lengths(),
+            "albums": self._albums.lengths(),
+        }
+        manifest_path = directory / INDEX_MANIFEST
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+        os.replace(tmp_path, manifest_path)
+        return target
+
+    @staticmethod
+    def prune(directory: Path) -> None:
+        """Delete generations the manifest no longer points at.
+
+        Run after the previous index has been closed: Windows refuses to delete mapped files.
+        """
+        try:
+            with (directory / INDEX_MANIFEST).open("r", encoding="utf-8") as handle:
+                current = str(json.load(handle).get("generation", ""))
+        except (OSError, ValueError):
+            return
+        for stale in directory.glob("gen-*"):
+            if stale.name != current:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["MusicIndex"]:
+        manifest_path = directory / INDEX_MANIFEST
+        if not manifest_path.exists():
+            return None
+        try:
+            with manifest_path.open("r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+            if manifest.get("version") != INDEX_FORMAT_VERSION:
+                return None
+            generation_dir = directory / str(manifest["generation"])
+            index = cls(str(manifest.get("section_id", "")))
+            index._tracks = _ColumnTable.load(generation_dir, "tracks", _TRACK_SCHEMA, manifest["tracks"])
+            index._albums = _ColumnTable.load(generation_dir, "albums", _ALBUM_SCHEMA, manifest["albums"])
+            index._genres = list(manifest.get("genres") or [])
+            index._genre_lookup = {name: idx for idx, name in enumerate(index._genres)}
+            index.built_at = float(manifest.get("built_at") or 0.0)
+            index.full_built_at = float(manifest.get("full_built_at") or index.built_at)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[MusicIndex] Unable to load persisted index from {directory}: {exc}")
+            return None
+        return index
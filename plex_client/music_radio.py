@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import math
+import random
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from plexapi.base import PlexObject
+
+from .music_index import LocalTrack, MusicIndex
+
+
+@dataclass
+class RadioWeights:
+    genre: float = 2.0
+    decade: float = 1.0
+    artist: float = 1.5
+    history: float = 0.5
+    recency: float = 0.0
+    novelty: float = 0.0
+
+
+_MODE_WEIGHTS: Dict[str, RadioWeights] = {
+    "library_radio": RadioWeights(),
+    "recent_radio": RadioWeights(genre=1.0, decade=0.5, artist=1.0, history=0.25, recency=4.0),
+    "shuffle_radio": RadioWeights(genre=0.25, decade=0.0, artist=0.25, history=0.0, novelty=1.5),
+}
+
+
+@dataclass
+class RadioProfile:
+    genres: Set[str] = field(default_factory=set)
+    decade: Optional[int] = None
+    artist_key: str = ""
+
+    @classmethod
+    def from_track(cls, track: Optional[LocalTrack]) -> "RadioProfile":
+        if track is None:
+            return cls()
+        return cls(genres=set(track.genres), decade=track.decade, artist_key=track.artist_key)
+
+
+class LocalRadioSampler:
+    """Weighted sampler that draws radio tracks from a MusicIndex."""
+
+    candidate_pool = 2000
+    recent_artist_window = 4
+
+    def __init__(
+        self,
+        index: MusicIndex,
+        mode: str,
+        *,
+        seed: Optional[LocalTrack] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self._index = index
+        self._mode = mode
+        self._weights = _MODE_WEIGHTS.get(mode, RadioWeights())
+        self._rng = rng or random.Random()
+        self._profile = RadioProfile.from_track(seed)
+        self._played: Set[str] = set()
+        self._recent_artists: Deque[str] = deque(maxlen=self.recent_artist_window)
+        if seed is not None:
+            self._remember(seed)
+
+    def _remember(self, track: LocalTrack) -> None:
+        self._played.add(track.rating_key)
+        if track.artist_key:
+            self._recent_artists.append(track.artist_key)
+
+    def weight(self, track: LocalTrack, *, now: Optional[float] = None) -> float:
+        if track.rating_key in self._played:
+            return 0.0
+        weights = self._weights
+        now = now or time.time()
+        score = 1.0
+        profile = self._profile
+        if weights.genre and profile.genres:
+            genres = set(track.genres)
+            overlap = len(genres & profile.genres) / len(genres | profile.genres) if genres else 0.0
+            score *= 1.0 + weights.genre * overlap
+        if weights.decade and profile.decade is not None:
+            if track.decade is None:
+                score *= 0.75
+            else:
+                distance = abs(track.decade - profile.decade) / 10
+                score *= 1.0 + weights.decade / (1.0 + distance)
+        if weights.artist and profile.artist_key:
+            similarity = self._index.artist_similarity(profile.artist_key, track.artist_key)
+            score *= 1.0 + weights.artist * similarity
+        if track.artist_key and track.artist_key in self._recent_artists:
+            score *= 0.15
+        if weights.history and track.view_count:
+            score *= 1.0 + weights.history * math.log1p(track.view_count)
+        if track.last_viewed_at and now - track.last_viewed_at < 6 * 3600:
+            score *= 0.2
+        if weights.recency and track.added_at:
+            age_days = max(0.0, (now - track.added_at) / 86400)
+            score *= 0.2 + weights.recency * math.exp(-age_days / 90)
+        if weights.novelty:
+            score *= 1.0 + weights.novelty / (1.0 + track.view_count)
+        return score
+
+    def pick_seed(self) -> Optional[LocalTrack]:
+        picks = self.sample(1)
+        if not picks:
+            return None
+        self._profile = RadioProfile.from_track(picks[0])
+        return picks[0]
+
+    def sample(self, count: int) -> List[LocalTrack]:
+        if not len(self._index) or count <= 0:
+            return []
+        pool = [self._index.record(row) for row in self._index.random_rows(self.candidate_pool, self._rng)]
+        now = time.time()
+        results: List[LocalTrack] = []
+        while len(results) < count:
+            weighted = [(track, self.weight(track, now=now)) for track in pool]
+            weighted = [(track, value) for track, value in weighted if value > 0]
+            if not weighted:
+                break
+            total = sum(value for _, value in weighted)
+            target = self._rng.uniform(0, total)
+            running = 0.0
+            chosen = weighted[-1][0]
+            for track, value in weighted:
+                running += value
+                if running >= target:
+                    chosen = track
+                    break
+            results.append(chosen)
+            self._remember(chosen)
+        return results
+
+
+class LocalRadioQueue:
+    """Client-side stand-in for a continuous PlayQueue, refilled from a LocalRadioSampler."""
+
+    low_water = 5
+    batch_size = 10
+
+    def __init__(
+        self,
+        sampler: LocalRadioSampler,
+        resolver: Callable[[str], Optional[PlexObject]],
+        *,
+        description: str = "",
+    ) -> None:
+        self._sampler = sampler
+        self._resolver = resolver
+        self._items: List[PlexObject] = []
+        self._lock = threading.Lock()
+        self._refill_thread: Optional[threading.Thread] = None
+        self.playQueueID = 0
+        self.playQueueSelectedItemOffset = 0
+        self.playQueueSourceURI = f"local://radio/{description or 'library'}"
+
+    @property
+    def items(self) -> List[PlexObject]:
+        with self._lock:
+            return list(self._items)
+
+    def append_resolved(self, tracks: Iterable[LocalTrack]) -> int:
+        added = 0
+        for track in tracks:
+            try:
+                item = self._resolver(track.rating_key)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Radio] Unable to resolve local radio track {track.rating_key}: {exc}")
+                continue
+            if item is None:
+                continue
+            with self._lock:
+                self._items.append(item)
+            added += 1
+        return added
+
+    def fill(self, count: Optional[int] = None) -> int:
+        return self.append_resolved(self._sampler.sample(count or self.batch_size))
+
+    def ensure_ahead(self, index: int) -> None:
+        with self._lock:
+            remaining = len(self._items) - index - 1
+            running = self._refill_thread is not None and self._refill_thread.is_alive()
+        if remaining >= self.low_water or running:
+            return
+
+        def worker() -> None:
+            try:
+                self.fill()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Radio] Background radio refill failed: {exc}")
+
+        thread = threading.Thread(target=worker, name="PlexRadioRefill", daemon=True)
+        with self._lock:
+            self._refill_thread = thread
+        thread.start()
+
+    def refresh(self) -> None:
+        with self._lock:
+            before = len(self._items)
+            thread = self._refill_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=10.0)
+        if len(self.items) > before:
+            return
+        if self.fill() == 0:
+            raise RuntimeError("The local radio index has no more tracks to offer.")
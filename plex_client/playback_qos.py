@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass, field
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+QOS_HISTORY_LIMIT = 200
+# The session log rolls over to a single ".1" backup at this size, bounding it at twice the limit.
+QOS_LOG_MAX_BYTES = 1024 * 1024
+
+
+@dataclass
+class PlaybackQosSession:
+    session_id: str
+    title: str
+    rating_key: Optional[str]
+    server: str
+    connection_type: str
+    requested_at: float
+    stream_kind: str = ""
+    startup_ms: Optional[int] = None
+    buffering_events: int = 0
+    buffering_ms: int = 0
+    input_kbps_avg: float = 0.0
+    input_kbps_min: Optional[float] = None
+    demux_kbps_avg: float = 0.0
+    lost_pictures: int = 0
+    displayed_pictures: int = 0
+    lost_audio_buffers: int = 0
+    demux_corrupted: int = 0
+    demux_discontinuity: int = 0
+    samples: int = 0
+    ended_at: Optional[float] = None
+    outcome: str = ""
+    _started_monotonic: float = field(default=0.0, repr=False)
+    _buffering_since: Optional[float] = field(default=None, repr=False)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if not key.startswith("_")}
+
+
+@dataclass
+class ConnectionQosSummary:
+    connection_type: str
+    sessions: int = 0
+    failures: int = 0
+    startup_ms_avg: Optional[float] = None
+    buffering_events_per_session: float = 0.0
+    buffering_ms_avg: float = 0.0
+    input_kbps_avg: float = 0.0
+    lost_pictures: int = 0
+
+
+def _vlc_rate_to_kbps(value: object) -> float:
+    # LibVLC reports bitrates in bytes per millisecond.
+    try:
+        return max(0.0, float(value) * 8000.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class PlaybackQosRecorder:
+    """Collects startup, buffering and LibVLC statistics for each playback session."""
+
+    def __init__(
+        self,
+        log_path: Optional[Path] = None,
+        *,
+        history_limit: int = QOS_HISTORY_LIMIT,
+        max_log_bytes: int = QOS_LOG_MAX_BYTES,
+    ) -> None:
+        self._log_path = log_path
+        self._max_log_bytes = max_log_bytes
+        self._history: Deque[PlaybackQosSession] = deque(maxlen=history_limit)
+        self._active: Optional[PlaybackQosSession] = None
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    @property
+    def active(self) -> Optional[PlaybackQosSession]:
+        return self._active
+
+    def begin(
+        self,
+        title: str,
+        rating_key: Optional[str],
+        *,
+        server: str = "",
+        connection_type: str = "unknown",
+    ) -> PlaybackQosSession:
+        self.end("replaced")
+        with self._lock:
+            self._counter += 1
+            session = PlaybackQosSession(
+                session_id=f"{int(time.time() * 1000)}-{self._counter}",
+                title=title,
+                rating_key=rating_key,
+                server=server,
+                connection_type=connection_type or "unknown",
+                requested_at=time.time(),
+                _started_monotonic=time.monotonic(),
+            )
+            self._active = session
+            return session
+
+    def mark_started(self, stream_kind: str) -> None:
+        with self._lock:
+            session = self._active
+            if session is None or session.startup_ms is not None:
+                return
+            session.stream_kind = stream_kind
+            session.startup_ms = int((time.monotonic() - session._started_monotonic) * 1000)
+
+    def buffering(self, percent: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            session = self._active
+            # Initial buffering is part of startup latency, not a stall.
+            if session is None or session.startup_ms is None:
+                return
+            if percent < 100.0 and session._buffering_since is None:
+                session._buffering_since = now
+                session.buffering_events += 1
+            elif percent >= 100.0 and session._buffering_since is not None:
+                session.buffering_ms += int((now - session._buffering_since) * 1000)
+                session._buffering_since = None
+
+    def resumed(self) -> None:
+        self.buffering(100.0)
+
+    def sample(self, stats: object) -> None:
+        """Fold one LibVLC MediaStats reading into the active session."""
+        input_kbps = _vlc_rate_to_kbps(getattr(stats, "input_bitrate", 0))
+        demux_kbps = _vlc_rate_to_kbps(getattr(stats, "demux_bitrate", 0))
+        with self._lock:
+            session = self._active
+            if session is None:
+                return
+            count = session.samples + 1
+            session.input_kbps_avg += (input_kbps - session.input_kbps_avg) / count
+            session.demux_kbps_avg += (demux_kbps - session.demux_kbps_avg) / count
+            if input_kbps and (session.input_kbps_min is None or input_kbps < session.input_kbps_min):
+                session.input_kbps_min = input_kbps
+            # Counters are cumulative for the media, so the latest reading wins.
+            session.lost_pictures = int(getattr(stats, "lost_pictures", 0) or 0)
+            session.displayed_pictures = int(getattr(stats, "displayed_pictures", 0) or 0)
+            session.lost_audio_buffers = int(getattr(stats, "lost_abuffers", 0) or 0)
+            session.demux_corrupted = int(getattr(stats, "demux_corrupted", 0) or 0)
+            session.demux_discontinuity = int(getattr(stats, "demux_discontinuity", 0) or 0)
+            session.samples = count
+
+    def end(self, outcome: str = "stopped") -> Optional[PlaybackQosSession]:
+        with self._lock:
+            session = self._active
+            if session is None:
+                return None
+            self._active = None
+            if session._buffering_since is not None:
+                session.buffering_ms += int((time.monotonic() - session._buffering_since) * 1000)
+                session._buffering_since = None
+            session.ended_at = time.time()
+            session.outcome = outcome if session.startup_ms is not None or outcome == "failed" else "abandoned"
+            self._history.append(session)
+        self._append_log(session)
+        return session
+
+    def sessions(self) -> List[PlaybackQosSession]:
+        with self._lock:
+            return list(self._history)
+
+    def summary_by_connection(self) -> List[ConnectionQosSummary]:
+        grouped: Dict[str, List[PlaybackQosSession]] = {}
+        for session in self.sessions():
+            grouped.setdefault(session.connection_type, []).append(session)
+        summaries: List[ConnectionQosSummary] = []
+        for connection_type, sessions in sorted(grouped.items()):
+            started = [session for session in sessions if session.startup_ms is not None]
+            summary = ConnectionQosSummary(connection_type=connection_type, sessions=len(sessions))
+            summary.failures = sum(1 for session in sessions if session.outcome == "failed")
+            if started:
+                summary.startup_ms_avg = sum(session.startup_ms or 0 for session in started) / len(started)
+                summary.buffering_events_per_session = sum(s.buffering_events for s in started) / len(started)
+                summary.buffering_ms_avg = sum(s.buffering_ms for s in started) / len(started)
+                sampled = [session for session in started if session.samples]
+                if sampled:
+                    summary.input_kbps_avg = sum(s.input_kbps_avg for s in sampled) / len(sampled)
+                summary.lost_pictures = sum(s.lost_pictures for s in started)
+            summaries.append(summary)
+        return summaries
+
+    def export(self, path: Path, sessions: Optional[Iterable[PlaybackQosSession]] = None) -> int:
+        """Write sessions to path as JSON lines and return how many were written."""
+        records = [session.to_record() for session in (sessions if sessions is not None else self.sessions())]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record) + "\n")
+        return len(records)
+
+    def _append_log(self, session: PlaybackQosSession) -> None:
+        if self._log_path is None:
+            return
+        line = json.dumps(session.to_record()) + "\n"
+        try:
+            self._log_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                size = self._log_path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(line.encode("utf-8")) > self._max_log_bytes:
+                os.replace(self._log_path, self._log_path.with_name(self._log_path.name + ".1"))
+            with self._log_path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+        except OSError as exc:
+            print(f"[QoS] Unable to append playback log: {exc}")
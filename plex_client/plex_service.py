@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+import re
 import threading
 import time
 import random
@@ -18,7 +20,14 @@ from plexapi.playlist import Playlist
 from plexapi.playqueue import PlayQueue
 from plexapi.server import PlexServer
 
+from .audio_cache import AudioCache
 from .config import ConfigStore
+from .download_manager import DownloadJob, DownloadManager
+from .episode_index import EpisodeIndex
+from .music_index import MusicIndex
+from .music_radio import LocalRadioQueue, LocalRadioSampler
+from .stream_cache import ResolvedStream, StreamResolutionCache
+from .stream_planner import DIRECT_PLAY, DIRECT_STREAM, StreamPlan, StreamPlanner
 
 
 @dataclass
@@ -30,6 +39,20 @@ class PlayableMedia:
     browser_url: Optional[str]
     resume_offset: int
     item: PlexObject
+    preferred_url: Optional[str] = None
+    candidates: List[str] = field(default_factory=list)
+    seek_index_url: Optional[str] = None
+
+
+@dataclass
+class TimelinePush:
+    rating_key: Optional[str]
+    state: str
+    send_state: str
+    position: int
+    duration: int
+    near_completion: bool = False
+    accepted: bool = False
 
 
 @dataclass
@@ -99,6 +122,18 @@ class MusicAlphaBucket:
     summary: str = ""
     character: str = ""
     type: str = "alpha_bucket"
+    rating_keys: Sequence[int] = field(default=(), compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class MusicBucketPage:
+    identifier: str
+    title: str
+    bucket: MusicAlphaBucket
+    start: int
+    summary: str = ""
+    type: str = "bucket_page"
+
 
 @dataclass(frozen=True)
 class MusicRadioOption:
@@ -185,6 +220,60 @@ _MUSIC_CATEGORY_DEFINITIONS: Tuple[Tuple[str, str, str], ...] = (
     ),
 )
 
+# A stale index is brought up to date with the albums and tracks updated since it was built;
+# it is rebuilt from scratch only after _MUSIC_INDEX_REBUILD_AGE or when the totals disagree.
+_MUSIC_INDEX_MAX_AGE = 6 * 60 * 60
+_MUSIC_INDEX_REBUILD_AGE = 7 * 24 * 60 * 60
+# Overlap for the updatedAt filter, covering clock skew and edits made during the last build.
+_MUSIC_INDEX_UPDATE_SLACK = 5 * 60
+_MUSIC_INDEX_PAGE_SIZE = 1000
+_MUSIC_BUCKET_PAGE_SIZE = 200
+_PLAYLIST_INDEX_TTL = 10 * 60
+_ALERT_TYPE_PLAYLIST = 15
+# Timeline alert entry types that can change a show's episode list or watch state.
+_ALERT_TYPES_EPISODE_INDEX = {2, 3, 4}
+# Safety net for changes the alert listener missed (e.g. while it was disconnected).
+_EPISODE_INDEX_TTL = 10 * 60
+# How long playable_by_key trusts an item it already resolved, absent an alert about it.
+_PLAYABLE_BY_KEY_TTL = 5 * 60
+_TIMELINE_CONFIRM_TOLERANCE = 1250
+_TIMELINE_CONFIRM_TIMEOUT = 4.0
+# Backoff between viewOffset checks; about eight seconds in total, like the old polling loop.
+_TIMELINE_CONFIRM_DELAYS: Tuple[float, ...] = (0.25, 0.5, 1.0, 2.0, 4.0)
+_LIBRARY_IDENTIFIER = "com.plexapp.plugins.library"
+# Cached progress is sent to one server by at most this many requests at once.
+_PROGRESS_SEND_CONCURRENCY = 4
+_TIMELINE_CONFIRM_EXCLUDES = "Media,Genre,Director,Writer,Role,Producer,Country,Collection,Label,Mood,Style,Similar,Field,Guid,Rating,Marker,Chapter,Image"
+# On Deck items resolved at once while building the watch queues.
+_WATCH_QUEUE_WORKERS = 6
+
+
+class _SharedLookups:
+    """Results of server lookups shared by the workers of one queue refresh.
+
+    The first caller for a key runs the lookup; concurrent callers for the same key wait for it
+    instead of issuing the same request again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._results: Dict[Tuple[str, str], "Future[Any]"] = {}
+
+    def get(self, kind: str, key: object, load: Callable[[], Any]) -> Any:
+        if key in (None, ""):
+            return load()
+        with self._lock:
+            future = self._results.get((kind, str(key)))
+            owner = future is None
+            if future is None:
+                future = self._results[(kind, str(key))] = Future()
+        if owner:
+            try:
+                future.set_result(load())
+            except Exception as exc:  # noqa: BLE001
+                future.set_exception(exc)
+        return future.result()
+
 
 class PlexService:
     """Wraps common operations against the Plex API for the UI layer."""
@@ -200,10 +289,41 @@ class PlexService:
         self._music_category_cache: Dict[str, List[MusicCategory]] = {}
         self._music_alpha_cache: Dict[str, List[MusicAlphaBucket]] = {}
         self._music_alpha_items_cache: Dict[str, List[PlexObject]] = {}
+        self._music_alpha_total_cache: Dict[str, int] = {}
         self._playlist_items_cache: Dict[str, List[PlexObject]] = {}
         self._collection_items_cache: Dict[str, List[PlexObject]] = {}
         self._season_first_episode_cache: Dict[str, Optional[PlexObject]] = {}
         self._season_first_episode_lock = threading.Lock()
+        self._music_indexes: Dict[str, MusicIndex] = {}
+        self._music_index_building: Set[str] = set()
+        self._music_index_lock = threading.Lock()
+        self._playlist_index: Optional[List[PlexObject]] = None
+        self._playlist_index_at: float = 0.0
+        self._playlist_index_lock = threading.Lock()
+        self._episode_indexes: Dict[str, EpisodeIndex] = {}
+        self._episode_index_owners: Dict[str, str] = {}
+        # Per show, bumped by every invalidation so a listing fetched across a change is not cached.
+        self._episode_index_generations: Dict[str, int] = {}
+        self._episode_index_building: Dict[str, int] = {}
+        self._episode_index_lock = threading.Lock()
+        self._playable_by_key: Dict[str, Tuple[float, Optional[PlayableMedia]]] = {}
+        self._playable_by_key_lock = threading.Lock()
+        self._alert_listener: Any = None
+        self._alert_lock = threading.Lock()
+        self._alert_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._stream_cache = StreamResolutionCache()
+        self._stream_planner = StreamPlanner()
+        self._download_manager: Optional[DownloadManager] = None
+        self._download_manager_lock = threading.Lock()
+        self._audio_cache: Optional[AudioCache] = None
+        self._audio_cache_lock = threading.Lock()
+        self._audio_cache_purge: Optional[threading.Thread] = None
+        self._timeline_confirm_executor: Optional[ThreadPoolExecutor] = None
+        self._timeline_confirm_generation: Dict[str, int] = {}
+        self._timeline_confirm_lock = threading.Lock()
+        self._progress_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._timeline_confirm_stop = threading.Event()
+        self._timeline_confirm_closed = False
 
     @property
     def server(self) -> Optional[PlexServer]:
@@ -278,20 +398,31 @@ class PlexService:
     def connect_resource(self, resource: MyPlexResource) -> PlexServer:
         if resource not in self._resources:
             self._resources.append(resource)
+        self.stop_alert_listener()
         server = self._connect_with_strategy(resource, reason="connect")
         self._server = server
         self._current_resource_id = resource.clientIdentifier
-        self._config.set_selected_server(resource.clientIdentifier)
-        self._config.set_selected_server_name(resource.name or resource.clientIdentifier)
-        self._config.promote_preferred_server(resource.clientIdentifier, resource.name)
+        with self._config.batch():
+            self._config.set_selected_server(resource.clientIdentifier)
+            self._config.set_selected_server_name(resource.name or resource.clientIdentifier)
+            self._config.promote_preferred_server(resource.clientIdentifier, resource.name)
         self._radio_station_cache.clear()
         self._music_category_cache.clear()
         self._music_alpha_cache.clear()
         self._music_alpha_items_cache.clear()
+        self._music_alpha_total_cache.clear()
         self._playlist_items_cache.clear()
         self._collection_items_cache.clear()
         with self._season_first_episode_lock:
             self._season_first_episode_cache.clear()
+        self._invalidate_episode_index()
+        self._invalidate_playable_by_key()
+        with self._music_index_lock:
+            self._music_indexes.clear()
+        self._invalidate_playlist_index()
+        manager = self.download_manager()
+        if manager is not None:
+            manager.retry_waiting(str(getattr(server, "machineIdentifier", "") or resource.clientIdentifier))
         return server
 
     def _connect_with_strategy(
@@ -354,6 +485,8 @@ class PlexService:
             return self._music_category_items(node)
         if isinstance(node, MusicAlphaBucket):
             return self._music_alpha_bucket_items(node)
+        if isinstance(node, MusicBucketPage):
+            return self._music_alpha_bucket_items(node.bucket, node.start)
         if isinstance(node, LibrarySection):
             return node.all()
         if isinstance(node, Folder):
@@ -635,6 +768,12 @@ class PlexService:
         cached = self._music_alpha_cache.get(cache_key)
         if cached is not None:
             return cached
+        if category in {"albums", "tracks"}:
+            index = self._music_index(section)
+            if index is not None and index.count(category):
+                local_buckets = self._music_index_alpha_buckets(section, category, index)
+                self._music_alpha_cache[cache_key] = local_buckets
+                return local_buckets
         characters = self._fetch_first_character_entries(section, category)
         buckets: List[MusicAlphaBucket] = []
         if characters:
@@ -667,23 +806,122 @@ class PlexService:
         self._music_alpha_cache[cache_key] = buckets
         return buckets
 
-    def _music_alpha_bucket_items(self, bucket: MusicAlphaBucket) -> List[PlexObject]:
-        cached = self._music_alpha_items_cache.get(bucket.identifier)
+    def _music_index_alpha_buckets(
+        self,
+        section: MusicSection,
+        category: str,
+        index: MusicIndex,
+    ) -> List[MusicAlphaBucket]:
+        cache_key = f"{self._music_category_cache_key(section)}:{category}"
+        libtype = "album" if category == "albums" else "track"
+        buckets: List[MusicAlphaBucket] = []
+        for character, rating_keys in index.letter_buckets(category):
+            count = len(rating_keys)
+            bucket_id = f"{cache_key}:{character}"
+            buckets.append(
+                MusicAlphaBucket(
+                    identifier=bucket_id,
+                    title=f"{character} ({count})",
+                    key=f"local:{bucket_id}",
+                    category=category,
+                    libtype=libtype,
+                    section=section,
+                    count=count,
+                    summary=f"{count} item{'s' if count != 1 else ''} starting with '{character}'",
+                    character=character,
+                    rating_keys=rating_keys,
+                )
+            )
+        return buckets
+
+    def _fetch_items_by_rating_keys(self, rating_keys: Sequence[int], *, chunk_size: int = 200) -> List[PlexObject]:
+        server = self.ensure_server()
+        results: List[PlexObject] = []
+        for offset in range(0, len(rating_keys), chunk_size):
+            chunk = [str(key) for key in rating_keys[offset:offset + chunk_size]]
+            items = server.fetchItems(f"/library/metadata/{','.join(chunk)}")
+            fetched = {str(getattr(item, "ratingKey", "")): item for item in items}
+            results.extend(fetched[key] for key in chunk if key in fetched)
+        return results
+
+    def _music_alpha_bucket_items(self, bucket: MusicAlphaBucket, start: int = 0) -> List[object]:
+        """Return one page of bucket contents, followed by a MusicBucketPage if more remain."""
+        page_size = _MUSIC_BUCKET_PAGE_SIZE
+        items: List[object] = list(self._music_alpha_bucket_page(bucket, start))
+        next_start = start + page_size
+        # Pages can come back short (items deleted since the index was built), so the marker
+        # follows the bucket size rather than how many items this page happened to return.
+        total = self._music_alpha_bucket_total(bucket)
+        if (next_start < total) if total else len(items) == page_size:
+            if total:
+                label = f"More... ({next_start + 1}-{min(total, next_start + page_size)} of {total})"
+            else:
+                label = "More..."
+            items.append(
+                MusicBucketPage(
+                    identifier=f"{bucket.identifier}:page:{next_start}",
+                    title=label,
+                    bucket=bucket,
+                    start=next_start,
+                    summary=f"Load the next {page_size} items of '{bucket.character or bucket.title}'.",
+                )
+            )
+        return items
+
+    def _music_alpha_bucket_total(self, bucket: MusicAlphaBucket) -> int:
+        if bucket.rating_keys:
+            return len(bucket.rating_keys)
+        if bucket.count:
+            return int(bucket.count)
+        if bucket.key.startswith("local:"):
+            return 0
+        cached = self._music_alpha_total_cache.get(bucket.identifier)
         if cached is not None:
             return cached
+        total = 0
         try:
-            items = list(bucket.section.fetchItems(bucket.key))
+            container = self.ensure_server().query(
+                bucket.key, params={"X-Plex-Container-Start": 0, "X-Plex-Container-Size": 0}
+            )
+            total = int(container.attrib.get("totalSize") or 0) if container is not None else 0
         except Exception as exc:  # noqa: BLE001
-            print(f"[MusicCategory] Unable to load items for bucket '{bucket.title}': {exc}")
-            items = []
-        hydrated = [self._ensure_item_loaded(item) for item in items]
-        if not hydrated:
+            print(f"[MusicCategory] Unable to size bucket '{bucket.title}': {exc}")
+        self._music_alpha_total_cache[bucket.identifier] = total
+        return total
+
+    def _music_alpha_bucket_page(self, bucket: MusicAlphaBucket, start: int) -> List[PlexObject]:
+        cache_key = f"{bucket.identifier}:{start}"
+        cached = self._music_alpha_items_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        page_size = _MUSIC_BUCKET_PAGE_SIZE
+        items: List[PlexObject] = []
+        if bucket.rating_keys:
+            try:
+                items = self._fetch_items_by_rating_keys(bucket.rating_keys[start:start + page_size])
+            except Exception as exc:  # noqa: BLE001
+                print(f"[MusicCategory] Unable to load indexed items for bucket '{bucket.title}': {exc}")
+                items = []
+        if not items and not bucket.key.startswith("local:"):
+            try:
+                items = list(
+                    bucket.section.fetchItems(
+                        bucket.key,
+                        container_start=start,
+                        container_size=page_size,
+                        maxresults=page_size,
+                    )
+                )
+            except Exception as exc:  # noqa: BLE001
+                print(f"[MusicCategory] Unable to load items for bucket '{bucket.title}': {exc}")
+                items = []
+        if not items and start == 0:
             fallback_items = self._music_alpha_bucket_search(bucket)
             if fallback_items:
                 print(f"[MusicCategory] Falling back to search for bucket '{bucket.title}'.")
-            hydrated = fallback_items
-        self._music_alpha_items_cache[bucket.identifier] = hydrated
-        return hydrated
+            items = fallback_items
+        self._music_alpha_items_cache[cache_key] = items
+        return items
 
     def _playlist_items(self, playlist: PlexObject) -> List[PlexObject]:
         if playlist is None:
@@ -908,25 +1146,20 @@ class PlexService:
 
     def _music_audio_playlists(self, section: MusicSection) -> List[PlexObject]:
         try:
-            server = self.ensure_server()
-        except Exception:
-            return []
-        try:
-            playlists = list(server.playlists(playlistType="audio"))
+            playlists = self._indexed_playlists(playlist_type="audio")
         except Exception as exc:  # noqa: BLE001
             print(f"[MusicCategory] Unable to load audio playlists: {exc}")
             return []
         target_id = self._normalize_section_id(
             getattr(section, "librarySectionID", None) or getattr(section, "key", None)
         )
-        filtered: List[PlexObject] = []
-        for playlist in playlists:
-            playlist_section_id = self._normalize_section_id(getattr(playlist, "librarySectionID", None))
-            if playlist_section_id and target_id and playlist_section_id != target_id:
-                continue
-            if getattr(playlist, "playlistType", None) not in {None, "audio"}:
-                continue
-            filtered.append(playlist)
+        if not target_id:
+            return playlists
+        filtered = [
+            playlist
+            for playlist in playlists
+            if self._normalize_section_id(getattr(playlist, "librarySectionID", None)) in (None, target_id)
+        ]
         return filtered or playlists
 
     @staticmethod
@@ -1065,28 +1298,61 @@ class PlexService:
         return stations
 
     def _station_playlists_fallback(self, section: MusicSection) -> List[Tuple[Optional[PlexObject], PlexObject]]:
+        target_id = self._normalize_section_id(
+            getattr(section, "librarySectionID", None) or getattr(section, "key", None)
+        )
         try:
-            server = self.ensure_server()
-        except Exception:
-            return []
-        try:
-            playlists = list(server.playlists(playlistType="audio"))
+            playlists = self._indexed_playlists(playlist_type="audio", section_id=target_id)
         except Exception as exc:  # noqa: BLE001
             print(f"[Radio] Unable to enumerate playlists for fallback: {exc}")
             return []
-        target_id = self._normalize_section_id(
-            getattr(section, "librarySectionID", None) or getattr(section, "key", None)
-        )
         results: List[Tuple[Optional[PlexObject], PlexObject]] = []
         for playlist in playlists:
             if not getattr(playlist, "radio", False):
                 continue
+            results.append((None, self._ensure_item_loaded(playlist)))
+        return results
+
+    def _playlist_listing(self) -> List[PlexObject]:
+        with self._playlist_index_lock:
+            cached = self._playlist_index
+            if cached is not None and time.monotonic() - self._playlist_index_at < _PLAYLIST_INDEX_TTL:
+                return cached
+        server = self.ensure_server()
+        playlists = list(server.playlists())
+        with self._playlist_index_lock:
+            self._playlist_index = playlists
+            self._playlist_index_at = time.monotonic()
+        return playlists
+
+    def _indexed_playlists(
+        self,
+        *,
+        playlist_type: Optional[str] = None,
+        section_id: Optional[str] = None,
+    ) -> List[PlexObject]:
+        results: List[PlexObject] = []
+        for playlist in self._playlist_listing():
+            kind = getattr(playlist, "playlistType", None)
+            if playlist_type and kind and kind != playlist_type:
+                continue
             playlist_section_id = self._normalize_section_id(getattr(playlist, "librarySectionID", None))
-            if playlist_section_id and target_id and playlist_section_id != target_id:
+            if section_id and playlist_section_id and playlist_section_id != section_id:
                 continue
-            results.append((None, self._ensure_item_loaded(playlist)))
+            results.append(playlist)
         return results
 
+    def _invalidate_playlist_index(self, playlist: Optional[PlexObject] = None, rating_key: Any = None) -> None:
+        with self._playlist_index_lock:
+            self._playlist_index = None
+            self._playlist_index_at = 0.0
+        if playlist is not None and rating_key is None:
+            rating_key = getattr(playlist, "ratingKey", None)
+        if rating_key is None:
+            self._playlist_items_cache.clear()
+        else:
+            self._playlist_items_cache.pop(f"playlist:{rating_key}", None)
+
     def _synthetic_radio_options(self, section: MusicSection) -> List[RadioOption]:
         options: List[RadioOption] = []
         section_id = self._normalize_section_id(
@@ -1097,11 +1363,18 @@ class PlexService:
             ("recent_radio", "Recently Added Radio", "Focus on the newest music while mixing in related songs."),
             ("shuffle_radio", "Deep Shuffle Radio", "Go deep into the catalogue with an always-changing mix."),
         ]
+        index = self._music_index(section)
         for mode, label, description in descriptors:
-            seed = self._pick_synthetic_seed_track(section, mode, sample_only=True)
-            if seed is None:
-                continue
-            rating_key = getattr(seed, "ratingKey", None)
+            if index is not None and len(index):
+                local_seed = LocalRadioSampler(index, mode).pick_seed()
+                if local_seed is None:
+                    continue
+                rating_key: Any = local_seed.rating_key
+            else:
+                seed = self._pick_synthetic_seed_track(section, mode, sample_only=True)
+                if seed is None:
+                    continue
+                rating_key = getattr(seed, "ratingKey", None)
             options.append(
                 RadioOption(
                     id=f"synthetic:{mode}:{section_id}",
@@ -1119,14 +1392,24 @@ class PlexService:
         section: Optional[MusicSection],
         mode: str,
         description: str,
+        seed_rating_key: Optional[str] = None,
     ) -> tuple[PlayableMedia, RadioSession]:
         if section is None:
             raise RuntimeError("Music section is unavailable for radio playback.")
+        section_id = self._normalize_section_id(
+            getattr(section, "librarySectionID", None) or getattr(section, "key", None)
+        )
+        friendly = description or mode.replace("_", " ").title()
+        index = self._music_index(section)
+        if index is not None and len(index):
+            try:
+                return self._start_local_radio(index, mode, friendly, section_id, seed_rating_key)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Radio] Local radio unavailable for {mode}, using server queue: {exc}")
         seed: Optional[PlexObject] = None
-        rating_key = option.data.get("seed_rating_key")
-        if rating_key:
+        if seed_rating_key:
             try:
-                seed = self.fetch_item(str(rating_key))
+                seed = self.fetch_item(str(seed_rating_key))
             except Exception:
                 seed = None
         if seed is None:
@@ -1135,17 +1418,20 @@ class PlexService:
             raise RuntimeError("Unable to find music to start this radio.")
         seed = self._ensure_item_loaded(seed)
         server = self.ensure_server()
-        queue = PlayQueue.create(
-            server,
-            [seed],
-            shuffle=1,
-            includeRelated=1,
-            continuous=1,
-        )
-        section_id = self._normalize_section_id(
-            getattr(section, "librarySectionID", None) or getattr(section, "key", None)
-        )
-        friendly = description or mode.replace("_", " ").title()
+        try:
+            queue = PlayQueue.create(
+                server,
+                [seed],
+                shuffle=1,
+                includeRelated=1,
+                continuous=1,
+            )
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Radio] Server radio queue failed for {mode}, building local index: {exc}")
+            index = self._music_index(section, build=True)
+            if index is None or not len(index):
+                raise
+            return self._start_local_radio(index, mode, friendly, section_id, str(seed.ratingKey))
         return self._initialize_radio_session(
             queue,
             kind=mode,
@@ -1154,6 +1440,198 @@ class PlexService:
             library_section_id=section_id,
         )
 
+    def _start_local_radio(
+        self,
+        index: MusicIndex,
+        mode: str,
+        description: str,
+        section_id: Optional[str],
+        seed_rating_key: Optional[str] = None,
+    ) -> tuple[PlayableMedia, RadioSession]:
+        seed = index.get(seed_rating_key) if seed_rating_key else None
+        sampler = LocalRadioSampler(index, mode, seed=seed)
+        if seed is None:
+            seed = sampler.pick_seed()
+        if seed is None:
+            raise RuntimeError("The local music index has no tracks to play.")
+        queue = LocalRadioQueue(sampler, self.fetch_item, description=mode)
+        if not queue.append_resolved([seed]):
+            queue.fill(1)
+        media, session = self._initialize_radio_session(
+            cast(PlayQueue, queue),
+            kind=mode,
+            description=description,
+            station=None,
+            library_section_id=section_id,
+        )
+        queue.ensure_ahead(session.current_index)
+        return media, session
+
+    def _music_index_dir(self, section: MusicSection) -> Optional[Path]:
+        try:
+            root = self._config.cache_dir("music_index")
+        except Exception:
+            return None
+        if not isinstance(root, Path):
+            return None
+        server_id = self._current_resource_id or getattr(self._server, "machineIdentifier", None) or "server"
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{server_id}-{self._radio_cache_key(section)}")
+        return root / name
+
+    def _music_index(self, section: MusicSection, *, build: bool = False) -> Optional[MusicIndex]:
+        """Return the section's index if it is in memory; otherwise load or build it in the background.
+
+        build=True loads or builds on the calling thread, which must not be the UI thread.
+        """
+        cache_key = self._radio_cache_key(section)
+        with self._music_index_lock:
+            index = self._music_indexes.get(cache_key)
+        if index is not None and not index.is_stale(_MUSIC_INDEX_MAX_AGE):
+            return index
+        if build:
+            index = index or self._load_music_index(section)
+            if index is not None and not index.is_stale(_MUSIC_INDEX_MAX_AGE):
+                return index
+            try:
+                return self._refresh_music_index(section, index) or index
+            except Exception as exc:  # noqa: BLE001
+                print(f"[MusicIndex] Unable to build music index: {exc}")
+                return index
+        self._warm_music_index(section)
+        return index
+
+    def _load_music_index(self, section: MusicSection) -> Optional[MusicIndex]:
+        directory = self._music_index_dir(section)
+        index = MusicIndex.load(directory) if directory is not None else None
+        if index is None:
+            return None
+        MusicIndex.prune(directory)
+        with self._music_index_lock:
+            return self._music_indexes.setdefault(self._radio_cache_key(section), index)
+
+    def _warm_music_index(self, section: MusicSection) -> None:
+        cache_key = self._radio_cache_key(section)
+        with self._music_index_lock:
+            if cache_key in self._music_index_building:
+                return
+            self._music_index_building.add(cache_key)
+
+        def worker() -> None:
+            try:
+                with self._music_index_lock:
+                    index = self._music_indexes.get(cache_key)
+                index = index or self._load_music_index(section)
+                if index is None or index.is_stale(_MUSIC_INDEX_MAX_AGE):
+                    self._refresh_music_index(section, index)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[MusicIndex] Unable to build music index: {exc}")
+            finally:
+                with self._music_index_lock:
+                    self._music_index_building.discard(cache_key)
+
+        threading.Thread(target=worker, name="PlexMusicIndex", daemon=True).start()
+
+    def _refresh_music_index(self, section: MusicSection, index: Optional[MusicIndex]) -> Optional[MusicIndex]:
+        if index is None or not len(index) or index.needs_rebuild(_MUSIC_INDEX_REBUILD_AGE):
+            return self._build_music_index(section)
+        return self._update_music_index(section, index)
+
+    def _update_music_index(self, section: MusicSection, index: MusicIndex) -> Optional[MusicIndex]:
+        """Fold the albums and tracks updated since the index was built into a new generation."""
+        started = time.perf_counter()
+        built_at = time.time()
+        updated_filter = f"&updatedAt>>={int(index.built_at) - _MUSIC_INDEX_UPDATE_SLACK}"
+        albums = list(self._iter_section_items(section, libtype=9, filters=updated_filter))
+        tracks = list(self._iter_section_items(section, libtype=10, filters=updated_filter))
+        updated = index.updated(albums, tracks, built_at=built_at)
+        # updatedAt cannot reveal deletions; start over when the totals no longer agree.
+        for libtype, count in ((10, len(updated)), (9, updated.album_count)):
+            total = self._section_total(section, libtype)
+            if total is not None and total != count:
+                print(f"[MusicIndex] Index holds {count} of {total} items of type {libtype}; rebuilding.")
+                return self._build_music_index(section)
+        updated = self._install_music_index(section, updated)
+        elapsed = time.perf_counter() - started
+        print(
+            f"[MusicIndex] Updated {len(tracks)} tracks and {len(albums)} albums "
+            f"for '{getattr(section, 'title', index.section_id)}' in {elapsed:.1f}s."
+        )
+        return updated
+
+    def _section_total(self, section: MusicSection, libtype: int) -> Optional[int]:
+        section_key = getattr(section, "key", None)
+        if not section_key:
+            return None
+        server = getattr(section, "_server", None) or self.ensure_server()
+        try:
+            container = server.query(
+                f"/library/sections/{section_key}/all",
+                params={"type": libtype, "X-Plex-Container-Start": 0, "X-Plex-Container-Size": 0},
+            )
+            return int(container.attrib.get("totalSize"))
+        except Exception as exc:  # noqa: BLE001
+            print(f"[MusicIndex] Unable to count items of type {libtype}: {exc}")
+            return None
+
+    def _build_music_index(self, section: MusicSection) -> Optional[MusicIndex]:
+        cache_key = self._radio_cache_key(section)
+        started = time.perf_counter()
+        index = MusicIndex(cache_key)
+        index.add_albums(self._iter_section_items(section, libtype=9))
+        index.add_tracks(self._iter_section_items(section, libtype=10))
+        if not len(index):
+            return None
+        index.mark_built()
+        index = self._install_music_index(section, index)
+        elapsed = time.perf_counter() - started
+        print(
+            f"[MusicIndex] Indexed {len(index)} tracks and {index.album_count} albums "
+            f"for '{getattr(section, 'title', cache_key)}' in {elapsed:.1f}s."
+        )
+        return index
+
+    def _install_music_index(self, section: MusicSection, index: MusicIndex) -> MusicIndex:
+        """Persist a freshly built index, swap it in and prune the generation it replaces."""
+        cache_key = self._radio_cache_key(section)
+        directory = self._music_index_dir(section)
+        if directory is not None:
+            try:
+                index.save(directory)
+                index = MusicIndex.load(directory) or index
+            except Exception as exc:  # noqa: BLE001
+                print(f"[MusicIndex] Unable to persist music index: {exc}")
+        with self._music_index_lock:
+            self._music_indexes[cache_key] = index
+        if directory is not None:
+            # The replaced index unmaps its generation once nothing (such as a running radio)
+            # still uses it; pruning again on the next load catches anything still locked now.
+            MusicIndex.prune(directory)
+        return index
+
+    def _iter_section_items(
+        self,
+        section: MusicSection,
+        *,
+        libtype: int,
+        page_size: int = _MUSIC_INDEX_PAGE_SIZE,
+        filters: str = "",
+    ) -> Iterable[PlexObject]:
+        section_key = getattr(section, "key", None)
+        if not section_key:
+            return
+        server = getattr(section, "_server", None) or self.ensure_server()
+        base_path = f"/library/sections/{section_key}/all?type={libtype}{filters}"
+        start = 0
+        while True:
+            path = self._augment_container_path(base_path, size=page_size, start=start)
+            items = list(server.fetchItems(path))
+            if not items:
+                break
+            yield from items
+            if len(items) < page_size:
+                break
+            start += len(items)
+
     def _pick_synthetic_seed_track(
         self,
         section: MusicSection,
@@ -1451,7 +1929,13 @@ class PlexService:
         if action in {"library_radio", "recent_radio", "shuffle_radio"}:
             section = cast(MusicSection, option.data.get("section"))
             mode = option.data.get("mode", action)
-            return self._start_synthetic_radio(section, mode, option.label or option.id)
+            seed_key = option.data.get("seed_rating_key")
+            return self._start_synthetic_radio(
+                section,
+                mode,
+                option.label or option.id,
+                seed_rating_key=str(seed_key) if seed_key else None,
+            )
         raise RuntimeError(f"Unsupported radio option action '{action}'.")
 
     def start_playlist(self, playlist: PlexObject) -> tuple[PlayableMedia, RadioSession]:
@@ -1470,6 +1954,8 @@ class PlexService:
     def next_radio_track(self, session: RadioSession) -> Optional[Tuple[PlayableMedia, int]]:
         queue = session.queue
         next_index = session.current_index + 1
+        if isinstance(queue, LocalRadioQueue):
+            queue.ensure_ahead(next_index)
         attempts = 0
         while attempts < 3:
             items = list(queue.items)
@@ -1501,23 +1987,61 @@ class PlexService:
             "photo",
         }
 
-    def to_playable(self, node: PlexObject) -> Optional[PlayableMedia]:
+    def to_playable(self, node: PlexObject, *, decide: bool = True) -> Optional[PlayableMedia]:
+        """Build a PlayableMedia; listing paths pass decide=False to avoid the transcode decision call."""
         if not self.is_playable(node):
             return None
         candidate = node
-        direct_url, fallback_url = self._derive_stream_urls(candidate)
-        if not direct_url and not fallback_url:
-            candidate = self._ensure_item_loaded(candidate)
-            direct_url, fallback_url = self._derive_stream_urls(candidate)
-            if not direct_url and not fallback_url:
-                return None
+        resume_offset = int(getattr(candidate, "viewOffset", 0) or 0)
+        local_path = self._offline_file(candidate) or self._cached_audio_file(candidate)
+        if local_path is not None:
+            local_url = local_path.resolve().as_uri()
+            return PlayableMedia(
+                title=getattr(candidate, "title", str(candidate)),
+                media_type=getattr(candidate, "type", "unknown"),
+                key=candidate.key,
+                stream_url=local_url,
+                browser_url=local_url,
+                resume_offset=resume_offset,
+                item=candidate,
+                preferred_url=local_url,
+                candidates=[local_url],
+                seek_index_url=self._seek_index_url(candidate),
+            )
+        cached = self._cached_stream(candidate)
+        if (
+            cached is not None
+            and cached.provisional
+            and decide
+            and self._stream_planner.meter.estimate(cached.server_id) is not None
+        ):
+            # Planned before the link was measured; plan again now that throughput is known.
+            cached = None
+        if cached is not None:
+            candidates = list(cached.candidates)
+            if cached.resume_offset != resume_offset:
+                candidates = [self._with_stream_offset(url, resume_offset) for url in candidates]
+            preferred_url = cached.preferred_url
+        else:
+            plan = self._plan_stream(candidate, decide=decide)
+            candidates = self._derive_stream_urls(candidate, plan)
+            if not candidates:
+                candidate = self._ensure_item_loaded(candidate)
+                plan = self._plan_stream(candidate, decide=decide)
+                candidates = self._derive_stream_urls(candidate, plan)
+                if not candidates:
+                    return None
+            resume_offset = int(getattr(candidate, "viewOffset", 0) or 0)
+            self._store_stream(
+                candidate, candidates, resume_offset, provisional=plan.throughput is None or plan.deferred
+            )
+            preferred_url = None
         title = getattr(candidate, "title", str(candidate))
         media_type = getattr(candidate, "type", "unknown")
-        stream_url = direct_url or fallback_url
-        browser_url = fallback_url or direct_url
-        if not stream_url:
-            return None
-        resume_offset = int(getattr(candidate, "viewOffset", 0) or 0)
+        stream_url = candidates[0]
+        browser_url = candidates[1] if len(candidates) > 1 else stream_url
+        if preferred_url not in candidates:
+            preferred_url = None
         return PlayableMedia(
             title=title,
             media_type=media_type,
@@ -1526,8 +2050,89 @@ class PlexService:
             browser_url=browser_url,
             resume_offset=resume_offset,
             item=candidate,
+            preferred_url=preferred_url,
+            candidates=candidates,
+            seek_index_url=self._seek_index_url(candidate),
         )
 
+    @staticmethod
+    def _first_part_key(node: PlexObject) -> str:
+        try:
+            media = getattr(node, "media", None)
+            parts = getattr(media[0], "parts", None) if media else None
+            return str(getattr(parts[0], "key", "") or "") if parts else ""
+        except Exception:  # noqa: BLE001
+            return ""
+
+    @staticmethod
+    def _first_part_size(node: PlexObject) -> Optional[int]:
+        try:
+            media = getattr(node, "media", None)
+            parts = getattr(media[0], "parts", None) if media else None
+            size = getattr(parts[0], "size", None) if parts else None
+            return int(size) if size else None
+        except Exception:  # noqa: BLE001
+            return None
+
+    def _stream_cache_key(self, node: PlexObject) -> Optional[Tuple[str, str, str]]:
+        server = self._server
+        rating_key = getattr(node, "ratingKey", None)
+        if server is None or rating_key in (None, ""):
+            return None
+        server_id = str(getattr(server, "machineIdentifier", "") or self._current_resource_id or "")
+        token = str(getattr(server, "_token", "") or "")
+        return server_id, str(rating_key), token
+
+    def _cached_stream(self, node: PlexObject) -> Optional[ResolvedStream]:
+        cache_key = self._stream_cache_key(node)
+        if cache_key is None:
+            return None
+        server_id, rating_key, token = cache_key
+        return self._stream_cache.get(server_id, rating_key, token=token, part_key=self._first_part_key(node))
+
+    def _store_stream(
+        self,
+        node: PlexObject,
+        candidates: Sequence[str],
+        resume_offset: int,
+        *,
+        provisional: bool = False,
+    ) -> None:
+        cache_key = self._stream_cache_key(node)
+        if cache_key is None:
+            return
+        server_id, rating_key, token = cache_key
+        self._stream_cache.put(
+            server_id,
+            rating_key,
+            ResolvedStream(
+                server_id=server_id,
+                candidates=tuple(candidates),
+                part_key=self._first_part_key(node),
+                token=token,
+                resume_offset=resume_offset,
+                resolved_at=time.monotonic(),
+                provisional=provisional,
+            ),
+        )
+
+    def record_stream_result(self, media: PlayableMedia, url: Optional[str]) -> None:
+        """Remember which stream URL started playing, or forget it after a failure."""
+        cache_key = self._stream_cache_key(media.item)
+        if cache_key is None:
+            return
+        server_id, rating_key, _token = cache_key
+        self._stream_cache.remember(server_id, rating_key, url)
+
+    @staticmethod
+    def _with_stream_offset(url: str, offset: int) -> str:
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        if "offset" not in query:
+            return url
+        query["offset"] = str(offset)
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
     def resolve_playable(self, node: Optional[PlexObject]) -> Optional[PlayableMedia]:
         if node is None:
             return None
@@ -1556,44 +2161,106 @@ class PlexService:
                     return playable
         return None
 
-    def _derive_stream_urls(self, node: PlexObject) -> tuple[Optional[str], Optional[str]]:
-        server = self.ensure_server()
-        direct_url: Optional[str] = None
-        fallback_url: Optional[str] = None
-        resume_offset = int(getattr(node, "viewOffset", 0) or 0)
+    def _direct_part_url(self, server: PlexServer, node: PlexObject) -> Optional[str]:
+        media = getattr(node, "media", None)
+        if not media:
+            return None
+        parts = getattr(media[0], "parts", None)
+        if not parts:
+            return None
+        part: MediaPart = parts[0]
+        return self._ensure_plex_params(
+            server.url(part.key),
+            token=server._token,  # noqa: SLF001
+            ensure_download=True,
+        )
 
+    def _seek_index_url(self, node: PlexObject) -> Optional[str]:
+        """Return the URL of the part's BIF preview thumbnails, when the server generated them."""
+        server = self._server
         media = getattr(node, "media", None)
-        if media:
-            first_media = media[0]
-            parts = getattr(first_media, "parts", None)
-            if parts:
-                part: MediaPart = parts[0]
-                direct_candidate = server.url(part.key)
-                direct_url = self._ensure_plex_params(
-                    direct_candidate,
-                    token=server._token,  # noqa: SLF001
-                    ensure_download=True,
-                )
+        parts = getattr(media[0], "parts", None) if media else None
+        if server is None or not parts:
+            return None
+        part = parts[0]
+        indexes = getattr(part, "indexes", None)
+        part_id = getattr(part, "id", None)
+        if not isinstance(indexes, str) or "sd" not in indexes.split(",") or part_id is None:
+            return None
+        return self._ensure_plex_params(
+            server.url(f"/library/parts/{part_id}/indexes/sd"),
+            token=server._token,  # noqa: SLF001
+        )
+
+    def _plan_stream(self, node: PlexObject, *, decide: bool = True) -> StreamPlan:
+        server = self.ensure_server()
+        server_id = str(getattr(server, "machineIdentifier", "") or self._current_resource_id or "")
+        media = getattr(node, "media", None)
+        try:
+            media_bitrate = int(getattr(media[0], "bitrate", 0) or 0) if media else 0
+        except (TypeError, ValueError):
+            media_bitrate = 0
+        plan = self._stream_planner.plan(
+            server,
+            server_id,
+            str(getattr(node, "key", "") or ""),
+            audio=getattr(node, "type", "") == "track",
+            media_bitrate=media_bitrate,
+            offset=int(getattr(node, "viewOffset", 0) or 0),
+            # Sampling downloads part of the file; only a real playback decision may start it.
+            sample_url=self._direct_part_url(server, node) if decide else None,
+            decide=decide,
+        )
+        if plan.throughput is not None:
+            print(
+                f"[Planner] {plan.decision} for '{getattr(node, 'title', '')}' "
+                f"({media_bitrate} kbps over {plan.throughput} kbps): {'; '.join(plan.reasons)}"
+            )
+        return plan
+
+    def _derive_stream_urls(self, node: PlexObject, plan: Optional[StreamPlan] = None) -> List[str]:
+        """Return stream URLs for the node, best candidate first for the planned delivery."""
+        server = self.ensure_server()
+        token = server._token  # noqa: SLF001
+        resume_offset = int(getattr(node, "viewOffset", 0) or 0)
+        direct_url = self._direct_part_url(server, node)
+        fallback_url: Optional[str] = None
+        capped_url: Optional[str] = None
 
         if hasattr(node, "getStreamURL"):
             try:
                 fallback_url = node.getStreamURL(offset=resume_offset)
             except Exception:  # noqa: BLE001 - best effort, continue to other fallbacks
                 fallback_url = None
+            if plan is not None and plan.max_bitrate:
+                try:
+                    capped_url = node.getStreamURL(
+                        offset=resume_offset,
+                        maxVideoBitrate=plan.max_bitrate,
+                        videoResolution=plan.resolution or "",
+                    )
+                except Exception:  # noqa: BLE001
+                    capped_url = None
 
         if not fallback_url and getattr(node, "key", None):
-            fallback_candidate = server.url(node.key)
-            fallback_url = self._ensure_plex_params(
-                fallback_candidate,
-                token=server._token,  # noqa: SLF001
-            )
+            fallback_url = self._ensure_plex_params(server.url(node.key), token=token)
         elif fallback_url:
-            fallback_url = self._ensure_plex_params(
-                fallback_url,
-                token=server._token,  # noqa: SLF001
-            )
-
-        return direct_url, fallback_url
+            fallback_url = self._ensure_plex_params(fallback_url, token=token)
+        if capped_url:
+            capped_url = self._ensure_plex_params(capped_url, token=token)
+
+        decision = plan.decision if plan is not None else DIRECT_PLAY
+        if decision == DIRECT_PLAY:
+            ranked = [direct_url, fallback_url]
+        elif decision == DIRECT_STREAM:
+            ranked = [fallback_url, direct_url]
+        else:
+            ranked = [capped_url, fallback_url, direct_url]
+        candidates: List[str] = []
+        for url in ranked:
+            if url and url not in candidates:
+                candidates.append(url)
+        return candidates
 
     @staticmethod
     def _ensure_plex_params(url: str, *, token: str, ensure_download: bool = False) -> str:
@@ -1627,18 +2294,100 @@ class PlexService:
         server = self.ensure_server()
         return server.fetchItem(f"/library/metadata/{rating_key}")
 
+    def playable_by_key(self, rating_key: str) -> Optional[PlayableMedia]:
+        """Listing-grade to_playable(fetch_item(rating_key)), reused until the item changes on the server.
+
+        Each call returns its own copy, so callers may adjust resume_offset freely.
+        """
+        rating_key = str(rating_key)
+        with self._playable_by_key_lock:
+            cached = self._playable_by_key.get(rating_key)
+        if cached is None or time.monotonic() - cached[0] >= _PLAYABLE_BY_KEY_TTL:
+            resolved_at = time.monotonic()
+            playable = self.to_playable(self.fetch_item(rating_key), decide=False)
+            with self._playable_by_key_lock:
+                self._playable_by_key[rating_key] = (resolved_at, playable)
+        else:
+            playable = cached[1]
+        return replace(playable) if playable is not None else None
+
+    def _invalidate_playable_by_key(self, rating_key: object = None) -> None:
+        with self._playable_by_key_lock:
+            if rating_key in (None, ""):
+                self._playable_by_key.clear()
+            else:
+                self._playable_by_key.pop(str(rating_key), None)
+
     def update_progress_by_key(self, rating_key: str, position: int, duration: int, state: str = "stopped") -> tuple[str, int]:
-        item = self.fetch_item(rating_key)
-        media = PlayableMedia(
-            title=getattr(item, "title", str(item)),
-            media_type=getattr(item, "type", "unknown"),
-            key=item.key,
-            stream_url="",
-            browser_url=None,
-            resume_offset=int(getattr(item, "viewOffset", 0) or 0),
-            item=item,
-        )
-        return self.update_timeline(media, state, position, duration)
+        """Send cached progress straight to the timeline endpoints, without loading the item.
+
+        Returns the state that was sent and the server's viewOffset once it matches what was sent;
+        0 means the update is not confirmed yet and should stay pending.
+        At most _PROGRESS_SEND_CONCURRENCY of these run against one server at a time.
+        """
+        server = self.ensure_server()
+        bounded_position = max(0, min(position, duration) if duration else position)
+        send_state, near_completion = self._timeline_send_state(state, bounded_position, duration)
+        rating_key = str(rating_key)
+        with self._progress_slots():
+            params: Dict[str, object] = {
+                "ratingKey": rating_key,
+                "key": f"/library/metadata/{rating_key}",
+                "identifier": _LIBRARY_IDENTIFIER,
+                "time": bounded_position,
+                "state": send_state,
+                "duration": duration,
+            }
+            server.query("/:/timeline", params=params, timeout=_TIMELINE_CONFIRM_TIMEOUT)
+            if near_completion:
+                server.query(
+                    "/:/scrobble",
+                    params={"key": rating_key, "identifier": _LIBRARY_IDENTIFIER},
+                    timeout=_TIMELINE_CONFIRM_TIMEOUT,
+                )
+            elif bounded_position > 0:
+                server.query(
+                    "/:/progress",
+                    params={
+                        "key": rating_key,
+                        "identifier": _LIBRARY_IDENTIFIER,
+                        "time": bounded_position,
+                        "state": send_state,
+                    },
+                    timeout=_TIMELINE_CONFIRM_TIMEOUT,
+                )
+            server_offset = self._fetch_view_offset_by_key(rating_key)
+        self._invalidate_episode_index(rating_key)
+        if server_offset is None:
+            return send_state, 0
+        if near_completion:
+            # Scrobbling clears the resume point; an empty (or finished) offset means it was applied.
+            if server_offset == 0 or server_offset >= duration - _TIMELINE_CONFIRM_TOLERANCE:
+                return send_state, duration
+            return send_state, 0
+        if abs(server_offset - bounded_position) > _TIMELINE_CONFIRM_TOLERANCE:
+            # Still the old offset: the server has not applied this update yet, so keep it pending.
+            return send_state, 0
+        return send_state, server_offset
+
+    def _progress_slots(self) -> threading.BoundedSemaphore:
+        server_id = self.current_server_id()
+        with self._timeline_confirm_lock:
+            slots = self._progress_semaphores.get(server_id)
+            if slots is None:
+                slots = self._progress_semaphores[server_id] = threading.BoundedSemaphore(
+                    _PROGRESS_SEND_CONCURRENCY
+                )
+            return slots
+
+    @staticmethod
+    def _timeline_send_state(state: str, position: int, duration: int) -> Tuple[str, bool]:
+        """Map a player state to the one sent to Plex; stopping early is sent as paused to stay resumable."""
+        if state == "stopped" and duration:
+            if position >= int(duration * 0.97):
+                return state, True
+            return "paused", False
+        return state, False
 
     @staticmethod
     def _resolve_related(item: PlexObject, attr_name: str) -> Optional[PlexObject]:
@@ -1715,13 +2464,21 @@ class PlexService:
                 self._season_first_episode_cache[cache_key] = episode
         return episode
 
-    def _next_episode_in_season(self, episode: PlexObject, season: Optional[PlexObject]) -> Optional[PlexObject]:
+    def _next_episode_in_season(
+        self,
+        episode: PlexObject,
+        season: Optional[PlexObject],
+        lookups: Optional[_SharedLookups] = None,
+    ) -> Optional[PlexObject]:
         if season is None:
             return None
         current_key = getattr(episode, "ratingKey", None)
         current_index = getattr(episode, "index", None)
         try:
-            episodes = list(season.episodes())
+            if lookups is None:
+                episodes = list(season.episodes())
+            else:
+                episodes = list(lookups.get("episodes", getattr(season, "ratingKey", None), lambda: list(season.episodes())))
         except Exception:
             return None
         if not episodes:
@@ -1749,13 +2506,21 @@ class PlexService:
                 return candidate
         return None
 
-    def _next_episode_after_season(self, season: Optional[PlexObject], show: Optional[PlexObject]) -> Optional[PlexObject]:
+    def _next_episode_after_season(
+        self,
+        season: Optional[PlexObject],
+        show: Optional[PlexObject],
+        lookups: Optional[_SharedLookups] = None,
+    ) -> Optional[PlexObject]:
         if show is None:
             return None
         current_season_key = getattr(season, "ratingKey", None) if season else None
         current_index = getattr(season, "index", None) if season else None
         try:
-            seasons = list(show.seasons())
+            if lookups is None:
+                seasons = list(show.seasons())
+            else:
+                seasons = list(lookups.get("seasons", getattr(show, "ratingKey", None), lambda: list(show.seasons())))
         except Exception:
             return None
         if not seasons:
@@ -1868,23 +2633,107 @@ class PlexService:
                 return item
         return None
 
-    def find_next_episode(self, item: PlexObject) -> Optional[PlexObject]:
+    def find_next_episode(self, item: PlexObject, lookups: Optional[_SharedLookups] = None) -> Optional[PlexObject]:
         if getattr(item, "type", "") != "episode":
             return None
         current_key = getattr(item, "ratingKey", None)
-        show = self._resolve_related(item, "show")
-        if show is not None:
-            try:
-                next_item = show.onDeck()
-            except Exception:
-                next_item = None
-            if next_item and getattr(next_item, "ratingKey", None) not in {None, current_key}:
-                return next_item
-        season = self._resolve_related(item, "season")
-        next_item = self._next_episode_in_season(item, season)
+        show_key = getattr(item, "grandparentRatingKey", None)
+        if lookups is None:
+            index = self._episode_index(show_key)
+        else:
+            index = lookups.get("episodeIndex", show_key, lambda: self._episode_index(show_key))
+        if index is not None and current_key in index:
+            record = index.next_after(str(current_key))
+            return index.item(record.rating_key) if record is not None else None
+        # Not indexed (no show key, or allLeaves failed): ask the server step by step.
+        show = self._related_show(item, lookups)
+        next_item = self._show_on_deck(show, lookups)
+        if next_item and getattr(next_item, "ratingKey", None) not in {None, current_key}:
+            return next_item
+        season = self._related_season(item, lookups)
+        next_item = self._next_episode_in_season(item, season, lookups)
         if next_item:
             return next_item
-        return self._next_episode_after_season(season, show)
+        return self._next_episode_after_season(season, show, lookups)
+
+    def _episode_index(self, show_key: object) -> Optional[EpisodeIndex]:
+        """The cached play-order index of a show's episodes, built from one allLeaves request."""
+        if show_key in (None, ""):
+            return None
+        show_key = str(show_key)
+        with self._episode_index_lock:
+            index = self._episode_indexes.get(show_key)
+            if index is not None and time.monotonic() - index.built_at < _EPISODE_INDEX_TTL:
+                return index
+            generation = self._episode_index_generations.get(show_key, 0)
+            self._episode_index_building[show_key] = self._episode_index_building.get(show_key, 0) + 1
+        try:
+            episodes = self.ensure_server().fetchItems(f"/library/metadata/{show_key}/allLeaves")
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Episodes] Unable to index show {show_key}: {exc}")
+            episodes = None
+        with self._episode_index_lock:
+            remaining = self._episode_index_building.pop(show_key) - 1
+            if remaining:
+                self._episode_index_building[show_key] = remaining
+            if episodes is None:
+                return None
+            index = EpisodeIndex(show_key, episodes)
+            # An alert that arrived during the request may describe a change the listing missed.
+            if generation == self._episode_index_generations.get(show_key, 0):
+                self._episode_indexes[show_key] = index
+                for key in index.keys():
+                    self._episode_index_owners[key] = show_key
+        return index
+
+    def _invalidate_episode_index(self, rating_key: object = None) -> None:
+        """Drop the index of the show owning rating_key (a show, season or episode), or all of them."""
+        with self._episode_index_lock:
+            if rating_key in (None, ""):
+                shows = set(self._episode_indexes) | set(self._episode_index_building)
+                self._episode_indexes.clear()
+                self._episode_index_owners.clear()
+            else:
+                show_key = self._episode_index_owners.get(str(rating_key))
+                if show_key is None:
+                    # The key may belong to a show whose listing is still in flight; only those can miss it.
+                    shows = {str(rating_key), *self._episode_index_building}
+                else:
+                    shows = {show_key}
+                for show in shows:
+                    index = self._episode_indexes.pop(show, None)
+                    if index is not None:
+                        for key in index.keys():
+                            self._episode_index_owners.pop(key, None)
+            for show in shows:
+                self._episode_index_generations[show] = self._episode_index_generations.get(show, 0) + 1
+
+    def _related_show(self, item: PlexObject, lookups: Optional[_SharedLookups]) -> Optional[PlexObject]:
+        if lookups is None:
+            return self._resolve_related(item, "show")
+        show_key = getattr(item, "grandparentRatingKey", None)
+        return lookups.get("show", show_key, lambda: self._resolve_related(item, "show"))
+
+    def _related_season(self, item: PlexObject, lookups: Optional[_SharedLookups]) -> Optional[PlexObject]:
+        if lookups is None:
+            return self._resolve_related(item, "season")
+        season_key = getattr(item, "parentRatingKey", None)
+        return lookups.get("season", season_key, lambda: self._resolve_related(item, "season"))
+
+    @staticmethod
+    def _show_on_deck(show: Optional[PlexObject], lookups: Optional[_SharedLookups]) -> Optional[PlexObject]:
+        if show is None:
+            return None
+
+        def load() -> Optional[PlexObject]:
+            try:
+                return show.onDeck()
+            except Exception:
+                return None
+
+        if lookups is None:
+            return load()
+        return lookups.get("onDeck", getattr(show, "ratingKey", None), load)
 
     def next_in_series(self, item: PlexObject) -> Optional[PlayableMedia]:
         next_item = self.find_next_episode(item)
@@ -1905,17 +2754,36 @@ class PlexService:
             deck = list(server.library.onDeck())
         except Exception as exc:  # noqa: BLE001
             raise RuntimeError(f"Unable to load Plex queues: {exc}") from exc
+        lookups = _SharedLookups()
+
+        def resolve(item: PlexObject) -> Tuple[Optional[PlayableMedia], Optional[PlexObject], Optional[PlayableMedia]]:
+            playable = self.to_playable(item, decide=False)
+            next_item: Optional[PlexObject] = None
+            next_playable: Optional[PlayableMedia] = None
+            if int(getattr(item, "viewOffset", 0) or 0) > 0 and int(getattr(item, "duration", 0) or 0) > 0:
+                next_item = self._determine_up_next(item, lookups)
+                if next_item is not None and getattr(next_item, "ratingKey", None):
+                    next_playable = self.to_playable(next_item, decide=False)
+            return playable, next_item, next_playable
+
+        deck = [item for item in deck if getattr(item, "ratingKey", None)]
+        if not deck:
+            return [], []
+        # map() yields in deck order, so the queues come out the same however the lookups interleave.
+        with ThreadPoolExecutor(
+            max_workers=min(_WATCH_QUEUE_WORKERS, len(deck)),
+            thread_name_prefix="PlexWatchQueue",
+        ) as executor:
+            resolved = list(executor.map(resolve, deck))
+
         continue_items: List[PlayableMedia] = []
         up_next_items: List[PlayableMedia] = []
         seen_continue: Set[str] = set()
         seen_upnext: Set[str] = set()
-        for item in deck:
+        for item, (playable, next_item, next_playable) in zip(deck, resolved):
             rating_key = getattr(item, "ratingKey", None)
-            if not rating_key:
-                continue
             view_offset = int(getattr(item, "viewOffset", 0) or 0)
             duration = int(getattr(item, "duration", 0) or 0)
-            playable = self.to_playable(item)
             if (
                 view_offset > 0
                 and duration > 0
@@ -1926,17 +2794,10 @@ class PlexService:
                 continue_items.append(playable)
                 seen_continue.add(rating_key)
             if view_offset > 0 and duration > 0 and len(up_next_items) < up_next_limit:
-                next_item = self._determine_up_next(item)
-                if next_item:
-                    next_key = getattr(next_item, "ratingKey", None)
-                    if (
-                        next_key
-                        and next_key not in seen_upnext
-                    ):
-                        next_playable = self.to_playable(next_item)
-                        if next_playable:
-                            up_next_items.append(next_playable)
-                            seen_upnext.add(next_key)
+                next_key = getattr(next_item, "ratingKey", None) if next_item is not None else None
+                if next_key and next_key not in seen_upnext and next_playable:
+                    up_next_items.append(next_playable)
+                    seen_upnext.add(next_key)
                 continue
             if playable and len(up_next_items) < up_next_limit and rating_key not in seen_upnext:
                 up_next_items.append(playable)
@@ -1945,23 +2806,25 @@ class PlexService:
                 break
         return continue_items, up_next_items
 
-    def _determine_up_next(self, item: PlexObject) -> Optional[PlexObject]:
+    def _determine_up_next(self, item: PlexObject, lookups: Optional[_SharedLookups] = None) -> Optional[PlexObject]:
         if getattr(item, "type", "") == "episode":
-            next_item = self.find_next_episode(item)
+            next_item = self.find_next_episode(item, lookups)
             if next_item:
                 return next_item
-        show = self._resolve_related(item, "show")
-        if show is None:
-            return None
-        try:
-            candidate = show.onDeck()
-        except Exception:
-            candidate = None
+        show = self._related_show(item, lookups)
+        candidate = self._show_on_deck(show, lookups)
         if candidate and getattr(candidate, "ratingKey", None) not in {None, getattr(item, "ratingKey", None)}:
             return candidate
         return None
 
     def update_timeline(self, media: PlayableMedia, state: str, position: int, duration: int) -> tuple[str, int]:
+        """Push progress and wait for the server to confirm it; prefer push_timeline off worker threads."""
+        push = self.push_timeline(media, state, position, duration)
+        server_offset = self.confirm_timeline(media, push).result()
+        return push.send_state, server_offset or 0
+
+    def push_timeline(self, media: PlayableMedia, state: str, position: int, duration: int) -> TimelinePush:
+        """Send one timeline/progress update without waiting for the server to apply it."""
         item = media.item
         bounded_duration = max(0, duration or int(getattr(item, "duration", 0) or 0))
         if bounded_duration == 0:
@@ -1975,13 +2838,16 @@ class PlexService:
             bounded_position = bounded_duration
         if bounded_position == 0 and media.resume_offset:
             bounded_position = media.resume_offset
-        near_completion = False
-        send_state = state
-        if state == "stopped" and bounded_duration:
-            if bounded_position >= int(bounded_duration * 0.97):
-                near_completion = True
-            else:
-                send_state = "paused"
+        send_state, near_completion = self._timeline_send_state(state, bounded_position, bounded_duration)
+        raw_key = getattr(item, "ratingKey", None)
+        push = TimelinePush(
+            rating_key=str(raw_key) if raw_key is not None else None,
+            state=state,
+            send_state=send_state,
+            position=bounded_position,
+            duration=bounded_duration,
+            near_completion=near_completion,
+        )
         try:
             item.updateTimeline(bounded_position, state=send_state, duration=bounded_duration)
             if bounded_position > 0 and bounded_duration:
@@ -1991,6 +2857,7 @@ class PlexService:
                 except Exception as exc:
                     print(f"[Timeline] Failed to update progress: {exc}")
             media.resume_offset = bounded_position
+            push.accepted = True
         except Exception as exc:  # noqa: BLE001
             print(f"[Timeline] Failed to update timeline: {exc}")
         if near_completion:
@@ -2000,39 +2867,141 @@ class PlexService:
                     mark()
             except Exception:
                 pass
-        tolerance = 1250
-        confirm_deadline = time.time() + 8.0
+        if state == "stopped" and getattr(item, "type", "") == "episode":
+            self._invalidate_episode_index(raw_key)
+        return push
+
+    def confirm_timeline(
+        self,
+        media: PlayableMedia,
+        push: TimelinePush,
+        callback: Optional[Callable[[int], None]] = None,
+    ) -> "Future[Optional[int]]":
+        """Check in the background that the server stored the pushed offset.
+
+        The future resolves to the server's viewOffset (0 when it could not be read). A newer
+        push for the same item ends an older confirmation early, and that one resolves to None,
+        as do confirmations requested after shutdown_timeline_confirmations(). callback only
+        sees offsets that were actually read.
+        """
+        generation = 0
+        with self._timeline_confirm_lock:
+            if self._timeline_confirm_closed:
+                closed: "Future[Optional[int]]" = Future()
+                closed.set_result(None)
+                return closed
+            if push.rating_key is not None:
+                generation = self._timeline_confirm_generation.get(push.rating_key, 0) + 1
+                self._timeline_confirm_generation[push.rating_key] = generation
+            if self._timeline_confirm_executor is None:
+                self._timeline_confirm_executor = ThreadPoolExecutor(
+                    max_workers=2,
+                    thread_name_prefix="PlexTimelineConfirm",
+                )
+            executor = self._timeline_confirm_executor
+        future = executor.submit(self._confirm_timeline_worker, media, push, generation)
+        if callback is not None:
+
+            def deliver(done: "Future[Optional[int]]") -> None:
+                if done.cancelled() or done.exception() is not None:
+                    return
+                server_offset = done.result()
+                if server_offset is None:
+                    return
+                try:
+                    callback(server_offset)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[Timeline] Confirmation callback failed: {exc}")
+
+            future.add_done_callback(deliver)
+        return future
+
+    def shutdown_timeline_confirmations(self) -> None:
+        """Abandon pending confirmations so their worker threads do not delay process exit."""
+        with self._timeline_confirm_lock:
+            self._timeline_confirm_closed = True
+            for rating_key in self._timeline_confirm_generation:
+                self._timeline_confirm_generation[rating_key] += 1
+            executor = self._timeline_confirm_executor
+            self._timeline_confirm_executor = None
+        self._timeline_confirm_stop.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timeline_confirm_superseded(self, push: TimelinePush, generation: int) -> bool:
+        with self._timeline_confirm_lock:
+            if self._timeline_confirm_closed:
+                return True
+            return push.rating_key is not None and self._timeline_confirm_generation.get(push.rating_key) != generation
+
+    def _confirm_timeline_worker(self, media: PlayableMedia, push: TimelinePush, generation: int) -> Optional[int]:
+        target = max(0, push.position - _TIMELINE_CONFIRM_TOLERANCE)
+        # Playing updates and empty positions only need one reading, as before.
+        delays: Tuple[float, ...] = ()
+        if push.position > 0 and push.send_state != "playing":
+            delays = _TIMELINE_CONFIRM_DELAYS
         server_offset = 0
-        while True:
-            try:
-                item.reload()
-            except Exception:
-                server_offset = int(getattr(item, "viewOffset", media.resume_offset) or media.resume_offset or 0)
+        for attempt in range(len(delays) + 1):
+            if attempt:
+                self._timeline_confirm_stop.wait(delays[attempt - 1])
+                if self._timeline_confirm_superseded(push, generation):
+                    return None
+                if push.state == "stopped" and push.send_state != "stopped":
+                    try:
+                        media.item.updateProgress(push.position, state="stopped")
+                    except Exception:
+                        pass
+            fetched = self._fetch_view_offset(media.item)
+            if self._timeline_confirm_superseded(push, generation):
+                return None
+            if fetched is None:
+                server_offset = int(media.resume_offset or 0)
                 break
-            server_offset = int(getattr(item, "viewOffset", media.resume_offset) or media.resume_offset or 0)
-            target = max(0, bounded_position - tolerance)
-            if (
-                bounded_position <= 0
-                or send_state == "playing"
-                or server_offset >= target
-                or time.time() >= confirm_deadline
-            ):
+            server_offset = fetched or int(media.resume_offset or 0)
+            if server_offset >= target:
                 break
-            remaining = max(0.0, confirm_deadline - time.time())
-            wait_for = min(0.5, remaining) or 0.05
-            if state == "stopped" and bounded_position > 0 and send_state != "stopped":
-                try:
-                    item.updateProgress(bounded_position, state="stopped")
-                except Exception:
-                    pass
             print(
-                f"[Timeline] Awaiting server offset update: local={bounded_position} server={server_offset} "
+                f"[Timeline] Awaiting server offset update: local={push.position} server={server_offset} "
                 f"(target>={target})"
             )
-            time.sleep(wait_for)
         if server_offset > 0:
             media.resume_offset = server_offset
-        return send_state, server_offset
+        return server_offset
+
+    def _fetch_view_offset(self, item: PlexObject) -> Optional[int]:
+        """Read only the item's viewOffset; returns None when the server cannot be asked."""
+        offset = self._fetch_view_offset_by_key(getattr(item, "ratingKey", None))
+        if offset is not None:
+            try:
+                item.viewOffset = offset
+            except Exception:  # noqa: BLE001
+                pass
+        return offset
+
+    def _fetch_view_offset_by_key(self, rating_key: object) -> Optional[int]:
+        server = self._server
+        if server is None or rating_key in (None, ""):
+            return None
+        try:
+            container = server.query(
+                f"/library/metadata/{rating_key}",
+                params={
+                    "excludeElements": _TIMELINE_CONFIRM_EXCLUDES,
+                    "excludeFields": "summary",
+                    "checkFiles": 0,
+                },
+                timeout=_TIMELINE_CONFIRM_TIMEOUT,
+            )
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Timeline] Unable to read viewOffset for {rating_key}: {exc}")
+            return None
+        element = container[0] if container is not None and len(container) else None
+        if element is None:
+            return None
+        try:
+            return int(element.attrib.get("viewOffset", 0) or 0)
+        except (TypeError, ValueError):
+            return 0
 
     def search_all_servers(
         self,
@@ -2169,6 +3138,25 @@ class PlexService:
                 return resource
         return None
 
+    def connection_type(self) -> str:
+        """Classify the active server connection as local, remote or relay."""
+        server = self._server
+        resource = self.current_resource()
+        base_url = str(getattr(server, "_baseurl", "") or "").rstrip("/")
+        if not base_url or resource is None:
+            return "unknown"
+        for connection in getattr(resource, "connections", None) or []:
+            uris = {
+                str(getattr(connection, "uri", "") or "").rstrip("/"),
+                str(getattr(connection, "httpuri", "") or "").rstrip("/"),
+            }
+            if base_url not in uris:
+                continue
+            if getattr(connection, "relay", False):
+                return "relay"
+            return "local" if getattr(connection, "local", False) else "remote"
+        return "remote"
+
     # =========================================================================
     # WATCHLIST FEATURES
     # =========================================================================
@@ -2212,6 +3200,8 @@ class PlexService:
         sort: Optional[str] = None,
     ) -> List[Playlist]:
         """Get all playlists on the server."""
+        if section_id is None and title is None and sort is None:
+            return cast(List[Playlist], self._indexed_playlists(playlist_type=playlist_type))
         server = self.ensure_server()
         return server.playlists(
             playlistType=playlist_type,
@@ -2238,7 +3228,7 @@ class PlexService:
     ) -> Playlist:
         """Create a new playlist on the server."""
         server = self.ensure_server()
-        return server.createPlaylist(
+        playlist = server.createPlaylist(
             title=title,
             section=section,
             items=items,
@@ -2248,14 +3238,18 @@ class PlexService:
             filters=filters,
             **kwargs,
         )
+        self._invalidate_playlist_index(playlist)
+        return playlist
 
     def playlist_add_items(self, playlist: Playlist, items: List[PlexObject]) -> None:
         """Add items to an existing playlist."""
         playlist.addItems(items)
+        self._invalidate_playlist_index(playlist)
 
     def playlist_remove_items(self, playlist: Playlist, items: List[PlexObject]) -> None:
         """Remove items from a playlist."""
         playlist.removeItems(items)
+        self._invalidate_playlist_index(playlist)
 
     def playlist_move_item(
         self,
@@ -2265,10 +3259,12 @@ class PlexService:
     ) -> None:
         """Move an item within a playlist."""
         playlist.moveItem(item, after=after)
+        self._playlist_items_cache.pop(f"playlist:{getattr(playlist, 'ratingKey', '')}", None)
 
     def playlist_delete(self, playlist: Playlist) -> None:
         """Delete a playlist."""
         playlist.delete()
+        self._invalidate_playlist_index(playlist)
 
     def playlist_copy_to_user(self, playlist: Playlist, user: str) -> None:
         """Copy a playlist to another user."""
@@ -2447,17 +3443,33 @@ class PlexService:
 
     def mark_watched(self, item: PlexObject) -> None:
         """Mark an item as watched."""
-        if hasattr(item, "markWatched"):
-            item.markWatched()
-        else:
-            raise NotImplementedError(f"Item type {type(item)} does not support markWatched")
+        rating_key = getattr(item, "ratingKey", None)
+        self._invalidate_watch_state(rating_key)
+        try:
+            if hasattr(item, "markWatched"):
+                item.markWatched()
+            else:
+                raise NotImplementedError(f"Item type {type(item)} does not support markWatched")
+        finally:
+            self._invalidate_watch_state(rating_key)
 
     def mark_unwatched(self, item: PlexObject) -> None:
         """Mark an item as unwatched."""
-        if hasattr(item, "markUnwatched"):
-            item.markUnwatched()
-        else:
-            raise NotImplementedError(f"Item type {type(item)} does not support markUnwatched")
+        rating_key = getattr(item, "ratingKey", None)
+        self._invalidate_watch_state(rating_key)
+        try:
+            if hasattr(item, "markUnwatched"):
+                item.markUnwatched()
+            else:
+                raise NotImplementedError(f"Item type {type(item)} does not support markUnwatched")
+        finally:
+            self._invalidate_watch_state(rating_key)
+
+    def _invalidate_watch_state(self, rating_key: object) -> None:
+        # Called before and after a watched-state change: a lookup running during the request
+        # could otherwise cache the state the server is about to replace.
+        self._invalidate_episode_index(rating_key)
+        self._invalidate_playable_by_key(rating_key)
 
     def upload_subtitles(self, item: PlexObject, filepath: str) -> None:
         """Upload subtitles to a video item."""
@@ -2730,6 +3742,18 @@ class PlexService:
         server = self.ensure_server()
         server.installUpdate()
 
+    def current_server_id(self) -> str:
+        """Identifier of the connected server, or an empty string when not connected."""
+        server = self._server
+        if server is None:
+            return ""
+        return str(getattr(server, "machineIdentifier", "") or self._current_resource_id or "")
+
+    def ping_server(self) -> None:
+        """Make the cheapest possible request to the server; raises when it cannot be reached."""
+        server = self.ensure_server()
+        server.query("/identity", timeout=_TIMELINE_CONFIRM_TIMEOUT)
+
     def server_identity(self) -> Any:
         """Get server identity information."""
         server = self.ensure_server()
@@ -2824,6 +3848,184 @@ class PlexService:
             ))
         raise NotImplementedError(f"Item type {type(item)} does not support download")
 
+    def download_manager(self) -> Optional[DownloadManager]:
+        """Return the offline download manager, or None when there is no cache directory."""
+        with self._download_manager_lock:
+            if self._download_manager is None:
+                try:
+                    root = self._config.cache_dir("downloads")
+                except Exception:
+                    return None
+                if not isinstance(root, Path):
+                    return None
+                self._download_manager = DownloadManager(root, self._resolve_download_url)
+            return self._download_manager
+
+    def offline_items(self, node: PlexObject) -> List[PlexObject]:
+        """Expand a show, season, artist, album, playlist or collection into playable items."""
+        node_type = getattr(node, "type", "") or ""
+        try:
+            if node_type in {"show", "season"}:
+                items = list(node.episodes())
+            elif node_type in {"artist", "album"}:
+                items = list(node.tracks())
+            elif node_type == "playlist":
+                items = self._playlist_items(node)
+            elif node_type == "collection":
+                items = self._collection_items(node)
+            else:
+                items = [node]
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Downloads] Unable to list items of '{getattr(node, 'title', node)}': {exc}")
+            return []
+        return [item for item in items if self.is_playable(item)]
+
+    def queue_download(self, node: PlexObject) -> List[DownloadJob]:
+        """Queue the node, or every item it contains, for offline playback."""
+        manager = self.download_manager()
+        if manager is None:
+            raise RuntimeError("Offline downloads need a writable cache directory.")
+        server = self.ensure_server()
+        server_id = str(getattr(server, "machineIdentifier", "") or self._current_resource_id or "")
+        jobs: List[DownloadJob] = []
+        for item in self.offline_items(node):
+            item = self._ensure_item_loaded(item)
+            media = getattr(item, "media", None)
+            parts = getattr(media[0], "parts", None) if media else None
+            rating_key = getattr(item, "ratingKey", None)
+            if not parts or rating_key in (None, ""):
+                continue
+            part = parts[0]
+            filename = re.split(r"[\\/]", str(getattr(part, "file", "") or ""))[-1]
+            if not filename:
+                container = getattr(part, "container", None) or getattr(media[0], "container", None) or "bin"
+                filename = f"{getattr(item, 'title', rating_key)}.{container}"
+            size = getattr(part, "size", None)
+            jobs.append(
+                manager.enqueue(
+                    server_id,
+                    str(rating_key),
+                    str(getattr(item, "title", "") or rating_key),
+                    str(part.key),
+                    filename,
+                    int(size) if size else None,
+                )
+            )
+        print(f"[Downloads] Queued {len(jobs)} item(s) from '{getattr(node, 'title', node)}'.")
+        return jobs
+
+    def _resolve_download_url(self, job: DownloadJob) -> Optional[str]:
+        server = self._server
+        if server is None:
+            return None
+        server_id = str(getattr(server, "machineIdentifier", "") or self._current_resource_id or "")
+        if server_id != job.server_id:
+            return None
+        return self._ensure_plex_params(
+            server.url(job.part_key),
+            token=server._token,  # noqa: SLF001
+            ensure_download=True,
+        )
+
+    def _offline_file(self, node: PlexObject) -> Optional[Path]:
+        cache_key = self._stream_cache_key(node)
+        if cache_key is None:
+            return None
+        manager = self.download_manager()
+        if manager is None:
+            return None
+        server_id, rating_key, _token = cache_key
+        return manager.local_path(server_id, rating_key, self._first_part_key(node))
+
+    def audio_cache(self) -> Optional[AudioCache]:
+        """Return the local track cache when the user has enabled it."""
+        if not self._config.get_audio_cache_enabled():
+            return None
+        with self._audio_cache_lock:
+            if self._audio_cache is None:
+                purge = self._audio_cache_purge
+                if purge is not None and purge.is_alive():
+                    # Re-enabled while the previous cache is still being deleted from the same root.
+                    return None
+                self._audio_cache_purge = None
+                try:
+                    root = self._config.cache_dir("audio")
+                except Exception:
+                    return None
+                if not isinstance(root, Path):
+                    return None
+                self._audio_cache = AudioCache(root, budget_bytes=self._config.get_audio_cache_budget())
+            return self._audio_cache
+
+    def set_audio_cache_enabled(self, enabled: bool) -> None:
+        """Turn the audio cache on or off; turning it off deletes the cached tracks."""
+        self._config.set_audio_cache_enabled(enabled)
+        if enabled:
+            return
+        with self._audio_cache_lock:
+            cache, self._audio_cache = self._audio_cache, None
+            purging = self._audio_cache_purge is not None and self._audio_cache_purge.is_alive()
+        if cache is None:
+            if purging:
+                return
+            try:
+                root = self._config.cache_dir("audio")
+            except Exception:
+                return
+            if not isinstance(root, Path) or not root.exists():
+                return
+            cache = AudioCache(root)
+        purge = threading.Thread(
+            target=cache.close, kwargs={"purge": True}, name="PlexAudioCachePurge", daemon=True
+        )
+        with self._audio_cache_lock:
+            self._audio_cache_purge = purge
+        purge.start()
+
+    def set_audio_cache_budget(self, megabytes: int) -> None:
+        """Store the audio cache size and evict down to it right away."""
+        self._config.set_audio_cache_budget_mb(megabytes)
+        with self._audio_cache_lock:
+            cache = self._audio_cache
+        if cache is not None:
+            cache.set_budget(self._config.get_audio_cache_budget())
+
+    def flush_audio_cache(self) -> None:
+        with self._audio_cache_lock:
+            cache = self._audio_cache
+        if cache is not None:
+            cache.flush()
+
+    def cache_audio(self, media: PlayableMedia) -> bool:
+        """Copy a track into the audio cache in the background so repeats play from disk."""
+        if media.media_type != "track" or media.stream_url.startswith("file:"):
+            return False
+        cache = self.audio_cache()
+        cache_key = self._stream_cache_key(media.item)
+        server = self._server
+        if cache is None or cache_key is None or server is None:
+            return False
+        size = self._first_part_size(media.item)
+        part_key = self._first_part_key(media.item)
+        url = self._direct_part_url(server, media.item)
+        if not size or not part_key or not url:
+            return False
+        server_id, rating_key, _token = cache_key
+        return cache.fetch(server_id, rating_key, part_key, size, url)
+
+    def _cached_audio_file(self, node: PlexObject) -> Optional[Path]:
+        if getattr(node, "type", "") != "track":
+            return None
+        cache = self.audio_cache()
+        cache_key = self._stream_cache_key(node)
+        if cache is None or cache_key is None:
+            return None
+        part_key = self._first_part_key(node)
+        if not part_key:
+            return None
+        server_id, rating_key, _token = cache_key
+        return cache.lookup(server_id, rating_key, part_key, self._first_part_size(node))
+
     def download_databases(
         self,
         savepath: Optional[str] = None,
@@ -2920,6 +4122,78 @@ class PlexService:
         server = self.ensure_server()
         return server.startAlertListener(callback=callback, callbackError=callback_error)
 
+    def ensure_alert_listener(self) -> None:
+        """Start the shared alert listener that keeps local caches in sync."""
+        with self._alert_lock:
+            listener = self._alert_listener
+            # Without websocket-client (or after the socket closed) the listener thread exits at once.
+            if listener is not None and listener.is_alive():
+                return
+            try:
+                self._alert_listener = self.start_alert_listener(
+                    callback=self._dispatch_alert,
+                    callback_error=self._handle_alert_error,
+                )
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Alerts] Unable to start alert listener: {exc}")
+
+    def stop_alert_listener(self) -> None:
+        """Stop the shared alert listener, if running."""
+        with self._alert_lock:
+            listener = self._alert_listener
+            self._alert_listener = None
+        if listener is None:
+            return
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+    def add_alert_handler(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for alerts received by the shared listener."""
+        self._alert_handlers.append(handler)
+
+    @staticmethod
+    def _alert_timeline_entries(data: Dict[str, Any], entry_type: int) -> List[Dict[str, Any]]:
+        if not isinstance(data, dict) or data.get("type") != "timeline":
+            return []
+        entries = data.get("TimelineEntry") or []
+        return [entry for entry in entries if isinstance(entry, dict) and entry.get("type") == entry_type]
+
+    def _dispatch_alert(self, data: Dict[str, Any]) -> None:
+        for handler in [self._handle_playlist_alert, self._handle_metadata_alert, *self._alert_handlers]:
+            try:
+                handler(data)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[Alerts] Alert handler failed: {exc}")
+
+    def _handle_alert_error(self, exc: Exception) -> None:
+        print(f"[Alerts] Alert listener error: {exc}")
+        # The listener's socket is gone; forget it so ensure_alert_listener can start a new one.
+        with self._alert_lock:
+            self._alert_listener = None
+
+    def _handle_playlist_alert(self, data: Dict[str, Any]) -> None:
+        for entry in self._alert_timeline_entries(data, _ALERT_TYPE_PLAYLIST):
+            self._invalidate_playlist_index(rating_key=entry.get("itemID"))
+
+    def _handle_metadata_alert(self, data: Dict[str, Any]) -> None:
+        if not isinstance(data, dict):
+            return
+        if data.get("type") == "timeline":
+            for entry in data.get("TimelineEntry") or []:
+                if not isinstance(entry, dict):
+                    continue
+                # Metadata changed on the server (edit, rescan, new media, deletion).
+                self._invalidate_playable_by_key(entry.get("itemID"))
+                if entry.get("type") in _ALERT_TYPES_EPISODE_INDEX:
+                    self._invalidate_episode_index(entry.get("itemID"))
+        elif data.get("type") == "playing":
+            # Another client finished a session; its episode's offset and view count have changed.
+            for entry in data.get("PlaySessionStateNotification") or []:
+                if isinstance(entry, dict) and entry.get("state") == "stopped":
+                    self._invalidate_episode_index(entry.get("ratingKey"))
+
     # =========================================================================
     # ACCOUNT FEATURES
     # =========================================================================
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, IO, Optional
+
+# Appends reach the OS immediately; fsync is batched because losing the last second of
+# progress on power loss is acceptable, while a disk flush per tick is not.
+JOURNAL_SYNC_EVERY = 16
+JOURNAL_SYNC_INTERVAL = 2.0
+# Rewrite the journal once it holds this many records and at least four per live entry.
+JOURNAL_COMPACT_MIN = 256
+
+PendingEntry = Dict[str, Any]
+
+
+class ProgressJournal:
+    """Append-only log of pending progress changes, replayed into a dict on load."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: Dict[str, PendingEntry] = {}
+        self._records = 0
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+        self._handle: Optional[IO[str]] = None
+        self._sync_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        self._replay()
+
+    def snapshot(self) -> Dict[str, PendingEntry]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._entries.items()}
+
+    def get(self, rating_key: str) -> PendingEntry:
+        with self._lock:
+            return dict(self._entries.get(str(rating_key), {}))
+
+    def upsert(self, rating_key: str, position: int, duration: int, state: str) -> None:
+        entry = {"position": int(max(0, position)), "duration": int(max(0, duration)), "state": state}
+        with self._lock:
+            if self._entries.get(str(rating_key)) == entry:
+                return
+            self._entries[str(rating_key)] = entry
+            self._append({"op": "set", "key": str(rating_key), **entry})
+
+    def remove(self, rating_key: str) -> None:
+        with self._lock:
+            if self._entries.pop(str(rating_key), None) is None:
+                return
+            self._append({"op": "del", "key": str(rating_key)})
+
+    def clear(self) -> None:
+        with self._lock:
+            if not self._entries and not self._records:
+                return
+            self._entries.clear()
+            self.compact()
+
+    def replace(self, entries: Dict[str, PendingEntry]) -> None:
+        """Swap in a whole set of entries, e.g. when importing them from config.json."""
+        with self._lock:
+            self._entries = {str(key): dict(value) for key, value in entries.items()}
+            self.compact()
+
+    def sync(self) -> None:
+        """Force appended records to disk."""
+        with self._lock:
+            self._cancel_sync_timer()
+            if self._handle is None or not self._unsynced:
+                return
+            try:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+            except OSError as exc:
+                print(f"[Progress] Unable to sync progress journal: {exc}")
+            self._unsynced = 0
+            self._synced_at = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self.sync()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def compact(self) -> None:
+        """Rewrite the journal as one record per live entry."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with temp_path.open("w", encoding="utf-8") as handle:
+                    for key, entry in self._entries.items():
+                        handle.write(json.dumps({"op": "set", "key": key, **entry}) + "\n")
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as exc:
+                print(f"[Progress] Unable to compact progress journal: {exc}")
+                return
+            self._records = len(self._entries)
+            self._unsynced = 0
+            self._synced_at = time.monotonic()
+            self._cancel_sync_timer()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        try:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self.path.open("a", encoding="utf-8")
+            self._handle.write(json.dumps(record) + "\n")
+            self._handle.flush()
+        except OSError as exc:
+            print(f"[Progress] Unable to append to progress journal: {exc}")
+            return
+        self._records += 1
+        self._unsynced += 1
+        if self._records >= max(JOURNAL_COMPACT_MIN, 4 * len(self._entries)):
+            self.compact()
+        elif self._unsynced >= JOURNAL_SYNC_EVERY or time.monotonic() - self._synced_at >= JOURNAL_SYNC_INTERVAL:
+            self.sync()
+        elif self._sync_timer is None:
+            # Bound the batch window even if no further append arrives to trigger the sync.
+            self._sync_timer = threading.Timer(JOURNAL_SYNC_INTERVAL, self.sync)
+            self._sync_timer.name = "PlexProgressJournalSync"
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _cancel_sync_timer(self) -> None:
+        timer = self._sync_timer
+        self._sync_timer = None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+    def _replay(self) -> None:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+                key = str(record["key"])
+                if record.get("op") == "del":
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = {
+                        "position": int(record["position"]),
+                        "duration": int(record["duration"]),
+                        "state": str(record.get("state", "playing")),
+                    }
+            except (ValueError, KeyError, TypeError):
+                # A crash mid-append leaves at most one torn line at the end.
+                continue
+            self._records += 1
+        # Compact at startup when superseded records (or a torn final line, which the next append
+        # would otherwise be glued onto) are present.
+        if self._records > len(self._entries) or (text and not text.endswith("\n")):
+            self.compact()
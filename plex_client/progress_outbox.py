@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+# A failed entry is retried after this delay, doubling per failure up to the cap.
+ENTRY_RETRY_BASE = 5.0
+ENTRY_RETRY_MAX = 300.0
+# An unreachable server is probed after this delay, doubling per failed probe up to the cap.
+SERVER_RETRY_BASE = 10.0
+SERVER_RETRY_MAX = 600.0
+
+
+def is_offline_error(exc: BaseException) -> bool:
+    """Whether exc means the server could not be reached, rather than that it rejected the request."""
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError))
+
+
+@dataclass
+class _ServerState:
+    failures: int = 0
+    retry_at: float = 0.0
+
+
+class ProgressOutbox:
+    """Retry bookkeeping for cached progress: backoff per entry and connectivity per server.
+
+    While a server is offline nothing is sent to it; the outbox only says when to probe it next.
+    Any sign that it is reachable again (a successful send or probe, an alert, a reconnect) marks
+    it online and makes every entry due at once.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._offline: Dict[str, _ServerState] = {}
+        self._entries: Dict[str, Tuple[int, float]] = {}
+
+    def is_online(self, server_id: str) -> bool:
+        with self._lock:
+            return server_id not in self._offline
+
+    def probe_delay(self, server_id: str) -> Optional[float]:
+        """Seconds until an offline server should be probed; None while it is online."""
+        with self._lock:
+            state = self._offline.get(server_id)
+            if state is None:
+                return None
+            return max(0.0, state.retry_at - self._clock())
+
+    def entry_delay(self, rating_key: str) -> float:
+        """Seconds until a previously failed entry may be sent again; 0 when it is due."""
+        with self._lock:
+            retry = self._entries.get(rating_key)
+            return max(0.0, retry[1] - self._clock()) if retry else 0.0
+
+    def mark_offline(self, server_id: str) -> float:
+        """Record a failed send or probe; returns the delay before the next probe."""
+        with self._lock:
+            state = self._offline.setdefault(server_id, _ServerState())
+            state.failures += 1
+            delay = min(SERVER_RETRY_MAX, SERVER_RETRY_BASE * 2 ** (state.failures - 1))
+            state.retry_at = self._clock() + delay
+            return delay
+
+    def mark_online(self, server_id: str) -> bool:
+        """Record that the server answered; returns True if it had been offline."""
+        with self._lock:
+            if self._offline.pop(server_id, None) is None:
+                return False
+            # Entries that failed only because the server was gone should not wait out their backoff.
+            self._entries.clear()
+            return True
+
+    def entry_failed(self, rating_key: str) -> float:
+        """Record that the server rejected an entry; returns the delay before it is retried."""
+        with self._lock:
+            failures = self._entries.get(rating_key, (0, 0.0))[0] + 1
+            delay = min(ENTRY_RETRY_MAX, ENTRY_RETRY_BASE * 2 ** (failures - 1))
+            self._entries[rating_key] = (failures, self._clock() + delay)
+            return delay
+
+    def entry_sent(self, rating_key: str) -> None:
+        with self._lock:
+            self._entries.pop(rating_key, None)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional
+import zipfile
+
+import requests
+
+from .version import APP_USER_AGENT
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_RETRIES = 5
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+class DownloadCancelled(DownloadError):
+    pass
+
+
+def _partial_paths(dest: Path) -> tuple[Path, Path]:
+    return dest.with_name(dest.name + ".part"), dest.with_name(dest.name + ".part.json")
+
+
+def _load_validator(meta_path: Path) -> Dict[str, str]:
+    try:
+        data = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {key: str(value) for key, value in data.items() if isinstance(value, (str, int))}
+
+
+def _hash_existing(path: Path, hasher: "hashlib._Hash") -> int:
+    size = 0
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def _total_from_response(resp: requests.Response, offset: int) -> Optional[int]:
+    content_range = resp.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = resp.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length) + (offset if resp.status_code == 206 else 0)
+    return None
+
+
+def _is_retryable(exc: requests.RequestException) -> bool:
+    """Whether exc is transient: a dropped connection, a timeout, or a server-side (5xx) error."""
+    if isinstance(exc, requests.HTTPError):
+        status = getattr(exc.response, "status_code", None) or 0
+        return status >= 500 or status in (408, 429)
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError))
+
+
+def sha256_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+    _hash_existing(path, hasher)
+    return hasher.hexdigest()
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    *,
+    sha256: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    headers: Optional[Dict[str, str]] = None,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    retries: int = DOWNLOAD_RETRIES,
+    rate_limit: Optional[Callable[[int], None]] = None,
+) -> Path:
+    """Download url to dest, resuming a previous partial download when the server allows it.
+
+    Data is written to ``dest.part`` and hashed while it streams; the file only appears at
+    dest once it is complete and, when sha256 is given, verified.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part_path, meta_path = _partial_paths(dest)
+    getter = session.get if session is not None else requests.get
+    base_headers = {"User-Agent": APP_USER_AGENT}
+    base_headers.update(headers or {})
+    attempt = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise DownloadCancelled(f"Download of {dest.name} was cancelled.")
+        hasher = hashlib.sha256()
+        offset = _hash_existing(part_path, hasher) if part_path.exists() else 0
+        request_headers = dict(base_headers)
+        validator = _load_validator(meta_path) if offset else {}
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            # If-Range makes the server send the whole file when it changed since the partial was written.
+            if_range = validator.get("etag") or validator.get("last_modified")
+            if if_range:
+                request_headers["If-Range"] = if_range
+        try:
+            with getter(url, stream=True, timeout=timeout, headers=request_headers) as resp:
+                if resp.status_code == 416 and offset:
+                    total = _total_from_response(resp, 0)
+                    if total is not None and total == offset:
+                        break
+                    part_path.unlink(missing_ok=True)
+                    continue
+                resp.raise_for_status()
+                if offset and resp.status_code != 206:
+                    offset = 0
+                    hasher = hashlib.sha256()
+                total = _total_from_response(resp, offset)
+                meta = {
+                    "url": url,
+                    "etag": resp.headers.get("ETag", ""),
+                    "last_modified": resp.headers.get("Last-Modified", ""),
+                }
+                meta_path.write_text(json.dumps(meta), encoding="utf-8")
+                received = offset
+                with part_path.open("ab" if offset else "wb") as handle:
+                    for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if cancel is not None and cancel.is_set():
+                            raise DownloadCancelled(f"Download of {dest.name} was cancelled.")
+                        if not chunk:
+                            continue
+                        handle.write(chunk)
+                        hasher.update(chunk)
+                        received += len(chunk)
+                        if rate_limit is not None:
+                            rate_limit(len(chunk))
+                        if progress is not None:
+                            progress(received, total)
+                if total is not None and received < total:
+                    raise requests.ConnectionError(f"connection closed at {received} of {total} bytes")
+            break
+        except requests.RequestException as exc:
+            attempt += 1
+            if attempt > retries or not _is_retryable(exc):
+                raise DownloadError(f"Download of {dest.name} failed: {exc}") from exc
+            delay = min(30.0, 2.0 ** attempt)
+            print(f"[Download] {dest.name} interrupted ({exc}); resuming in {delay:.0f}s.")
+            time.sleep(delay)
+
+    if sha256:
+        digest = hasher.hexdigest() if part_path.exists() else ""
+        if digest.lower() != sha256.strip().lower():
+            part_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            raise DownloadError(f"{dest.name} failed SHA-256 verification.")
+    os.replace(part_path, dest)
+    meta_path.unlink(missing_ok=True)
+    return dest
+
+
+def extract_zip(archive_path: Path, target_dir: Path) -> Path:
+    """Extract archive_path into target_dir, replacing it only once extraction has succeeded."""
+    target_dir = target_dir.resolve()
+    temp_dir = target_dir.with_name(f"{target_dir.name}.extract-{os.getpid()}")
+    if temp_dir.exists():
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                member_path = (temp_dir / member.filename).resolve()
+                if member_path != temp_dir and temp_dir not in member_path.parents:
+                    raise DownloadError(f"{archive_path.name} contains an unsafe path.")
+            archive.extractall(temp_dir)
+        if target_dir.exists():
+            shutil.rmtree(target_dir)
+        os.replace(temp_dir, target_dir)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    return target_dir
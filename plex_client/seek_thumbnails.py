@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import struct
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .resumable_download import DownloadError, download_file
+from .stream_probe import shared_session
+
+BIF_MAGIC = b"\x89BIF\r\n\x1a\n"
+BIF_HEADER_SIZE = 64
+BIF_END_MARKER = 0xFFFFFFFF
+# Downloaded indexes are swept least recently used first once they exceed either limit.
+BIF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+BIF_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+class BifError(ValueError):
+    pass
+
+
+class BifIndex:
+    """Memory-mapped Roku BIF file: a table of timestamps followed by JPEG frames."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = path.open("rb")
+        try:
+            self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            self._handle.close()
+            raise BifError(f"Unable to map {path.name}: {exc}") from exc
+        try:
+            self.interval_ms, self._timestamps, self._offsets = self._parse(self._map)
+        except BifError:
+            self.close()
+            raise
+
+    @staticmethod
+    def _parse(data: mmap.mmap) -> Tuple[int, List[int], List[int]]:
+        if len(data) < BIF_HEADER_SIZE or data[:8] != BIF_MAGIC:
+            raise BifError("Not a BIF file.")
+        count, interval = struct.unpack_from("<II", data, 12)
+        interval = interval or 1000
+        timestamps: List[int] = []
+        offsets: List[int] = []
+        position = BIF_HEADER_SIZE
+        for _ in range(count + 1):
+            if position + 8 > len(data):
+                raise BifError("BIF index is truncated.")
+            timestamp, offset = struct.unpack_from("<II", data, position)
+            position += 8
+            if offset > len(data):
+                raise BifError("BIF frame offset is outside the file.")
+            offsets.append(offset)
+            if timestamp == BIF_END_MARKER:
+                break
+            timestamps.append(timestamp * interval)
+        # The end marker's offset closes the last frame.
+        if len(offsets) != len(timestamps) + 1:
+            raise BifError("BIF index has no end marker.")
+        return interval, timestamps, offsets
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def frame_at(self, position_ms: int) -> Optional[bytes]:
+        """Return the JPEG for the frame shown at position_ms, or None for an empty index."""
+        if not self._timestamps or self._map.closed:
+            return None
+        index = max(0, bisect_right(self._timestamps, max(0, position_ms)) - 1)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        if end <= start:
+            return None
+        return self._map[start:end]
+
+    def close(self) -> None:
+        try:
+            self._map.close()
+        except (AttributeError, ValueError):
+            pass
+        self._handle.close()
+
+
+def bif_cache_path(directory: Path, url: str) -> Path:
+    # Name by path only so a refreshed token still hits the cached file.
+    parts = urlsplit(url)
+    digest = hashlib.sha1(f"{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()[:20]
+    return directory / f"{digest}.bif"
+
+
+def load_bif(url: str, dest: Path) -> Optional[BifIndex]:
+    """Download the index to dest unless it is already there, then map it."""
+    try:
+        if dest.exists():
+            # The modification time doubles as the last-used time for the sweep.
+            os.utime(dest)
+        else:
+            download_file(url, dest, session=shared_session(), retries=1)
+        index = BifIndex(dest)
+    except (DownloadError, OSError, BifError) as exc:
+        print(f"[SeekThumbs] Unable to load thumbnail index: {exc}")
+        dest.unlink(missing_ok=True)
+        return None
+    prune_bif_cache(dest.parent, keep=dest)
+    return index
+
+
+def prune_bif_cache(
+    directory: Path,
+    *,
+    keep: Optional[Path] = None,
+    max_bytes: int = BIF_CACHE_MAX_BYTES,
+    max_age: float = BIF_CACHE_MAX_AGE,
+) -> None:
+    """Delete cached indexes older than max_age, then the least recently used until under max_bytes."""
+    entries: List[Tuple[float, int, Path]] = []
+    for path in directory.glob("*.bif*"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    total = sum(size for _mtime, size, _path in entries)
+    cutoff = time.time() - max_age
+    for mtime, size, path in entries:
+        if total <= max_bytes and mtime >= cutoff:
+            break
+        if path == keep or (path.suffix != ".bif" and mtime >= cutoff):
+            # Partial downloads may still be in progress; only abandoned ones are removed.
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            # Still mapped by an open player on Windows; the next sweep retries it.
+            continue
+        total -= size
+
+
+def load_bif_async(url: str, dest: Path, callback: Callable[[Optional[BifIndex]], None]) -> None:
+    def worker() -> None:
+        callback(load_bif(url, dest))
+
+    threading.Thread(target=worker, name="PlexSeekThumbs", daemon=True).start()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from typing import Optional, Tuple
+
+STREAM_CACHE_TTL = 15 * 60
+STREAM_CACHE_MAX_ENTRIES = 512
+
+
+@dataclass
+class ResolvedStream:
+    server_id: str
+    candidates: Tuple[str, ...]
+    part_key: str
+    token: str
+    resume_offset: int
+    resolved_at: float
+    preferred_url: Optional[str] = None
+    provisional: bool = False
+
+
+class StreamResolutionCache:
+    """Remembers resolved stream URLs per (server, ratingKey) and which one last played."""
+
+    def __init__(self, *, ttl: float = STREAM_CACHE_TTL, max_entries: int = STREAM_CACHE_MAX_ENTRIES) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], ResolvedStream]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(
+        self,
+        server_id: str,
+        rating_key: str,
+        *,
+        token: str,
+        part_key: str = "",
+    ) -> Optional[ResolvedStream]:
+        key = (server_id, rating_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expired = time.monotonic() - entry.resolved_at > self._ttl
+            # A new token or a replaced media part makes every stored URL useless.
+            if expired or entry.token != token or (part_key and part_key != entry.part_key):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, server_id: str, rating_key: str, entry: ResolvedStream) -> None:
+        key = (server_id, rating_key)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and entry.preferred_url is None and previous.preferred_url in entry.candidates:
+                entry.preferred_url = previous.preferred_url
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def remember(self, server_id: str, rating_key: str, url: Optional[str]) -> None:
+        """Record the candidate that started playing, or forget it when url is None."""
+        with self._lock:
+            entry = self._entries.get((server_id, rating_key))
+            if entry is None:
+                return
+            if url is None:
+                entry.preferred_url = None
+            elif url in entry.candidates:
+                entry.preferred_url = url
+
+    def invalidate(self, server_id: Optional[str] = None, rating_key: Optional[str] = None) -> None:
+        with self._lock:
+            if server_id is None and rating_key is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if server_id is not None and key[0] != server_id:
+                    continue
+                if rating_key is not None and key[1] != rating_key:
+                    continue
+                del self._entries[key]
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import requests
+
+from .stream_probe import shared_session
+
+DECISION_TIMEOUT = 3.0
+THROUGHPUT_TIMEOUT = 5.0
+THROUGHPUT_SAMPLE_BYTES = 4 * 1024 * 1024
+# The sample stops after this long so slow links are not tied up measuring themselves.
+THROUGHPUT_SAMPLE_SECONDS = 2.0
+THROUGHPUT_MIN_BYTES = 64 * 1024
+THROUGHPUT_TTL = 10 * 60
+# Direct play needs spare capacity over the file bitrate; transcodes target a share of the link.
+DIRECT_PLAY_HEADROOM = 1.5
+TRANSCODE_SHARE = 0.7
+# Same steps as the Plex quality menu, in kbps.
+VIDEO_QUALITY_LADDER: Tuple[Tuple[int, str], ...] = (
+    (20000, "1920x1080"),
+    (12000, "1920x1080"),
+    (8000, "1920x1080"),
+    (4000, "1280x720"),
+    (3000, "1280x720"),
+    (2000, "1280x720"),
+    (1500, "960x540"),
+    (720, "640x360"),
+    (320, "426x240"),
+)
+
+DIRECT_PLAY = "direct play"
+DIRECT_STREAM = "direct stream"
+TRANSCODE = "transcode"
+
+
+@dataclass
+class TranscodeDecision:
+    general_code: int = 0
+    general_text: str = ""
+    direct_play_code: int = 0
+    part_decision: str = ""
+
+    @property
+    def can_direct_play(self) -> bool:
+        return self.part_decision == "directplay" or self.direct_play_code == 1000
+
+    @property
+    def can_direct_stream(self) -> bool:
+        return self.part_decision == "copy"
+
+
+@dataclass
+class StreamPlan:
+    decision: str
+    max_bitrate: Optional[int] = None
+    resolution: Optional[str] = None
+    throughput: Optional[int] = None
+    reasons: List[str] = field(default_factory=list)
+    # True when the server decision call was skipped; the plan should be redone before playback.
+    deferred: bool = False
+
+
+def _int_attr(element: object, name: str) -> int:
+    try:
+        return int(element.attrib.get(name, 0) or 0)  # type: ignore[attr-defined]
+    except (TypeError, ValueError):
+        return 0
+
+
+def fetch_transcode_decision(
+    server: object,
+    path: str,
+    *,
+    audio: bool,
+    offset: int = 0,
+    max_bitrate: Optional[int] = None,
+    resolution: Optional[str] = None,
+) -> Optional[TranscodeDecision]:
+    """Ask the server's universal transcoder what it would do for the given item."""
+    params: Dict[str, object] = {
+        "path": path,
+        "mediaIndex": 0,
+        "partIndex": 0,
+        "protocol": "hls",
+        "directPlay": 1,
+        "directStream": 1,
+        "fastSeek": 1,
+        "copyts": 1,
+        "offset": offset,
+        "X-Plex-Platform": "Chrome",
+    }
+    if max_bitrate and not audio:
+        params["maxVideoBitrate"] = max_bitrate
+        if resolution:
+            params["videoResolution"] = resolution
+    endpoint = f"/{'music' if audio else 'video'}/:/transcode/universal/decision"
+    try:
+        container = server.query(endpoint, params=params, timeout=DECISION_TIMEOUT)  # type: ignore[attr-defined]
+    except Exception as exc:  # noqa: BLE001
+        print(f"[Planner] Transcode decision request failed: {exc}")
+        return None
+    if container is None:
+        return None
+    decision = TranscodeDecision(
+        general_code=_int_attr(container, "generalDecisionCode"),
+        general_text=str(container.attrib.get("generalDecisionText", "") or ""),
+        direct_play_code=_int_attr(container, "directPlayDecisionCode"),
+    )
+    part = container.find("./*/Media/Part")
+    if part is not None:
+        decision.part_decision = str(part.attrib.get("decision", "") or "")
+    return decision
+
+
+def ladder_step(budget_kbps: int) -> Tuple[int, str]:
+    for bitrate, resolution in VIDEO_QUALITY_LADDER:
+        if bitrate <= budget_kbps:
+            return bitrate, resolution
+    return VIDEO_QUALITY_LADDER[-1]
+
+
+class ThroughputMeter:
+    """Per-server throughput estimates from short ranged downloads."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float = THROUGHPUT_TTL,
+        sample_bytes: int = THROUGHPUT_SAMPLE_BYTES,
+        sample_seconds: float = THROUGHPUT_SAMPLE_SECONDS,
+    ) -> None:
+        self._ttl = ttl
+        self._sample_bytes = sample_bytes
+        self._sample_seconds = sample_seconds
+        self._estimates: Dict[str, Tuple[int, float]] = {}
+        self._measuring: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def estimate(self, server_id: str) -> Optional[int]:
+        """Return the last measured throughput in kbps, if it is still fresh."""
+        with self._lock:
+            entry = self._estimates.get(server_id)
+        if entry is None or time.monotonic() - entry[1] > self._ttl:
+            return None
+        return entry[0]
+
+    def record(self, server_id: str, kbps: int) -> None:
+        with self._lock:
+            self._estimates[server_id] = (kbps, time.monotonic())
+
+    def invalidate(self, server_id: Optional[str] = None) -> None:
+        with self._lock:
+            if server_id is None:
+                self._estimates.clear()
+            else:
+                self._estimates.pop(server_id, None)
+
+    def measure(self, server_id: str, url: str) -> Optional[int]:
+        # The clock starts at the first body byte so DNS, TLS and time to first byte are not
+        # counted as transfer time; the first chunk only marks that moment.
+        started: Optional[float] = None
+        elapsed = 0.0
+        received = 0
+        try:
+            resp = shared_session().get(
+                url,
+                stream=True,
+                timeout=THROUGHPUT_TIMEOUT,
+                headers={"Range": f"bytes=0-{self._sample_bytes - 1}"},
+            )
+            try:
+                if resp.status_code not in (200, 206):
+                    return None
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    if not chunk:
+                        continue
+                    if started is None:
+                        started = time.perf_counter()
+                        continue
+                    received += len(chunk)
+                    elapsed = time.perf_counter() - started
+                    if received >= self._sample_bytes or elapsed >= self._sample_seconds:
+                        break
+            finally:
+                resp.close()
+        except requests.RequestException as exc:
+            print(f"[Planner] Throughput sample failed: {exc}")
+            return None
+        # Tiny files finish before TCP ramps up and would understate the link.
+        if received < THROUGHPUT_MIN_BYTES or elapsed <= 0:
+            return None
+        kbps = int(received * 8 / 1000 / elapsed)
+        self.record(server_id, kbps)
+        print(f"[Planner] Measured {kbps} kbps to server {server_id}.")
+        return kbps
+
+    def measure_async(self, server_id: str, url: str) -> None:
+        with self._lock:
+            if server_id in self._measuring:
+                return
+            self._measuring.add(server_id)
+
+        def worker() -> None:
+            try:
+                self.measure(server_id, url)
+            finally:
+                with self._lock:
+                    self._measuring.discard(server_id)
+
+        threading.Thread(target=worker, name="PlexThroughput", daemon=True).start()
+
+
+class StreamPlanner:
+    """Chooses direct play, direct stream or a capped transcode from link capacity."""
+
+    def __init__(self, meter: Optional[ThroughputMeter] = None) -> None:
+        self.meter = meter or ThroughputMeter()
+
+    def plan(
+        self,
+        server: object,
+        server_id: str,
+        path: str,
+        *,
+        audio: bool,
+        media_bitrate: int,
+        offset: int = 0,
+        sample_url: Optional[str] = None,
+        decide: bool = True,
+    ) -> StreamPlan:
+        """Plan delivery from the cached throughput; decide=False never calls the server."""
+        throughput = self.meter.estimate(server_id)
+        if throughput is None:
+            if sample_url and decide:
+                self.meter.measure_async(server_id, sample_url)
+            return StreamPlan(DIRECT_PLAY, reasons=["throughput unknown"])
+        plan = StreamPlan(DIRECT_PLAY, throughput=throughput)
+        if not media_bitrate or media_bitrate * DIRECT_PLAY_HEADROOM <= throughput:
+            plan.reasons.append("link has headroom for the original file")
+            return plan
+
+        plan.decision = TRANSCODE
+        if audio:
+            # The music transcoder has no bitrate cap to negotiate; its default output is already small.
+            plan.reasons.append("original audio exceeds link capacity")
+            return plan
+        plan.max_bitrate, plan.resolution = ladder_step(int(throughput * TRANSCODE_SHARE))
+        if not decide:
+            plan.deferred = True
+            plan.reasons.append("decision deferred until playback; capping bitrate")
+            return plan
+        decision = fetch_transcode_decision(
+            server,
+            path,
+            audio=audio,
+            offset=offset,
+            max_bitrate=plan.max_bitrate,
+            resolution=plan.resolution,
+        )
+        if decision is None:
+            plan.reasons.append("no decision from server; capping bitrate")
+        elif decision.can_direct_play:
+            plan.decision = DIRECT_PLAY
+            plan.reasons.append(decision.general_text or "original fits the bitrate cap")
+        elif decision.can_direct_stream:
+            plan.decision = DIRECT_STREAM
+            plan.reasons.append(decision.general_text or "streams can be copied")
+        else:
+            plan.reasons.append(decision.general_text or "server will transcode")
+        return plan
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import threading
+from typing import Iterator, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .version import APP_USER_AGENT
+
+PROBE_TIMEOUT = 3.0
+PROBE_RANGE_BYTES = 1024
+_DRAIN_LIMIT = 64 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """Return the process-wide keep-alive session used for stream requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = APP_USER_AGENT
+            session.verify = False
+            _session = session
+        return _session
+
+
+def describe_stream(url: str) -> str:
+    if url.startswith("file:"):
+        return "Local"
+    return "HLS" if "m3u8" in url.lower() else "Direct"
+
+
+def probe_stream(url: str, *, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Check that a stream URL answers, fetching only its first bytes."""
+    if url.startswith("file:"):
+        return Path(url2pathname(urlsplit(url).path)).is_file()
+    try:
+        resp = shared_session().get(
+            url,
+            stream=True,
+            timeout=timeout,
+            headers={"Range": f"bytes=0-{PROBE_RANGE_BYTES - 1}"},
+        )
+    except requests.RequestException as exc:
+        print(f"[Probe] Probe error for {describe_stream(url)} stream: {exc}")
+        return False
+    try:
+        ok = resp.status_code in (200, 206)
+        length = resp.headers.get("Content-Length")
+        # Small bodies are drained so the connection goes back to the pool.
+        if resp.status_code == 206 or (length and length.isdigit() and int(length) <= _DRAIN_LIMIT):
+            resp.content  # noqa: B018
+        return ok
+    except requests.RequestException:
+        return False
+    finally:
+        resp.close()
+
+
+def probe_in_order(
+    urls: Sequence[str],
+    *,
+    timeout: float = PROBE_TIMEOUT,
+) -> Iterator[Tuple[str, bool]]:
+    """Probe every URL concurrently and yield (url, ok) in the order given.
+
+    Each result is yielded as soon as it and all better-ranked results are known,
+    so callers can start on the best working candidate without waiting for the rest.
+    """
+    if not urls:
+        return
+    executor = ThreadPoolExecutor(max_workers=min(len(urls), 4), thread_name_prefix="PlexStreamProbe")
+    try:
+        futures = [executor.submit(probe_stream, url, timeout=timeout) for url in urls]
+        for url, future in zip(urls, futures):
+            try:
+                ok = bool(future.result())
+            except Exception:  # noqa: BLE001
+                ok = False
+            yield url, ok
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Callable, Optional, Set, Tuple
+
+TimelineJob = Callable[[], None]
+
+
+class TimelineDispatcher:
+    """One worker that sends timeline updates, keeping only the newest pending update per item.
+
+    Updates for different items go out in the order they were first queued; an item never has
+    two updates in flight, so its updates reach the server in order.
+    """
+
+    def __init__(self, *, name: str = "PlexTimelineDispatch") -> None:
+        self._name = name
+        self._mailbox: "OrderedDict[str, TimelineJob]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._merged = 0
+
+    @property
+    def merged(self) -> int:
+        """Number of queued updates that were replaced by a newer one before being sent."""
+        return self._merged
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._mailbox) + len(self._in_flight)
+
+    def submit(self, key: str, job: TimelineJob) -> None:
+        with self._condition:
+            if key in self._mailbox:
+                self._merged += 1
+            self._mailbox[key] = job
+            self._ensure_worker_locked()
+            self._condition.notify_all()
+
+    def run_now(self, key: str, job: TimelineJob, *, timeout: float = 5.0) -> bool:
+        """Run job on the calling thread, replacing any queued update for key.
+
+        When an earlier update for key is still in flight after timeout, job is queued behind it
+        instead and False is returned; two updates for one item never run at once.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._mailbox.pop(key, None) is not None:
+                self._merged += 1
+            while key in self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._mailbox[key] = job
+                    self._ensure_worker_locked()
+                    return False
+                self._condition.wait(remaining)
+            self._in_flight.add(key)
+        self._execute(key, job)
+        return True
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until every queued update has been sent; returns False if the deadline passed first."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._mailbox:
+                self._ensure_worker_locked()
+            while self._mailbox or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _ensure_worker_locked(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._worker.start()
+
+    def _take_locked(self) -> Optional[Tuple[str, TimelineJob]]:
+        for key in self._mailbox:
+            if key not in self._in_flight:
+                job = self._mailbox.pop(key)
+                self._in_flight.add(key)
+                return key, job
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                entry = self._take_locked()
+                while entry is None:
+                    if not self._mailbox:
+                        self._worker = None
+                        return
+                    # Only items already in flight elsewhere are queued; wait for them to finish.
+                    self._condition.wait(0.5)
+                    entry = self._take_locked()
+            self._execute(*entry)
+
+    def _execute(self, key: str, job: TimelineJob) -> None:
+        try:
+            job()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Timeline] Dispatcher job failed: {exc}")
+        finally:
+            with self._condition:
+                self._in_flight.discard(key)
+                self._condition.notify_all()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Tuple
 
 import wx
 
@@ -8,6 +8,9 @@ from plexapi.base import PlexObject
 
 from ..plex_service import PlayableMedia
 
+# (item key, title column, second column) as shown in a queue list.
+QueueRow = Tuple[str, str, str]
+
 
 class MetadataPanel(wx.Panel):
     """Shows metadata for the selected Plex object and exposes playback actions."""
@@ -214,6 +217,8 @@ class QueuesPanel(wx.Panel):
 
         self._continue_items: List[PlayableMedia] = []
         self._upnext_items: List[PlayableMedia] = []
+        self._continue_rows: List[QueueRow] = []
+        self._upnext_rows: List[QueueRow] = []
         self._suppress_events = False
         self._accessible_refs: List[_NamedAccessible] = []
         self._continue_label = "Continue Watching"
@@ -253,27 +258,31 @@ class QueuesPanel(wx.Panel):
         root.Add(upnext_box, 1, wx.EXPAND | wx.ALL, 6)
         self.SetSizer(root)
 
+    def has_items(self) -> bool:
+        return bool(self._continue_rows or self._upnext_rows)
+
     def show_placeholders(self, continue_message: str, up_next_message: str) -> None:
         self._continue_items.clear()
         self._upnext_items.clear()
+        self._continue_rows = []
+        self._upnext_rows = []
         self._set_placeholder(self._continue_list, self._continue_placeholder, continue_message)
         self._set_placeholder(self._upnext_list, self._upnext_placeholder, up_next_message)
         self._on_select(None)
         self.Layout()
 
     def update_lists(self, continue_items: List[PlayableMedia], up_next_items: List[PlayableMedia]) -> None:
+        """Show new queue contents, rewriting only rows that changed so selection and focus stay put."""
+        previous_selection = self._selection_snapshot()
         self._continue_items = list(continue_items)
         self._upnext_items = list(up_next_items)
-        selection_restored = False
 
         if self._continue_items:
-            self._populate_list(
-                self._continue_list,
-                self._continue_items,
-                lambda media: self._format_progress(media.item),
-            )
-            self._show_list(self._continue_list, self._continue_placeholder)
+            rows = [self._queue_row(media, self._format_progress(media.item)) for media in self._continue_items]
+            self._sync_list(self._continue_list, self._continue_placeholder, self._continue_rows, rows)
+            self._continue_rows = rows
         else:
+            self._continue_rows = []
             self._continue_last_key = None
             self._continue_last_index = -1
             if self._last_focus_list == "continue":
@@ -285,13 +294,11 @@ class QueuesPanel(wx.Panel):
             )
 
         if self._upnext_items:
-            self._populate_list(
-                self._upnext_list,
-                self._upnext_items,
-                lambda media: self._format_media_type(media.item),
-            )
-            self._show_list(self._upnext_list, self._upnext_placeholder)
+            rows = [self._queue_row(media, self._format_media_type(media.item)) for media in self._upnext_items]
+            self._sync_list(self._upnext_list, self._upnext_placeholder, self._upnext_rows, rows)
+            self._upnext_rows = rows
         else:
+            self._upnext_rows = []
             self._upnext_last_key = None
             self._upnext_last_index = -1
             if self._last_focus_list == "upnext":
@@ -302,13 +309,61 @@ class QueuesPanel(wx.Panel):
                 "No upcoming episodes right now.",
             )
 
-        restored = self._restore_last_selection()
-        if restored is not None:
-            selection_restored = True
-        if not selection_restored:
-            self._on_select(None)
+        # The selected row is still showing the same item with the same text: leave it (and the
+        # metadata pane) alone instead of re-selecting it.
+        if previous_selection is None or self._selection_snapshot() != previous_selection:
+            restored = self._restore_last_selection()
+            if restored is None and previous_selection is not None:
+                self._on_select(None)
         self.Layout()
 
+    def _queue_row(self, media: PlayableMedia, secondary: str) -> QueueRow:
+        return (media.key, self._format_title(media), secondary)
+
+    def _selection_snapshot(self) -> Optional[Tuple[str, int, QueueRow]]:
+        if self._last_focus_list == "continue":
+            list_ctrl, rows = self._continue_list, self._continue_rows
+        elif self._last_focus_list == "upnext":
+            list_ctrl, rows = self._upnext_list, self._upnext_rows
+        else:
+            return None
+        index = list_ctrl.GetFirstSelected()
+        if index < 0 or index >= len(rows):
+            return None
+        return self._last_focus_list, index, rows[index]
+
+    def _sync_list(
+        self,
+        list_ctrl: wx.ListCtrl,
+        placeholder: wx.StaticText,
+        old_rows: List[QueueRow],
+        new_rows: List[QueueRow],
+    ) -> None:
+        if not list_ctrl.IsShown() or list_ctrl.GetItemCount() != len(old_rows):
+            self._populate_list(list_ctrl, new_rows)
+            self._show_list(list_ctrl, placeholder)
+            return
+        if old_rows == new_rows:
+            return
+        self._suppress_events = True
+        try:
+            list_ctrl.Freeze()
+            common = min(len(old_rows), len(new_rows))
+            for idx in range(common):
+                old, new = old_rows[idx], new_rows[idx]
+                if old[1] != new[1]:
+                    list_ctrl.SetItem(idx, 0, new[1])
+                if old[2] != new[2]:
+                    list_ctrl.SetItem(idx, 1, new[2])
+            for idx in range(len(old_rows) - 1, common - 1, -1):
+                list_ctrl.DeleteItem(idx)
+            for idx in range(common, len(new_rows)):
+                list_ctrl.InsertItem(idx, new_rows[idx][1])
+                list_ctrl.SetItem(idx, 1, new_rows[idx][2])
+        finally:
+            list_ctrl.Thaw()
+            self._suppress_events = False
+
     def _create_list(self) -> wx.ListCtrl:
         list_ctrl = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.BORDER_NONE)
         list_ctrl.SetMinSize((-1, self._MIN_LIST_HEIGHT))
@@ -325,19 +380,14 @@ class QueuesPanel(wx.Panel):
         self._upnext_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self._on_upnext_activated)
         self._upnext_list.Bind(wx.EVT_KEY_DOWN, self._on_list_key)
 
-    def _populate_list(
-        self,
-        list_ctrl: wx.ListCtrl,
-        items: List[PlayableMedia],
-        secondary_formatter: Callable[[PlayableMedia], str],
-    ) -> None:
+    def _populate_list(self, list_ctrl: wx.ListCtrl, rows: List[QueueRow]) -> None:
         self._suppress_events = True
         try:
             list_ctrl.Freeze()
             list_ctrl.DeleteAllItems()
-            for idx, media in enumerate(items):
-                list_ctrl.InsertItem(idx, self._format_title(media))
-                list_ctrl.SetItem(idx, 1, secondary_formatter(media))
+            for idx, (_key, title, secondary) in enumerate(rows):
+                list_ctrl.InsertItem(idx, title)
+                list_ctrl.SetItem(idx, 1, secondary)
             self._autosize_columns(list_ctrl)
             self._clear_selection(list_ctrl)
         finally:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 import threading
 import time
 from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, cast
@@ -13,8 +15,12 @@ from plexapi.server import PlexServer
 
 from ..auth import AuthError, AuthManager
 from ..config import ConfigStore
+from ..download_manager import DONE, FAILED, DownloadJob
+from ..playback_qos import PlaybackQosRecorder
+from ..progress_outbox import ProgressOutbox, is_offline_error
 from ..plex_service import (
     MusicAlphaBucket,
+    MusicBucketPage,
     MusicCategory,
     MusicRadioOption,
     MusicRadioStation,
@@ -23,9 +29,20 @@ from ..plex_service import (
     RadioOption,
     RadioSession,
     SearchHit,
+    TimelinePush,
 )
+from ..timeline_dispatcher import TimelineDispatcher
 from ..updater import UpdateManager
 
+# How long a synchronous (stop/shutdown) timeline push waits for the server to confirm it.
+TIMELINE_SYNC_CONFIRM_WAIT = 2.0
+# Deadline for sending queued timeline updates when the window closes.
+TIMELINE_SHUTDOWN_FLUSH = 5.0
+# Cached progress entries sent at once; the service further limits requests per server.
+PROGRESS_FLUSH_WORKERS = 4
+# How often cached progress is retried while the server is reachable.
+PROGRESS_FLUSH_INTERVAL = 10.0
+
 
 class SearchResultsDialog(wx.Dialog):
     """Dialog that streams search results as they arrive."""
@@ -494,6 +511,113 @@ class RadioChooserDialog(wx.Dialog):
             self.EndModal(wx.ID_OK)
         else:
             wx.Bell()
+
+
+class PlaybackDiagnosticsDialog(wx.Dialog):
+    """Dialog summarising playback QoS per connection type and per session."""
+
+    def __init__(self, parent: wx.Window, recorder: PlaybackQosRecorder) -> None:
+        super().__init__(parent, title="Playback Diagnostics", style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        self._recorder = recorder
+
+        summary_label = wx.StaticText(self, label="By connection type:")
+        self._summary = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.BORDER_SUNKEN)
+        self._summary.SetName("Connection Summary")
+        for index, (title, width) in enumerate(
+            (("Connection", 110), ("Sessions", 70), ("Failures", 70), ("Startup (ms)", 100),
+             ("Stalls/session", 100), ("Stall time (ms)", 110), ("Input kbps", 90), ("Lost frames", 90))
+        ):
+            self._summary.InsertColumn(index, title)
+            self._summary.SetColumnWidth(index, width)
+
+        sessions_label = wx.StaticText(self, label="Recent sessions:")
+        self._sessions = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL | wx.BORDER_SUNKEN)
+        self._sessions.SetName("Recent Sessions")
+        for index, (title, width) in enumerate(
+            (("Title", 220), ("Server", 120), ("Connection", 90), ("Stream", 70), ("Startup (ms)", 100),
+             ("Stalls", 60), ("Input kbps", 90), ("Lost frames", 90), ("Outcome", 90))
+        ):
+            self._sessions.InsertColumn(index, title)
+            self._sessions.SetColumnWidth(index, width)
+
+        export_button = wx.Button(self, wx.ID_ANY, "Export...")
+        refresh_button = wx.Button(self, wx.ID_REFRESH, "Refresh")
+        close_button = wx.Button(self, wx.ID_CANCEL, "Close")
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        button_sizer.Add(export_button, 0, wx.RIGHT, 6)
+        button_sizer.Add(refresh_button, 0, wx.RIGHT, 6)
+        button_sizer.AddStretchSpacer()
+        button_sizer.Add(close_button, 0)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(summary_label, 0, wx.ALL, 6)
+        sizer.Add(self._summary, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 6)
+        sizer.Add(sessions_label, 0, wx.ALL, 6)
+        sizer.Add(self._sessions, 2, wx.EXPAND | wx.LEFT | wx.RIGHT, 6)
+        sizer.Add(button_sizer, 0, wx.EXPAND | wx.ALL, 6)
+        self.SetSizer(sizer)
+        self.SetSize((900, 560))
+
+        export_button.Bind(wx.EVT_BUTTON, self._on_export)
+        refresh_button.Bind(wx.EVT_BUTTON, lambda _: self._populate())
+        close_button.Bind(wx.EVT_BUTTON, lambda _: self.EndModal(wx.ID_CANCEL))
+        self._populate()
+        self._summary.SetFocus()
+
+    @staticmethod
+    def _format(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    def _populate(self) -> None:
+        self._summary.DeleteAllItems()
+        for row, summary in enumerate(self._recorder.summary_by_connection()):
+            index = self._summary.InsertItem(row, summary.connection_type)
+            values = (
+                str(summary.sessions),
+                str(summary.failures),
+                self._format(summary.startup_ms_avg),
+                f"{summary.buffering_events_per_session:.2f}",
+                self._format(summary.buffering_ms_avg),
+                self._format(summary.input_kbps_avg),
+                str(summary.lost_pictures),
+            )
+            for column, value in enumerate(values, start=1):
+                self._summary.SetItem(index, column, value)
+        self._sessions.DeleteAllItems()
+        for row, session in enumerate(reversed(self._recorder.sessions())):
+            index = self._sessions.InsertItem(row, session.title)
+            values = (
+                session.server,
+                session.connection_type,
+                session.stream_kind or "-",
+                self._format(session.startup_ms),
+                str(session.buffering_events),
+                self._format(session.input_kbps_avg if session.samples else None),
+                str(session.lost_pictures),
+                session.outcome,
+            )
+            for column, value in enumerate(values, start=1):
+                self._sessions.SetItem(index, column, value)
+
+    def _on_export(self, _: wx.CommandEvent) -> None:
+        with wx.FileDialog(
+            self,
+            "Export playback diagnostics",
+            defaultFile="playback_qos.jsonl",
+            wildcard="JSON Lines (*.jsonl)|*.jsonl|All files (*.*)|*.*",
+            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT,
+        ) as dialog:
+            if dialog.ShowModal() != wx.ID_OK:
+                return
+            path = Path(dialog.GetPath())
+        try:
+            count = self._recorder.export(path)
+        except OSError as exc:
+            wx.MessageBox(f"Unable to export diagnostics: {exc}", "Plexible", wx.ICON_ERROR | wx.OK, parent=self)
+            return
+        wx.MessageBox(f"Exported {count} playback sessions.", "Plexible", wx.ICON_INFORMATION | wx.OK, parent=self)
+
+
 from .content_panel import MetadataPanel, QueuesPanel
 from .navigation import NavigationTree
 from .playback import PlaybackPanel, SEEK_STEP_MS
@@ -515,8 +639,10 @@ class MainFrame(wx.Frame):
         self._busy_info: Optional[wx.BusyInfo] = None
         self._pending_selection: Optional[SearchHit] = None
         self._queue_refresh_timer: Optional[wx.CallLater] = None
+        self._queue_refresh_active: bool = False
+        self._queue_refresh_again: bool = False
         self._last_queue_play_key: Optional[str] = None
-        self._timeline_threads: list[threading.Thread] = []
+        self._timeline_dispatcher = TimelineDispatcher()
         self._status_message: str = ""
         self._status_bar: Optional[wx.StatusBar] = None
         self._selected_object: Optional[object] = None
@@ -524,6 +650,7 @@ class MainFrame(wx.Frame):
         self._closing: bool = False
         self._progress_flush_active: bool = False
         self._progress_flush_timer: Optional[wx.CallLater] = None
+        self._progress_outbox = ProgressOutbox()
         self._last_positions: Dict[str, int] = {}
         self._selected_playlist: Optional[PlexObject] = None
         self._playlist_launching: bool = False
@@ -533,6 +660,9 @@ class MainFrame(wx.Frame):
         self._autoplay_flagged: Set[str] = set()
         self._autoplay_pending_source: Optional[str] = None
         self._autoplay_timer: Optional[wx.CallLater] = None
+        self._autoplay_preparing: Set[str] = set()
+        self._autoplay_restarting: Set[str] = set()
+        self._autoplay_waiting_source: Optional[str] = None
         self._radio_options: List[RadioOption] = []
         self._radio_loading: bool = False
         self._radio_request_token: int = 0
@@ -586,6 +716,7 @@ class MainFrame(wx.Frame):
         )
         self._playback_panel.set_state_listener(self._on_playback_state_change)
         self._playback_panel.set_timeline_callback(self._handle_timeline_update)
+        self._playback_panel.set_stream_result_callback(self._handle_stream_result)
         self._metadata_panel.set_queue_focus_handler(self._focus_queue_from_metadata)
         right_splitter.SplitHorizontally(top_splitter, self._playback_panel, sashPosition=320)
 
@@ -606,6 +737,8 @@ class MainFrame(wx.Frame):
         self._initialise_account()
         self._refresh_player_menu()
         self._update_manager.schedule_auto_check()
+        # Runs once the event loop starts, i.e. after the window is shown.
+        wx.CallAfter(self._playback_panel.warm_up)
 
     def _build_menu(self) -> None:
         menu_bar = wx.MenuBar()
@@ -616,6 +749,7 @@ class MainFrame(wx.Frame):
         self._refresh_item = file_menu.Append(wx.ID_REFRESH, "Refresh Libraries\tF5")
         self._search_item = file_menu.Append(wx.ID_FIND, "Global Search...\tCtrl+F")
         self._change_server_item = file_menu.Append(wx.ID_ANY, "Change Server...")
+        self._download_item = file_menu.Append(wx.ID_ANY, "Download for Offline\tCtrl+D")
         file_menu.AppendSeparator()
         exit_item = file_menu.Append(wx.ID_EXIT, "Exit\tCtrl+Q")
         menu_bar.Append(file_menu, "&File")
@@ -631,10 +765,15 @@ class MainFrame(wx.Frame):
         self._player_volume_down_item = player_menu.Append(wx.ID_ANY, "Volume Down\tCtrl+Down")
         self._player_fullscreen_item = player_menu.AppendCheckItem(wx.ID_ANY, "Fullscreen\tF11")
         self._player_mute_item = player_menu.AppendCheckItem(wx.ID_ANY, "Mute\tCtrl+0")
+        player_menu.AppendSeparator()
+        self._audio_cache_item = player_menu.AppendCheckItem(wx.ID_ANY, "Keep Played Music on Disk")
+        self._audio_cache_item.Check(self._config.get_audio_cache_enabled())
+        self._audio_cache_size_item = player_menu.Append(wx.ID_ANY, "Music Cache Size...")
         menu_bar.Append(player_menu, "&Player")
         self._player_menu = player_menu
 
         help_menu = wx.Menu()
+        self._diagnostics_item = help_menu.Append(wx.ID_ANY, "Playback Diagnostics...")
         self._check_updates_item = help_menu.Append(wx.ID_ANY, "Check for Updates...")
         self._auto_update_item = help_menu.AppendCheckItem(wx.ID_ANY, "Automatically Check for Updates")
         self._auto_update_item.Check(self._update_manager.is_auto_check_enabled())
@@ -647,6 +786,7 @@ class MainFrame(wx.Frame):
         self.Bind(wx.EVT_MENU, self._handle_refresh, self._refresh_item)
         self.Bind(wx.EVT_MENU, self._handle_search, self._search_item)
         self.Bind(wx.EVT_MENU, self._handle_change_server, self._change_server_item)
+        self.Bind(wx.EVT_MENU, self._handle_download_offline, self._download_item)
         self.Bind(wx.EVT_MENU, lambda _: self.Close(True), exit_item)
         self.Bind(wx.EVT_MENU, self._handle_player_play, self._player_play_item)
         self.Bind(wx.EVT_MENU, self._handle_player_pause, self._player_pause_item)
@@ -657,6 +797,9 @@ class MainFrame(wx.Frame):
         self.Bind(wx.EVT_MENU, self._handle_player_volume_down, self._player_volume_down_item)
         self.Bind(wx.EVT_MENU, self._handle_player_mute, self._player_mute_item)
         self.Bind(wx.EVT_MENU, self._handle_player_fullscreen, self._player_fullscreen_item)
+        self.Bind(wx.EVT_MENU, self._handle_toggle_audio_cache, self._audio_cache_item)
+        self.Bind(wx.EVT_MENU, self._handle_audio_cache_size, self._audio_cache_size_item)
+        self.Bind(wx.EVT_MENU, self._handle_diagnostics, self._diagnostics_item)
         self.Bind(wx.EVT_MENU, self._handle_check_updates, self._check_updates_item)
         self.Bind(wx.EVT_MENU, self._handle_toggle_auto_updates, self._auto_update_item)
 
@@ -678,9 +821,43 @@ class MainFrame(wx.Frame):
         except Exception:
             pass
 
+    def _handle_diagnostics(self, _: wx.CommandEvent) -> None:
+        dialog = PlaybackDiagnosticsDialog(self, self._playback_panel.qos)
+        try:
+            dialog.ShowModal()
+        finally:
+            dialog.Destroy()
+
     def _handle_check_updates(self, _: wx.CommandEvent) -> None:
         self._update_manager.check_for_updates(interactive=True)
 
+    def _handle_toggle_audio_cache(self, event: wx.CommandEvent) -> None:
+        enabled = bool(event.IsChecked())
+        if self._service:
+            self._service.set_audio_cache_enabled(enabled)
+        else:
+            self._config.set_audio_cache_enabled(enabled)
+        status = "Played music will be kept on disk." if enabled else "Played music will no longer be kept on disk."
+        self._set_status(status)
+
+    def _handle_audio_cache_size(self, _: wx.CommandEvent) -> None:
+        megabytes = wx.GetNumberFromUser(
+            "Disk space for played music, in megabytes. Older tracks are removed to stay within it.",
+            "Megabytes:",
+            "Music Cache Size",
+            self._config.get_audio_cache_budget_mb(),
+            0,
+            100000,
+            self,
+        )
+        if megabytes < 0:
+            return
+        if self._service:
+            self._service.set_audio_cache_budget(megabytes)
+        else:
+            self._config.set_audio_cache_budget_mb(megabytes)
+        self._set_status(f"Music cache size set to {megabytes} MB.")
+
     def _handle_toggle_auto_updates(self, event: wx.CommandEvent) -> None:
         enabled = bool(event.IsChecked())
         self._update_manager.set_auto_check_enabled(enabled)
@@ -705,6 +882,7 @@ class MainFrame(wx.Frame):
     def _set_account(self, account: MyPlexAccount) -> None:
         self._account = account
         self._service = PlexService(account, self._config)
+        self._service.add_alert_handler(self._on_server_alert)
         self._set_status(f"Signed in as {account.username}. Loading servers…")
         self._update_menu_state()
         self._load_libraries_async()
@@ -740,7 +918,11 @@ class MainFrame(wx.Frame):
         self._set_status(self._status_message)
 
         self._refresh_watch_queues()
+        self._mark_progress_server_online()
         self._flush_pending_progress()
+        if self._service:
+            self._service.ensure_alert_listener()
+            self._playback_panel.set_connection_info(server.friendlyName, self._service.connection_type())
 
     def _load_children(self, plex_object: object):
         if not self._service:
@@ -748,31 +930,59 @@ class MainFrame(wx.Frame):
         return self._service.list_children(plex_object)
 
     def _refresh_watch_queues(self) -> None:
+        """Recompute the queues; requests made while one is running collapse into a single rerun."""
         if not hasattr(self, "_queues_panel"):
             return
         self._cancel_queue_refresh_timer()
         if not self._service:
             self._queues_panel.show_placeholders("Sign in to see your queue.", "Sign in to see your queue.")
             return
+        if self._queue_refresh_active:
+            self._queue_refresh_again = True
+            return
+        self._queue_refresh_active = True
+        self._queue_refresh_again = False
 
-        self._queues_panel.show_placeholders("Loading...", "Loading...")
+        if not self._queues_panel.has_items():
+            self._queues_panel.show_placeholders("Loading...", "Loading...")
+        service = self._service
 
         def worker() -> None:
             try:
-                continue_items, up_next_items = self._service.watch_queues()  # type: ignore[union-attr]
+                continue_items, up_next_items = service.watch_queues()
                 continue_items = self._merge_pending_progress(continue_items)
             except Exception as exc:  # noqa: BLE001
                 print(f"[Queues] Unable to load queues: {exc}")
-                wx.CallAfter(
-                    self._queues_panel.show_placeholders,
-                    "Unable to load queues. Try again shortly.",
-                    "Unable to load queues. Try again shortly.",
-                )
+                wx.CallAfter(self._finish_queue_refresh, service, None)
                 return
-            wx.CallAfter(self._queues_panel.update_lists, continue_items, up_next_items)
+            wx.CallAfter(self._finish_queue_refresh, service, (continue_items, up_next_items))
 
         threading.Thread(target=worker, name="PlexQueueLoader", daemon=True).start()
 
+    def _finish_queue_refresh(
+        self,
+        service: PlexService,
+        queues: Optional[Tuple[List[PlayableMedia], List[PlayableMedia]]],
+    ) -> None:
+        self._queue_refresh_active = False
+        if self._closing:
+            return
+        if service is self._service:
+            if queues is None:
+                if self._queues_panel.has_items():
+                    # A failed refresh keeps the last good rows rather than wiping lists the user is in.
+                    print("[Queues] Refresh failed; keeping the current queues.")
+                    self._set_status("Unable to refresh queues. Showing the last loaded items.")
+                else:
+                    self._queues_panel.show_placeholders(
+                        "Unable to load queues. Try again shortly.",
+                        "Unable to load queues. Try again shortly.",
+                    )
+            else:
+                self._queues_panel.update_lists(*queues)
+        if self._queue_refresh_again or service is not self._service:
+            self._refresh_watch_queues()
+
     def _handle_selection(self, plex_object: Optional[object]) -> None:
         self._selected_object = plex_object
         self._selected_playable = None
@@ -811,7 +1021,7 @@ class MainFrame(wx.Frame):
             self._metadata_panel.update_content(plex_object, None)
             self._metadata_panel.set_radio_state(visible=False)
             return
-        if isinstance(plex_object, MusicAlphaBucket):
+        if isinstance(plex_object, (MusicAlphaBucket, MusicBucketPage)):
             self._metadata_panel.update_content(plex_object, None)
             self._metadata_panel.set_radio_state(visible=False)
             return
@@ -1419,17 +1629,101 @@ class MainFrame(wx.Frame):
             self._clear_radio_session_for_key(source_key)
             return None
         next_media, next_index = result
+        return self._store_autoplay_candidate(source_key, next_media, session=session, next_index=next_index)
+
+    def _store_autoplay_candidate(
+        self,
+        source_key: str,
+        next_media: PlayableMedia,
+        *,
+        session: Optional[RadioSession] = None,
+        next_index: Optional[int] = None,
+    ) -> Optional[str]:
         next_key_raw = getattr(next_media.item, "ratingKey", None)
         if next_key_raw is None:
             return None
         next_key = str(next_key_raw)
-        self._radio_pending_sessions[next_key] = (session, next_index)
+        if session is not None and next_index is not None:
+            self._radio_pending_sessions[next_key] = (session, next_index)
         self._autoplay_sources[source_key] = next_key
         self._autoplay_candidates[next_key] = next_media
-        self._config.remove_pending_progress(next_key)
-        self._last_positions.pop(next_key, None)
+        # Progress cached for the successor may not have reached the server yet; it is only
+        # dropped once the successor's own playback has been confirmed (see _ingest_progress).
+        self._autoplay_restarting.add(next_key)
+        if self._playback_panel.current_rating_key() == source_key:
+            self._playback_panel.set_next_media(next_media)
+        if self._service:
+            self._service.cache_audio(next_media)
         return next_key
 
+    def _prepare_successor(self, media: PlayableMedia) -> None:
+        """Work out and resolve what autoplay will start next while the current item plays."""
+        if not self._service:
+            return
+        raw_key = getattr(media.item, "ratingKey", None)
+        if raw_key is None:
+            return
+        source_key = str(raw_key)
+        if (
+            source_key in self._autoplay_sources
+            or source_key in self._autoplay_preparing
+            or source_key in self._autoplay_flagged
+        ):
+            return
+        self._autoplay_preparing.add(source_key)
+        service = self._service
+        session = self._radio_sessions.get(source_key)
+
+        def worker() -> None:
+            result: object = None
+            error: Optional[Exception] = None
+            try:
+                if session is not None:
+                    result = service.next_radio_track(session)
+                else:
+                    result = service.next_in_series(media.item)
+            except Exception as exc:  # noqa: BLE001
+                error = exc
+            wx.CallAfter(self._apply_prepared_successor, source_key, session, result, error)
+
+        threading.Thread(target=worker, name="PlexAutoplayPrepare", daemon=True).start()
+
+    def _apply_prepared_successor(
+        self,
+        source_key: str,
+        session: Optional[RadioSession],
+        result: object,
+        error: Optional[Exception],
+    ) -> None:
+        self._autoplay_preparing.discard(source_key)
+        waiting = self._autoplay_waiting_source == source_key
+        if waiting:
+            self._autoplay_waiting_source = None
+        if self._closing:
+            return
+        next_key: Optional[str] = None
+        if session is not None:
+            if self._radio_sessions.get(source_key) is not session:
+                return
+            if error is not None or not result:
+                if error is not None:
+                    print(f"[Radio] Unable to fetch next radio track: {error}")
+                self._clear_radio_session_for_key(source_key)
+                return
+            next_media, next_index = cast(Tuple[PlayableMedia, int], result)
+            next_key = self._store_autoplay_candidate(source_key, next_media, session=session, next_index=next_index)
+        else:
+            self._autoplay_flagged.add(source_key)
+            if error is not None:
+                print(f"[Autoplay] Unable to evaluate next episode for {source_key}: {error}")
+            elif result:
+                next_key = self._store_autoplay_candidate(source_key, cast(PlayableMedia, result))
+        if next_key:
+            self._autoplay_flagged.add(source_key)
+            print(f"[Autoplay] Prepared next item {next_key} from source {source_key}")
+            if waiting:
+                self._schedule_autoplay(source_key)
+
     def _on_navigation_key(self, event: wx.KeyEvent) -> None:
         code = event.GetKeyCode()
         if code == wx.WXK_RIGHT:
@@ -1457,7 +1751,7 @@ class MainFrame(wx.Frame):
     def _play_selected_object(self, plex_object: object) -> bool:
         if not self._service:
             return False
-        if isinstance(plex_object, MusicCategory) or isinstance(plex_object, MusicAlphaBucket):
+        if isinstance(plex_object, (MusicCategory, MusicAlphaBucket, MusicBucketPage)):
             item = self._nav_tree.GetSelection()
             if item and item.IsOk() and not self._nav_tree.IsExpanded(item):
                 self._nav_tree.expand_with_focus(item)
@@ -1513,7 +1807,7 @@ class MainFrame(wx.Frame):
                     if self._start_playlist_session(playlist_obj):
                         return
         rating_key = getattr(media.item, "ratingKey", None)
-        if self._service and rating_key:
+        if self._service and rating_key and self._progress_outbox.is_online(self._service.current_server_id()):
             pending = self._config.get_pending_entry(str(rating_key))
             if pending:
                 try:
@@ -1533,6 +1827,8 @@ class MainFrame(wx.Frame):
                             self._config.remove_pending_progress(str(rating_key))
                             self._last_positions[str(rating_key)] = server_offset
                 except Exception as exc:  # noqa: BLE001
+                    if is_offline_error(exc):
+                        self._progress_outbox.mark_offline(self._service.current_server_id())
                     print(f"[Progress] Unable to pre-flush {rating_key}: {exc}")
         self._schedule_progress_flush(5000)
         mode = self._playback_panel.play(media)
@@ -1602,6 +1898,36 @@ class MainFrame(wx.Frame):
             return
         self._load_libraries_async()
 
+    def _handle_download_offline(self, _: wx.CommandEvent) -> None:
+        service = self._service
+        target = self._selected_object
+        if not service or not isinstance(target, PlexObject):
+            self._set_status("Select an item, season, album or playlist to download.")
+            return
+        manager = service.download_manager()
+        if manager is None:
+            self._set_status("Offline downloads are unavailable: no cache directory.")
+            return
+        manager.add_listener(self._handle_download_event)
+        title = getattr(target, "title", "item")
+        self._set_status(f"Queueing '{title}' for offline playback...")
+
+        def worker() -> None:
+            try:
+                jobs = service.queue_download(target)
+            except Exception as exc:  # noqa: BLE001
+                wx.CallAfter(self._set_status, f"Unable to queue '{title}' for download: {exc}")
+                return
+            wx.CallAfter(self._set_status, f"Queued {len(jobs)} item(s) from '{title}' for offline playback.")
+
+        threading.Thread(target=worker, name="PlexDownloadQueue", daemon=True).start()
+
+    def _handle_download_event(self, job: DownloadJob) -> None:
+        if job.status == DONE:
+            wx.CallAfter(self._set_status, f"Downloaded '{job.title}' for offline playback.")
+        elif job.status == FAILED:
+            wx.CallAfter(self._set_status, f"Download of '{job.title}' failed: {job.error}")
+
     def _handle_search(self, _: wx.CommandEvent) -> None:
         if not self._service:
             wx.MessageBox("Sign in to search your Plex libraries.", "Plexible", wx.ICON_INFORMATION | wx.OK, parent=self)
@@ -2000,7 +2326,11 @@ class MainFrame(wx.Frame):
         self._reset_autoplay_state()
         self._last_queue_play_key = None
         self._refresh_watch_queues()
+        self._mark_progress_server_online()
         self._flush_pending_progress()
+        if self._service:
+            self._service.ensure_alert_listener()
+            self._playback_panel.set_connection_info(server.friendlyName, self._service.connection_type())
         self._set_status(f"Connected to {server.friendlyName}.")
         self._refresh_player_menu()
         if self._pending_selection:
@@ -2028,8 +2358,13 @@ class MainFrame(wx.Frame):
         self._refresh_item.Enable(signed_in)
         self._search_item.Enable(signed_in)
         self._change_server_item.Enable(signed_in)
+        self._download_item.Enable(signed_in)
         self._refresh_player_menu()
 
+    def _handle_stream_result(self, media: PlayableMedia, url: Optional[str]) -> None:
+        if self._service:
+            self._service.record_stream_result(media, url)
+
     def _handle_timeline_update(self, media: PlayableMedia, state: str, position: int, duration: int, sync: bool = False) -> None:
         if not self._service:
             return
@@ -2069,61 +2404,74 @@ class MainFrame(wx.Frame):
 
         if rating_key and near_completion:
             next_key = self._prime_autoplay_candidate(media)
-            if state == "stopped" and next_key and not self._closing:
-                self._schedule_autoplay(rating_key)
+            if state == "stopped" and not self._closing:
+                if next_key:
+                    self._schedule_autoplay(rating_key)
+                elif rating_key in self._autoplay_preparing:
+                    self._autoplay_waiting_source = rating_key
+        elif state == "playing" and rating_key and not self._closing:
+            self._service.cache_audio(media)
+            self._prepare_successor(media)
         elif state == "stopped" and rating_key and self._autoplay_pending_source == rating_key:
             self._cancel_autoplay_timer()
             self._autoplay_pending_source = None
         if state == "stopped" and rating_key and not near_completion:
             self._clear_radio_session_for_key(rating_key)
 
+        service = self._service
+        blocking = sync or self._closing
+
         def update() -> None:
-            local_offset: Optional[int] = None
-            applied_state = state
+            push: Optional[TimelinePush] = None
+            print(
+                f"[Timeline] push state={state} key={rating_key} pos={bounded_position} "
+                f"dur={bounded_duration} closing={self._closing} sync={sync}"
+            )
             try:
-                print(
-                    f"[Timeline] push state={state} key={rating_key} pos={bounded_position} "
-                    f"dur={bounded_duration} closing={self._closing} sync={sync}"
-                )
-                applied_state, local_offset = self._service.update_timeline(
-                    media,
-                    state,
-                    bounded_position,
-                    bounded_duration,
-                )  # type: ignore[union-attr]
-                if (sync or self._closing) and rating_key is not None:
-                    print(f"[Timeline] server viewOffset={local_offset} for key={rating_key}")
+                push = service.push_timeline(media, state, bounded_position, bounded_duration)
             except Exception as exc:  # noqa: BLE001
                 print(f"[Timeline] Unable to update playback status: {exc}")
-            finally:
-                if rating_key:
-                    if sync:
-                        self._ingest_progress(rating_key, bounded_position, bounded_duration, applied_state, local_offset)
-                    else:
-                        wx.CallAfter(
-                            self._ingest_progress,
-                            rating_key,
-                            bounded_position,
-                            bounded_duration,
-                            applied_state,
-                            local_offset,
-                        )
-
-        if sync or self._closing:
-            update()
-        else:
-            def worker() -> None:
+            if not rating_key:
+                return
+            applied_state = push.send_state if push is not None else state
+            if push is None or not push.accepted:
+                if blocking:
+                    self._ingest_progress(rating_key, bounded_position, bounded_duration, applied_state, None)
+                else:
+                    wx.CallAfter(
+                        self._ingest_progress, rating_key, bounded_position, bounded_duration, applied_state, None
+                    )
+                return
+            if blocking:
+                server_offset: Optional[int] = None
                 try:
-                    update()
-                finally:
-                    try:
-                        self._timeline_threads.remove(threading.current_thread())
-                    except ValueError:
-                        pass
+                    server_offset = service.confirm_timeline(media, push).result(timeout=TIMELINE_SYNC_CONFIRM_WAIT)
+                    print(f"[Timeline] server viewOffset={server_offset} for key={rating_key}")
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[Timeline] Server has not confirmed key={rating_key} yet: {exc!r}")
+                self._ingest_progress(rating_key, bounded_position, bounded_duration, applied_state, server_offset)
+                return
 
-            thread = threading.Thread(target=worker, name="PlexTimelineUpdate", daemon=True)
-            self._timeline_threads.append(thread)
-            thread.start()
+            def confirmed(server_offset: Optional[int]) -> None:
+                # None means a newer update for this item superseded the confirmation.
+                if server_offset is None or self._closing:
+                    return
+                wx.CallAfter(
+                    self._ingest_progress,
+                    rating_key,
+                    bounded_position,
+                    bounded_duration,
+                    applied_state,
+                    server_offset,
+                )
+
+            service.confirm_timeline(media, push, confirmed)
+
+        dispatch_key = rating_key or f"key:{media.key}"
+        if blocking:
+            self._timeline_dispatcher.run_now(dispatch_key, update)
+        else:
+            self._timeline_dispatcher.submit(dispatch_key, update)
 
         if self._closing:
             if rating_key:
@@ -2155,14 +2503,16 @@ class MainFrame(wx.Frame):
         if raw_key is None:
             return None
         source_key = str(raw_key)
+        existing = self._autoplay_sources.get(source_key)
+        if existing and existing in self._autoplay_candidates:
+            return existing
+        if source_key in self._autoplay_preparing:
+            return None
         if source_key in self._radio_sessions:
             next_key = self._prime_radio_autoplay(media, source_key)
             if next_key:
                 self._autoplay_flagged.add(source_key)
                 return next_key
-        existing = self._autoplay_sources.get(source_key)
-        if existing and existing in self._autoplay_candidates:
-            return existing
         if source_key in self._autoplay_flagged and not existing:
             return None
         try:
@@ -2174,14 +2524,9 @@ class MainFrame(wx.Frame):
         self._autoplay_flagged.add(source_key)
         if not next_media:
             return existing
-        next_key_raw = getattr(next_media.item, "ratingKey", None)
-        if next_key_raw is None:
+        next_key = self._store_autoplay_candidate(source_key, next_media)
+        if next_key is None:
             return existing
-        next_key = str(next_key_raw)
-        self._autoplay_sources[source_key] = next_key
-        self._autoplay_candidates[next_key] = next_media
-        self._config.remove_pending_progress(next_key)
-        self._last_positions.pop(next_key, None)
         print(f"[Autoplay] Prepared next episode {next_key} from source {source_key}")
         return next_key
 
@@ -2278,6 +2623,7 @@ class MainFrame(wx.Frame):
         self._autoplay_candidates.clear()
         self._autoplay_flagged.clear()
         self._autoplay_pending_source = None
+        self._autoplay_waiting_source = None
         self._radio_sessions.clear()
         self._radio_pending_sessions.clear()
         self._active_playlist_key = None
@@ -2446,13 +2792,14 @@ class MainFrame(wx.Frame):
         self._cancel_queue_refresh_timer()
         self._cancel_autoplay_timer()
         self._cancel_progress_flush_timer()
+        if not self._timeline_dispatcher.flush(TIMELINE_SHUTDOWN_FLUSH):
+            print(f"[Timeline] {self._timeline_dispatcher.pending()} update(s) not sent before shutdown.")
         self._flush_pending_progress_sync()
-        for thread in list(self._timeline_threads):
-            try:
-                thread.join(timeout=2.5)
-            except Exception:
-                pass
-        self._timeline_threads.clear()
+        self._config.flush()
+        if self._service:
+            self._service.stop_alert_listener()
+            self._service.shutdown_timeline_confirmations()
+            self._service.flush_audio_cache()
         event.Skip()
 
     def _schedule_queue_refresh(self, delay_ms: int = 2000) -> None:
@@ -2466,12 +2813,6 @@ class MainFrame(wx.Frame):
             except Exception:
                 pass
         self._queue_refresh_timer = None
-        # Clean up finished timeline workers
-        alive_threads: list[threading.Thread] = []
-        for thread in self._timeline_threads:
-            if thread.is_alive():
-                alive_threads.append(thread)
-        self._timeline_threads = alive_threads
 
     def _merge_pending_progress(self, continue_items: List[PlayableMedia]) -> List[PlayableMedia]:
         overrides: Dict[str, tuple[int, Optional[int]]] = {}
@@ -2512,10 +2853,9 @@ class MainFrame(wx.Frame):
             if position <= 0:
                 continue
             try:
-                item = self._service.fetch_item(rating_key)  # type: ignore[arg-type]
+                playable = self._service.playable_by_key(rating_key)
             except Exception:
                 continue
-            playable = self._service.to_playable(item)
             if not playable:
                 continue
             playable.resume_offset = position
@@ -2549,6 +2889,10 @@ class MainFrame(wx.Frame):
         if not rating_key or duration <= 0:
             return
         rating_key = str(rating_key)
+        if rating_key in self._autoplay_restarting and server_offset is not None:
+            self._autoplay_restarting.discard(rating_key)
+            self._config.remove_pending_progress(rating_key)
+            self._last_positions.pop(rating_key, None)
         server_position = server_offset if server_offset and server_offset > 0 else None
         effective = max(0, position, server_position or 0)
         if effective <= 0:
@@ -2597,40 +2941,59 @@ class MainFrame(wx.Frame):
         if not pending:
             self._cancel_progress_flush_timer()
             return
+        service = self._service
+        server_id = service.current_server_id()
+        probe_delay = self._progress_outbox.probe_delay(server_id)
+        if probe_delay:
+            # Offline: nothing is sent until the next probe, an alert or a reconnect.
+            self._schedule_progress_flush(int(probe_delay * 1000))
+            return
 
         work_items = list(pending.items())
 
         def worker() -> None:
             self._progress_flush_active = True
-            changed = self._process_pending_progress(work_items)
-            if changed:
-                wx.CallAfter(self._schedule_queue_refresh, 2000)
-            if not self._config.get_pending_progress():
-                wx.CallAfter(self._cancel_progress_flush_timer)
-            self._progress_flush_active = False
+            try:
+                if probe_delay is not None and not self._probe_progress_server(service, server_id):
+                    return
+                if self._process_pending_progress(work_items):
+                    wx.CallAfter(self._schedule_queue_refresh, 2000)
+            finally:
+                self._progress_flush_active = False
+                if not self._closing:
+                    wx.CallAfter(self._schedule_next_progress_flush)
 
         threading.Thread(target=worker, name="PlexProgressFlusher", daemon=True).start()
-        self._schedule_progress_flush()
 
     def _flush_pending_progress_sync(self) -> None:
         while self._progress_flush_active:
             time.sleep(0.05)
         if not self._service:
             return
+        if not self._progress_outbox.is_online(self._service.current_server_id()):
+            # The journal keeps the entries for the next session; don't stall closing on timeouts.
+            return
         pending = self._config.get_pending_progress()
         if not pending:
             return
         work_items = list(pending.items())
         self._progress_flush_active = True
-        changed = self._process_pending_progress(work_items)
+        changed = self._process_pending_progress(work_items, force=True)
         self._progress_flush_active = False
         if changed:
             self._schedule_queue_refresh(2000)
         if not self._config.get_pending_progress():
             self._cancel_progress_flush_timer()
 
-    def _process_pending_progress(self, items: list[tuple[str, dict[str, int]]]) -> bool:
-        changed = False
+    def _process_pending_progress(self, items: list[tuple[str, dict[str, int]]], *, force: bool = False) -> bool:
+        """Send cached progress concurrently; entries that recently failed wait out their backoff."""
+        if not self._service:
+            return False
+        service = self._service
+        server_id = service.current_server_id()
+        if not self._progress_outbox.is_online(server_id):
+            return False
+        due: List[Tuple[str, int, int, str]] = []
         for rating_key, payload in items:
             try:
                 position = int(payload.get("position", 0))
@@ -2638,26 +3001,95 @@ class MainFrame(wx.Frame):
                 state = str(payload.get("state", "stopped") or "stopped")
             except Exception:
                 continue
-            print(f"[Progress] flushing {rating_key} pos={position} dur={duration} state={state}")
             if position <= 0 or duration <= 0:
                 self._config.remove_pending_progress(rating_key)
+                self._progress_outbox.entry_sent(rating_key)
                 continue
-            try:
-                applied_state, server_offset = self._service.update_progress_by_key(  # type: ignore[arg-type]
-                    rating_key,
-                    position,
-                    duration,
-                    state,
-                )
-                print(f"[Progress] server accepted {rating_key} new state={applied_state} offset={server_offset}")
-                if server_offset > 0:
+            if not force and self._progress_outbox.entry_delay(rating_key) > 0:
+                continue
+            due.append((rating_key, position, duration, state))
+        if not due:
+            return False
+
+        def send(entry: Tuple[str, int, int, str]) -> Tuple[str, int]:
+            rating_key, position, duration, state = entry
+            print(f"[Progress] flushing {rating_key} pos={position} dur={duration} state={state}")
+            applied_state, server_offset = service.update_progress_by_key(rating_key, position, duration, state)
+            print(f"[Progress] server accepted {rating_key} new state={applied_state} offset={server_offset}")
+            return applied_state, server_offset
+
+        changed = False
+        offline = False
+        with ThreadPoolExecutor(
+            max_workers=min(PROGRESS_FLUSH_WORKERS, len(due)),
+            thread_name_prefix="PlexProgressSend",
+        ) as executor:
+            futures = {executor.submit(send, entry): entry for entry in due}
+            for future in as_completed(futures):
+                rating_key, position, _duration, _state = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    _applied_state, server_offset = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    if is_offline_error(exc):
+                        if not offline:
+                            offline = True
+                            delay = self._progress_outbox.mark_offline(server_id)
+                            print(f"[Progress] Server unreachable, pausing progress sync for {delay:.0f}s: {exc}")
+                            for other in futures:
+                                other.cancel()
+                        continue
+                    delay = self._progress_outbox.entry_failed(rating_key)
+                    print(f"[Timeline] Unable to flush cached progress for {rating_key} (retry in {delay:.0f}s): {exc}")
+                    continue
+                self._progress_outbox.entry_sent(rating_key)
+                if server_offset <= 0:
+                    continue
+                # Playback may have cached a newer position while this one was in flight; keep it.
+                if int(self._config.get_pending_entry(rating_key).get("position", 0) or 0) == position:
                     self._config.remove_pending_progress(rating_key)
-                    self._last_positions[str(rating_key)] = server_offset
-                    changed = True
-            except Exception as exc:  # noqa: BLE001
-                print(f"[Timeline] Unable to flush cached progress for {rating_key}: {exc}")
+                self._last_positions[str(rating_key)] = server_offset
+                changed = True
         return changed
 
+    def _probe_progress_server(self, service: PlexService, server_id: str) -> bool:
+        try:
+            service.ping_server()
+        except Exception as exc:  # noqa: BLE001
+            delay = self._progress_outbox.mark_offline(server_id)
+            print(f"[Progress] Server still unreachable, next check in {delay:.0f}s: {exc}")
+            return False
+        print("[Progress] Server reachable again; sending cached progress")
+        self._progress_outbox.mark_online(server_id)
+        service.ensure_alert_listener()
+        return True
+
+    def _mark_progress_server_online(self) -> None:
+        if self._service:
+            self._progress_outbox.mark_online(self._service.current_server_id())
+
+    def _on_server_alert(self, _data: Dict[str, object]) -> None:
+        # Runs on the alert listener thread; any message proves the server is reachable.
+        service = self._service
+        if service is None or self._closing:
+            return
+        if self._progress_outbox.mark_online(service.current_server_id()):
+            print("[Progress] Alert received from offline server; sending cached progress")
+            wx.CallAfter(self._flush_pending_progress)
+
+    def _schedule_next_progress_flush(self) -> None:
+        pending = self._config.get_pending_progress()
+        if not pending or not self._service:
+            self._cancel_progress_flush_timer()
+            return
+        probe_delay = self._progress_outbox.probe_delay(self._service.current_server_id())
+        if probe_delay is not None:
+            delay = probe_delay
+        else:
+            delay = max(PROGRESS_FLUSH_INTERVAL, min(self._progress_outbox.entry_delay(key) for key in pending))
+        self._schedule_progress_flush(max(1000, int(delay * 1000)))
+
     def _schedule_progress_flush(self, delay_ms: int = 10000) -> None:
         self._cancel_progress_flush_timer()
         if self._closing:
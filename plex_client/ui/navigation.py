@@ -9,7 +9,7 @@ import wx
 from plexapi.base import PlexObject
 from plexapi.library import Folder, LibrarySection
 
-from ..plex_service import MusicAlphaBucket, MusicCategory, MusicRadioOption
+from ..plex_service import MusicAlphaBucket, MusicBucketPage, MusicCategory, MusicRadioOption
 
 
 @dataclass
@@ -201,6 +201,10 @@ class NavigationTree(wx.TreeCtrl):
             return
         if not self._has_placeholder(item):
             return
+        if isinstance(payload.plex_object, MusicBucketPage):
+            event.Veto()
+            self._load_more_children(item, payload.plex_object)
+            return
         self._populate_children(item, payload.plex_object)
 
     def _populate_children(self, item: wx.TreeItemId, plex_object: object) -> None:
@@ -224,6 +228,65 @@ class NavigationTree(wx.TreeCtrl):
     def _apply_children(self, item: wx.TreeItemId, children: Iterable[object]) -> None:
         self._replace_children(item, list(children))
 
+    def _load_more_children(self, item: wx.TreeItemId, page: MusicBucketPage) -> None:
+        if self._destroyed or page.identifier in self._loading_nodes:
+            return
+        self._loading_nodes.add(page.identifier)
+        try:
+            self.SetItemText(item, "Loading...")
+        except RuntimeError:
+            pass
+
+        def work() -> None:
+            try:
+                children = list(self._loader(page))
+            except Exception as exc:  # noqa: BLE001
+                wx.CallAfter(self._apply_more_children, item, page, None, exc)
+                return
+            wx.CallAfter(self._apply_more_children, item, page, children, None)
+
+        threading.Thread(target=work, name="PlexTreePageLoader", daemon=True).start()
+
+    def _apply_more_children(
+        self,
+        item: wx.TreeItemId,
+        page: MusicBucketPage,
+        children: Optional[List[object]],
+        error: Optional[Exception],
+    ) -> None:
+        self._loading_nodes.discard(page.identifier)
+        if self._destroyed or not item or not item.IsOk():
+            return
+        if error is not None or children is None:
+            print(f"[NavigationTree] Unable to load next page: {error}")
+            try:
+                self.SetItemText(item, page.title)
+            except RuntimeError:
+                pass
+            return
+        try:
+            parent = self.GetItemParent(item)
+            was_selected = self.GetSelection() == item
+            self.Delete(item)
+        except RuntimeError:
+            return
+        if not children or not parent or not parent.IsOk():
+            return
+        first_identifier = self._identify(children[0])
+
+        def focus_first_new() -> None:
+            if not was_selected:
+                return
+            target = self._find_child_by_identifier(parent, first_identifier)
+            if target and target.IsOk():
+                try:
+                    self.SelectItem(target)
+                    self.EnsureVisible(target)
+                except RuntimeError:
+                    pass
+
+        self._append_children_batch(parent, children, 0, completion=focus_first_new)
+
     def _ensure_queue_root(self) -> Optional[wx.TreeItemId]:
         if self._destroyed:
             return None
@@ -311,7 +374,7 @@ class NavigationTree(wx.TreeCtrl):
         return False
 
     def _is_expandable(self, plex_object: object) -> bool:
-        if isinstance(plex_object, (MusicCategory, MusicAlphaBucket)):
+        if isinstance(plex_object, (MusicCategory, MusicAlphaBucket, MusicBucketPage)):
             return True
         media_type = getattr(plex_object, "type", "")
         return media_type in {
@@ -483,6 +546,11 @@ class NavigationTree(wx.TreeCtrl):
             child = children[index]
             child_type = getattr(child, "type", "") or ("folder" if isinstance(child, Folder) else "item")
             label = getattr(child, "title", None) or getattr(child, "label", None) or str(child)
+            if child_type == "playlist":
+                # The cached playlist listing already carries the item count; no extra request.
+                count = getattr(child, "leafCount", None)
+                if count:
+                    label = f"{label} ({count})"
             try:
                 child_item = self.AppendItem(item, label, data=self._wrap(child_type, child))
             except RuntimeError:
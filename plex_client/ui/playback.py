@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import ctypes
 import importlib
+import io
 import os
-import shutil
-import zipfile
 import struct
 import sys
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from shutil import which
@@ -16,7 +17,11 @@ import requests
 import wx
 
 from ..config import ConfigStore
+from ..playback_qos import PlaybackQosRecorder
 from ..plex_service import PlayableMedia
+from ..resumable_download import download_file, extract_zip
+from ..seek_thumbnails import BifIndex, bif_cache_path, load_bif_async
+from ..stream_probe import describe_stream, probe_in_order
 from ..version import APP_USER_AGENT
 
 @dataclass
@@ -27,6 +32,7 @@ class QueueNodePayload:
 
 _LIBVLC_BOOTSTRAPPED = False
 _PORTABLE_VLC_VERSION = "3.0.20"
+_PORTABLE_VLC_LOCK = threading.Lock()
 _PORTABLE_VLC_URLS = {
     "win32": f"https://get.videolan.org/vlc/{_PORTABLE_VLC_VERSION}/win32/vlc-{_PORTABLE_VLC_VERSION}-win32.zip",
     "win64": f"https://get.videolan.org/vlc/{_PORTABLE_VLC_VERSION}/win64/vlc-{_PORTABLE_VLC_VERSION}-win64.zip",
@@ -48,7 +54,31 @@ def _locate_extracted_libvlc(root: Path) -> Optional[Path]:
     return None
 
 
-def _ensure_portable_vlc(arch: str) -> Optional[Path]:
+def _portable_vlc_checksum(url: str) -> Optional[str]:
+    # VideoLAN publishes "<sha256>  <file>" next to every build.
+    try:
+        resp = requests.get(f"{url}.sha256", timeout=15, headers={"User-Agent": APP_USER_AGENT})
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        print(f"[LibVLC] Portable VLC checksum unavailable: {exc}")
+        return None
+    digest = resp.text.strip().split()[0] if resp.text.strip() else ""
+    return digest if len(digest) == 64 else None
+
+
+def _ensure_portable_vlc(
+    arch: str,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Optional[Path]:
+    # One bootstrap at a time: concurrent callers would write the same .part file.
+    with _PORTABLE_VLC_LOCK:
+        return _install_portable_vlc(arch, progress)
+
+
+def _install_portable_vlc(
+    arch: str,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> Optional[Path]:
     if arch not in _PORTABLE_VLC_URLS:
         return None
     base_dir = _portable_vlc_base_dir()
@@ -59,27 +89,34 @@ def _ensure_portable_vlc(arch: str) -> Optional[Path]:
     if lib_dir and (lib_dir / "libvlc.dll").exists():
         return lib_dir
     url = _PORTABLE_VLC_URLS[arch]
-    target_dir.mkdir(parents=True, exist_ok=True)
-    tmp_zip = target_dir / "vlc.zip"
+    archive_path = base_dir / arch / f"vlc-{_PORTABLE_VLC_VERSION}-{arch}.zip"
+    reported = [-1]
+
+    def report(received: int, total: Optional[int]) -> None:
+        if progress is not None:
+            progress(received, total)
+        if total:
+            step = received * 10 // total
+            if step != reported[0]:
+                reported[0] = step
+                print(f"[LibVLC] Portable VLC download {step * 10}% ({received // 1048576} MiB)")
+
+    checksum = _portable_vlc_checksum(url)
+    if checksum is None:
+        # Never load an unverified libvlc into the process; try again on the next start.
+        print("[LibVLC] Not installing portable VLC without a published checksum.")
+        return None
     try:
         print(f"[LibVLC] Downloading portable VLC ({arch})...")
-        with requests.get(url, stream=True, timeout=30) as resp:
-            resp.raise_for_status()
-            with tmp_zip.open("wb") as fp:
-                shutil.copyfileobj(resp.raw, fp)
-        with zipfile.ZipFile(tmp_zip) as archive:
-            archive.extractall(target_dir)
+        download_file(url, archive_path, sha256=checksum, progress=report)
+        extract_zip(archive_path, target_dir)
         lib_dir = _locate_extracted_libvlc(target_dir)
         if lib_dir and (lib_dir / "libvlc.dll").exists():
+            archive_path.unlink(missing_ok=True)
             return lib_dir
     except Exception as exc:  # noqa: BLE001
+        # The partial download is kept so the next attempt resumes instead of starting over.
         print(f"[LibVLC] Portable VLC download failed: {exc}")
-    finally:
-        if tmp_zip.exists():
-            try:
-                tmp_zip.unlink()
-            except Exception:
-                pass
     return None
 
 
@@ -91,7 +128,7 @@ def _ensure_dll_directory(path: Path) -> None:
             pass
 
 
-def _bootstrap_libvlc_environment() -> None:
+def _bootstrap_libvlc_environment(*, allow_download: bool = True) -> None:
     global _LIBVLC_BOOTSTRAPPED
     if _LIBVLC_BOOTSTRAPPED:
         return
@@ -121,6 +158,9 @@ def _bootstrap_libvlc_environment() -> None:
                 selected_dir = candidate
                 break
         if selected_dir is None and os.name == "nt":
+            if not allow_download:
+                # Leave the portable download to the background warm-up.
+                return
             arch = "win64" if struct.calcsize("P") == 8 else "win32"
             portable_dir = _ensure_portable_vlc(arch)
             if portable_dir and (portable_dir / "libvlc.dll").exists():
@@ -134,7 +174,7 @@ def _bootstrap_libvlc_environment() -> None:
 requests.packages.urllib3.disable_warnings()
 os.environ.setdefault("VLC_VERBOSE", "-1")
 
-_bootstrap_libvlc_environment()
+_bootstrap_libvlc_environment(allow_download=False)
 try:  # pragma: no cover - python-vlc is optional at import time
     import vlc  # type: ignore
 except Exception:  # pragma: no cover - handled at runtime
@@ -144,6 +184,10 @@ except Exception:  # pragma: no cover - handled at runtime
 PlaybackState = dict[str, object]
 
 SEEK_STEP_MS = 10000
+# LibVLC time events are coalesced: the slider moves at most twice a second and the server hears every 5s.
+TIMELINE_UI_INTERVAL = 0.5
+TIMELINE_REPORT_INTERVAL = 5.0
+PREROLL_WINDOW_MS = 20000
 
 
 class PlaybackPanel(wx.Panel):
@@ -167,7 +211,15 @@ class PlaybackPanel(wx.Panel):
         self._muted: bool = False
         self._state_listener: Optional[Callable[[PlaybackState], None]] = None
         self._timeline_callback: Optional[Callable[[PlayableMedia, str, int, int, bool], None]] = None
-        self._timeline_timer: Optional[wx.CallLater] = None
+        self._stream_result_callback: Optional[Callable[[PlayableMedia, Optional[str]], None]] = None
+        self._timeline_reported_at: float = 0.0
+        self._timeline_ui_at: float = 0.0
+        self._vlc_event_time: int = 0
+        self._vlc_time_pending = False
+        # Bumped whenever playback is torn down; LibVLC events queued for an older value are dropped.
+        self._playback_token = 0
+        self._next_media: Optional[PlayableMedia] = None
+        self._preroll_started = False
         self._last_timeline_state: Optional[str] = None
         self._last_timeline_position: int = 0
         self._resume_offset: int = 0
@@ -175,6 +227,11 @@ class PlaybackPanel(wx.Panel):
         self._seek_slider_duration: int = 0
         self._updating_seek_slider: bool = False
         self._seek_dragging: bool = False
+        self._seek_index: Optional[BifIndex] = None
+        self._seek_index_token = 0
+        self._seek_preview: Optional[wx.PopupWindow] = None
+        self._seek_preview_bitmap: Optional[wx.StaticBitmap] = None
+        self._seek_preview_label: Optional[wx.StaticText] = None
         self._fullscreen: bool = False
         self._fullscreen_frame: Optional[wx.Frame] = None
         self._fullscreen_video_panel: Optional[wx.Panel] = None
@@ -188,12 +245,20 @@ class PlaybackPanel(wx.Panel):
         self._libvlc_env_prepared = False
         self._libvlc_warning_shown = False
         self._libvlc_candidates: list[str] = []
-        self._libvlc_candidate_index = 0
+        self._libvlc_probe_token = 0
+        self._libvlc_started = False
         self._libvlc_active_source: Optional[str] = None
         self._libvlc_check_attempts = 0
         self._libvlc_max_start_checks = 4
+        self._libvlc_warm_thread: Optional[threading.Thread] = None
+        self._libvlc_warm_result: Optional[Tuple[object, "vlc.Instance", "vlc.MediaPlayer"]] = None
+        self._libvlc_env_lock = threading.Lock()
+        self._libvlc_deferred: Optional[Tuple[int, bool]] = None
         self._vlc_event_manager: Optional["vlc.EventManager"] = None
-        self._vlc_error_callback: Optional[Callable[[object], None]] = None
+        self._vlc_event_callbacks: List[Tuple[object, Callable[[object], None]]] = []
+        self._qos = PlaybackQosRecorder(self._qos_log_path())
+        self._qos_server = ""
+        self._qos_connection_type = "unknown"
         self._queue_activate_callback = on_queue_activate
 
         self._header = wx.StaticText(self, label="Nothing is playing.")
@@ -304,6 +369,7 @@ class PlaybackPanel(wx.Panel):
             "muted": self._muted,
             "volume": self._volume,
             "fullscreen": self._fullscreen,
+            "player_ready": self._vlc_player is not None,
         }
 
     def play(self, media: PlayableMedia) -> str:
@@ -316,6 +382,16 @@ class PlaybackPanel(wx.Panel):
         self._halt_current_playback()
 
         self._current = media
+        self._next_media = None
+        self._preroll_started = False
+        self._load_seek_index(media)
+        rating_key = getattr(media.item, "ratingKey", None)
+        self._qos.begin(
+            media.title,
+            str(rating_key) if rating_key is not None else None,
+            server=self._qos_server,
+            connection_type=self._qos_connection_type,
+        )
         self._direct_url = media.stream_url
         self._browser_url = media.browser_url or media.stream_url
         self._is_paused = False
@@ -329,10 +405,13 @@ class PlaybackPanel(wx.Panel):
 
         mode = self._play_with_libvlc()
         if mode == "libvlc":
-            self._set_mode(mode)
-            self._handle_playback_start(mode)
+            self._header.SetLabel(f"Opening stream: {media.title}")
             return mode
+        self._report_playback_unavailable()
+        return "none"
 
+    def _report_playback_unavailable(self) -> None:
+        self._qos.end("failed")
         self._header.SetLabel("Unable to start playback for this item.")
         wx.MessageBox(
             "Plexible could not start LibVLC playback for this item.",
@@ -345,7 +424,6 @@ class PlaybackPanel(wx.Panel):
         self._current = None
         self._direct_url = None
         self._browser_url = None
-        return "none"
 
     def set_queue_items(
         self,
@@ -601,9 +679,12 @@ class PlaybackPanel(wx.Panel):
     def stop(self) -> None:
         if self._mode == "stopped" and not self._current:
             return
-        final_position = self._current_position()
+        self._end_playback("stopped", self._current_position())
+
+    def _end_playback(self, outcome: str, final_position: int) -> None:
         duration = self._current_duration()
         self._notify_timeline_state("stopped", final_position, duration, sync=True)
+        self._qos.end(outcome)
         self._halt_current_playback()
         self._current = None
         self._direct_url = None
@@ -622,7 +703,6 @@ class PlaybackPanel(wx.Panel):
             self._vlc_player.set_pause(False)
             self._is_paused = False
             self._header.SetLabel(f"Playing (LibVLC): {self._current.title}")
-            self._start_timeline_poll()
             try:
                 position = int(self._vlc_player.get_time())
             except Exception:
@@ -644,7 +724,6 @@ class PlaybackPanel(wx.Panel):
                 position = int(self._vlc_player.get_time())
             except Exception:
                 position = 0
-            self._cancel_timeline_poll()
             self._notify_timeline_state("paused", position, self._current_duration())
         else:
             return False
@@ -752,10 +831,12 @@ class PlaybackPanel(wx.Panel):
     def _on_seek_slider_track(self, event: wx.ScrollEvent) -> None:
         if self._seek_slider.IsEnabled():
             self._seek_dragging = True
+            self._show_seek_preview(event.GetPosition())
         event.Skip()
 
     def _on_seek_slider_release(self, event: wx.ScrollEvent) -> None:
         self._seek_dragging = False
+        self._hide_seek_preview()
         self._apply_seek_from_slider()
         event.Skip()
 
@@ -867,35 +948,87 @@ class PlaybackPanel(wx.Panel):
             return
         self._detach_libvlc_events()
         self._vlc_event_manager = manager
-        if self._vlc_error_callback is None:
-            def _callback(event: object) -> None:
-                self._on_libvlc_error(event)
-            self._vlc_error_callback = _callback
-        try:
-            manager.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._vlc_error_callback)
-        except Exception:
-            pass
-
-    def _detach_libvlc_events(self) -> None:
-        if self._vlc_event_manager and self._vlc_error_callback and vlc is not None:
+        handlers = (
+            (vlc.EventType.MediaPlayerEncounteredError, self._on_libvlc_error),
+            (vlc.EventType.MediaPlayerPlaying, self._on_libvlc_playing),
+            (vlc.EventType.MediaPlayerPaused, self._on_libvlc_paused),
+            (vlc.EventType.MediaPlayerEndReached, self._on_libvlc_end_reached),
+            (vlc.EventType.MediaPlayerStopped, self._on_libvlc_stopped),
+            (vlc.EventType.MediaPlayerTimeChanged, self._on_libvlc_time_changed),
+            (vlc.EventType.MediaPlayerBuffering, self._on_libvlc_buffering),
+        )
+        for event_type, handler in handlers:
             try:
-                self._vlc_event_manager.event_detach(vlc.EventType.MediaPlayerEncounteredError, self._vlc_error_callback)
+                manager.event_attach(event_type, handler)
             except Exception:
-                pass
+                continue
+            self._vlc_event_callbacks.append((event_type, handler))
+
+    def _detach_libvlc_events(self) -> None:
+        if self._vlc_event_manager and vlc is not None:
+            for event_type, handler in self._vlc_event_callbacks:
+                try:
+                    self._vlc_event_manager.event_detach(event_type, handler)
+                except Exception:
+                    pass
+        self._vlc_event_callbacks = []
         self._vlc_event_manager = None
 
+    # LibVLC event callbacks run on LibVLC threads; they only hand work to the UI thread.
+
+    def _on_libvlc_playing(self, _event: object = None) -> None:
+        source = self._libvlc_active_source
+        self._qos.mark_started(describe_stream(source) if source else "")
+        self._qos.resumed()
+        wx.CallAfter(self._apply_libvlc_state, self._playback_token, "playing")
+
+    def _on_libvlc_paused(self, _event: object = None) -> None:
+        wx.CallAfter(self._apply_libvlc_state, self._playback_token, "paused")
+
+    def _on_libvlc_end_reached(self, _event: object = None) -> None:
+        wx.CallAfter(self._apply_libvlc_state, self._playback_token, "ended")
+
+    def _on_libvlc_stopped(self, _event: object = None) -> None:
+        wx.CallAfter(self._apply_libvlc_state, self._playback_token, "stopped")
+
+    def _on_libvlc_time_changed(self, event: object = None) -> None:
+        try:
+            new_time = int(event.u.new_time)  # type: ignore[union-attr]
+        except Exception:
+            return
+        token = self._playback_token
+        self._vlc_event_time = new_time
+        # TimeChanged fires several times a second; keep at most one UI update queued.
+        if self._vlc_time_pending:
+            return
+        self._vlc_time_pending = True
+        wx.CallAfter(self._apply_libvlc_time, token)
+
+    def _on_libvlc_buffering(self, event: object = None) -> None:
+        try:
+            percent = float(event.u.new_cache)  # type: ignore[union-attr]
+        except Exception:
+            return
+        self._qos.buffering(percent)
+
     def _on_libvlc_error(self, _event: object = None) -> None:
         print("[LibVLC] Encountered playback error; stopping playback.")
         wx.CallAfter(self._handle_libvlc_failure, "LibVLC reported an error while streaming.", False, True)
 
     def _clear_libvlc_candidates(self) -> None:
         self._libvlc_candidates = []
-        self._libvlc_candidate_index = 0
+        self._libvlc_probe_token += 1
+        self._libvlc_started = False
         self._libvlc_active_source = None
 
     def _halt_current_playback(self) -> None:
+        self._playback_token += 1
+        self._vlc_event_time = 0
+        self._vlc_time_pending = False
+        self._timeline_reported_at = 0.0
+        self._hide_seek_preview()
+        self._close_seek_index()
         self._stop_libvlc_only()
-        self._cancel_timeline_poll()
         self._exit_fullscreen()
         self._notify_timeline_reset()
         self._clear_libvlc_candidates()
@@ -910,6 +1043,11 @@ class PlaybackPanel(wx.Panel):
                     parent=self,
                 )
             return "none"
+        if self._libvlc_warming():
+            # Resume from _apply_libvlc_warm_up instead of blocking the UI thread on the bootstrap.
+            print("[LibVLC] Waiting for background initialisation before starting playback.")
+            self._libvlc_deferred = (self._libvlc_probe_token, force_message)
+            return "libvlc"
         if not self._ensure_libvlc():
             if force_message and not self._libvlc_warning_shown:
                 wx.MessageBox(
@@ -922,50 +1060,51 @@ class PlaybackPanel(wx.Panel):
             return "none"
 
         self._libvlc_reset_candidates()
-        attempted = False
-        while True:
-            stream_source = self._libvlc_next_source()
-            if not stream_source:
-                if force_message:
-                    message = (
-                        "LibVLC was unable to start playback for this item."
-                        if attempted
-                        else "LibVLC could not find a playable stream for this item."
-                    )
-                    wx.MessageBox(
-                        message,
-                        "Plexible",
-                        wx.ICON_WARNING | wx.OK,
-                        parent=self,
-                    )
-                return "none"
-            attempted = True
-            if self._start_libvlc(stream_source):
+        if not self._libvlc_candidates:
+            return "none"
+        preferred = self._current.preferred_url if self._current else None
+        if preferred in self._libvlc_candidates:
+            # This source played last time; skip probing and only fall back if it fails to start.
+            print(f"[LibVLC] Reusing last working {self._describe_stream_source(preferred)} stream.")
+            if self._start_libvlc(preferred):
+                self._libvlc_started = True
+                self._set_mode("libvlc")
+                self._handle_playback_start("libvlc")
                 return "libvlc"
+            self._report_stream_result(None)
+        self._probe_libvlc_candidates(list(self._libvlc_candidates), self._libvlc_probe_token)
+        return "libvlc"
 
     def _libvlc_reset_candidates(self) -> None:
         self._clear_libvlc_candidates()
-        seen = set()
-        if self._direct_url:
-            seen.add(self._direct_url)
-            self._libvlc_candidates.append(self._direct_url)
-        if self._browser_url and self._browser_url not in seen:
-            self._libvlc_candidates.append(self._browser_url)
-
-    def _libvlc_next_source(self) -> Optional[str]:
-        while self._libvlc_candidate_index < len(self._libvlc_candidates):
-            candidate = self._libvlc_candidates[self._libvlc_candidate_index]
-            self._libvlc_candidate_index += 1
-            if not self._probe_stream(candidate):
-                print(f"[LibVLC] Probe failed for {self._describe_stream_source(candidate)} stream.")
-                continue
-            self._libvlc_active_source = candidate
-            return candidate
-        self._libvlc_active_source = None
-        return None
+        ranked = list(self._current.candidates) if self._current and self._current.candidates else []
+        for url in ranked or [self._direct_url, self._browser_url]:
+            if url and url not in self._libvlc_candidates:
+                self._libvlc_candidates.append(url)
+
+    def _probe_libvlc_candidates(self, candidates: List[str], token: int) -> None:
+        # Results arrive best-first; later ones only matter if an earlier source fails to start.
+        def worker() -> None:
+            for position, (url, ok) in enumerate(probe_in_order(candidates), start=1):
+                wx.CallAfter(self._apply_libvlc_probe, token, url, ok, position == len(candidates))
+
+        threading.Thread(target=worker, name="PlexStreamProbe", daemon=True).start()
+
+    def _apply_libvlc_probe(self, token: int, url: str, ok: bool, is_last: bool) -> None:
+        if token != self._libvlc_probe_token or self._libvlc_started or not self._current:
+            return
+        if not ok:
+            print(f"[LibVLC] Probe failed for {self._describe_stream_source(url)} stream.")
+        elif self._start_libvlc(url):
+            self._libvlc_started = True
+            self._set_mode("libvlc")
+            self._handle_playback_start("libvlc")
+            return
+        if is_last:
+            self._report_playback_unavailable()
 
     def _describe_stream_source(self, url: str) -> str:
-        return "HLS" if "m3u8" in url.lower() else "Direct"
+        return describe_stream(url)
 
     def _start_libvlc(self, stream_source: str) -> bool:
         if self._vlc_instance is None or self._vlc_player is None:
@@ -1003,24 +1142,13 @@ class PlaybackPanel(wx.Panel):
         self._schedule_libvlc_check()
         return True
 
-    def _probe_stream(self, url: str) -> bool:
-        try:
-            resp = requests.get(
-                url,
-                stream=True,
-                timeout=3,
-                verify=False,
-                headers={"User-Agent": APP_USER_AGENT},
-            )
-            resp.close()
-            return resp.ok
-        except requests.RequestException as exc:
-            print(f"[LibVLC] Probe error for {self._describe_stream_source(url)} stream: {exc}")
-            return False
-
     def _prepare_libvlc_environment(self, force: bool = False) -> None:
-        if self._libvlc_env_prepared and not force:
-            return
+        with self._libvlc_env_lock:
+            if self._libvlc_env_prepared and not force:
+                return
+            self._prepare_libvlc_environment_locked()
+
+    def _prepare_libvlc_environment_locked(self) -> None:
         _bootstrap_libvlc_environment()
         configured_dir: Optional[Path] = None
         if getattr(self, "_config", None):
@@ -1087,8 +1215,75 @@ class PlaybackPanel(wx.Panel):
             _ensure_dll_directory(selected_dir)
         self._libvlc_env_prepared = True
 
+    @staticmethod
+    def _libvlc_instance_args() -> List[str]:
+        instance_args = ["--no-video-title-show", "--quiet"]
+        if sys.platform.startswith("win"):
+            instance_args.append("--aout=directsound")
+        return instance_args
+
+    def warm_up(self) -> None:
+        """Initialise LibVLC on a background thread so the first play skips instance creation."""
+        if self._vlc_player is not None or self._libvlc_warm_thread is not None:
+            return
+
+        def worker() -> None:
+            try:
+                self._prepare_libvlc_environment()
+                module = vlc if vlc is not None else importlib.import_module("vlc")
+                instance = module.Instance(*self._libvlc_instance_args())
+                self._libvlc_warm_result = (module, instance, instance.media_player_new())
+            except Exception as exc:  # noqa: BLE001
+                print(f"[LibVLC] Background initialisation failed: {exc}")
+            wx.CallAfter(self._apply_libvlc_warm_up)
+
+        thread = threading.Thread(target=worker, name="PlexLibVLCWarmup", daemon=True)
+        self._libvlc_warm_thread = thread
+        thread.start()
+
+    def _adopt_warm_libvlc(self) -> None:
+        global vlc
+        result, self._libvlc_warm_result = self._libvlc_warm_result, None
+        if result is None:
+            return
+        module, instance, player = result
+        if self._vlc_player is not None:
+            try:
+                player.release()
+                instance.release()
+            except Exception:
+                pass
+            return
+        vlc = module
+        self._vlc_instance = instance
+        self._vlc_player = player
+
+    def _apply_libvlc_warm_up(self) -> None:
+        # The worker has finished its work even if the thread has not quite exited yet.
+        self._libvlc_warm_thread = None
+        self._adopt_warm_libvlc()
+        if self._vlc_player is not None:
+            if sys.platform.startswith("win"):
+                try:
+                    self._vlc_player.audio_output_set("directsound")
+                except Exception:
+                    pass
+            self._update_vlc_drawable(self._active_video_window)
+            print("[LibVLC] Player ready.")
+            self._notify_state()
+        deferred, self._libvlc_deferred = self._libvlc_deferred, None
+        if deferred is None or deferred[0] != self._libvlc_probe_token or not self._current:
+            return
+        if self._play_with_libvlc(deferred[1]) != "libvlc":
+            self._report_playback_unavailable()
+
+    def _libvlc_warming(self) -> bool:
+        thread = self._libvlc_warm_thread
+        return thread is not None and thread.is_alive()
+
     def _ensure_libvlc(self) -> bool:
         global vlc
+        self._adopt_warm_libvlc()
         self._prepare_libvlc_environment()
         if vlc is None:
             try:
@@ -1097,20 +1292,14 @@ class PlaybackPanel(wx.Panel):
                 return False
         if self._vlc_instance is None or self._vlc_player is None:
             try:
-                instance_args = ["--no-video-title-show", "--quiet"]
-                if sys.platform.startswith("win"):
-                    instance_args.append("--aout=directsound")
-                self._vlc_instance = vlc.Instance(*instance_args)
+                self._vlc_instance = vlc.Instance(*self._libvlc_instance_args())
                 self._vlc_player = self._vlc_instance.media_player_new()
             except Exception:
                 self._libvlc_env_prepared = False
                 self._prepare_libvlc_environment(force=True)
                 try:
                     vlc = importlib.reload(vlc)  # type: ignore[arg-type]
-                    instance_args = ["--no-video-title-show", "--quiet"]
-                    if sys.platform.startswith("win"):
-                        instance_args.append("--aout=directsound")
-                    self._vlc_instance = vlc.Instance(*instance_args)
+                    self._vlc_instance = vlc.Instance(*self._libvlc_instance_args())
                     self._vlc_player = self._vlc_instance.media_player_new()
                 except Exception:
                     if self._prompt_for_vlc_path():
@@ -1167,6 +1356,8 @@ class PlaybackPanel(wx.Panel):
         state = self._vlc_player.get_state()
         if state in (vlc.State.Playing, vlc.State.Paused):
             self._libvlc_check_attempts = 0
+            self._report_stream_result(self._libvlc_active_source)
+            self._qos.mark_started(self._describe_stream_source(self._libvlc_active_source or ""))
             self._handle_playback_start("libvlc")
             return
         if state in (vlc.State.Opening, vlc.State.Buffering, vlc.State.NothingSpecial):
@@ -1183,6 +1374,8 @@ class PlaybackPanel(wx.Panel):
         if not self._current:
             return
         print(f"[LibVLC] {reason}")
+        self._report_stream_result(None)
+        self._qos.end("failed")
         self._stop_libvlc_only()
         self._exit_fullscreen()
         self._libvlc_active_source = None
@@ -1271,6 +1464,143 @@ class PlaybackPanel(wx.Panel):
     ) -> None:
         self._timeline_callback = callback
 
+    def current_rating_key(self) -> Optional[str]:
+        if not self._current:
+            return None
+        rating_key = getattr(self._current.item, "ratingKey", None)
+        return str(rating_key) if rating_key is not None else None
+
+    def set_next_media(self, media: Optional[PlayableMedia]) -> None:
+        """Tell the panel what autoplay will start next so it can pre-roll near the end."""
+        self._next_media = media
+        self._preroll_started = False
+
+    def _preroll_next(self) -> None:
+        media = self._next_media
+        if media is None or self._preroll_started or media.preferred_url:
+            return
+        self._preroll_started = True
+        candidates = [url for url in (media.candidates or [media.stream_url, media.browser_url]) if url]
+
+        # Probing now opens pooled connections and settles the source, so the next play starts without a probe.
+        def worker() -> None:
+            for url, ok in probe_in_order(candidates):
+                if ok:
+                    media.preferred_url = url
+                    print(f"[Playback] Pre-rolled next item '{media.title}' via {describe_stream(url)} stream.")
+                    return
+
+        threading.Thread(target=worker, name="PlexPreroll", daemon=True).start()
+
+    @property
+    def qos(self) -> PlaybackQosRecorder:
+        return self._qos
+
+    def set_connection_info(self, server: str, connection_type: str) -> None:
+        """Label future QoS sessions with the server and how it is reached."""
+        self._qos_server = server
+        self._qos_connection_type = connection_type or "unknown"
+
+    def _qos_log_path(self) -> Optional[Path]:
+        try:
+            directory = self._config.cache_dir("diagnostics")
+        except Exception:  # noqa: BLE001
+            return None
+        return directory / "playback_qos.jsonl" if isinstance(directory, Path) else None
+
+    def _sample_qos(self) -> None:
+        if self._vlc_player is None or vlc is None:
+            return
+        try:
+            media = self._vlc_player.get_media()
+            stats = vlc.MediaStats()
+            if media is not None and media.get_stats(stats):
+                self._qos.sample(stats)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[QoS] Unable to read LibVLC stats: {exc}")
+
+    def _load_seek_index(self, media: PlayableMedia) -> None:
+        self._close_seek_index()
+        url = media.seek_index_url
+        if not url:
+            return
+        try:
+            directory = self._config.cache_dir("seek_thumbnails")
+        except Exception:  # noqa: BLE001
+            return
+        if not isinstance(directory, Path):
+            return
+        token = self._seek_index_token
+
+        def deliver(index: Optional[BifIndex]) -> None:
+            wx.CallAfter(self._apply_seek_index, token, index)
+
+        load_bif_async(url, bif_cache_path(directory, url), deliver)
+
+    def _apply_seek_index(self, token: int, index: Optional[BifIndex]) -> None:
+        if index is None:
+            return
+        if token != self._seek_index_token or not self:
+            index.close()
+            return
+        self._seek_index = index
+        print(f"[SeekThumbs] Loaded {len(index)} preview thumbnails.")
+
+    def _close_seek_index(self) -> None:
+        # Invalidates any download still in flight for the previous item.
+        self._seek_index_token += 1
+        if self._seek_index is not None:
+            self._seek_index.close()
+            self._seek_index = None
+
+    def _show_seek_preview(self, position_ms: int) -> None:
+        if self._seek_index is None:
+            return
+        data = self._seek_index.frame_at(position_ms)
+        if not data:
+            return
+        image = wx.Image(io.BytesIO(data), wx.BITMAP_TYPE_JPEG)
+        if not image.IsOk():
+            return
+        if self._seek_preview is None:
+            self._seek_preview = wx.PopupWindow(self)
+            self._seek_preview_bitmap = wx.StaticBitmap(self._seek_preview)
+            self._seek_preview_label = wx.StaticText(self._seek_preview, style=wx.ALIGN_CENTER_HORIZONTAL)
+            sizer = wx.BoxSizer(wx.VERTICAL)
+            sizer.Add(self._seek_preview_bitmap, 0, wx.ALL, 2)
+            sizer.Add(self._seek_preview_label, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 2)
+            self._seek_preview.SetSizer(sizer)
+        seconds = max(0, position_ms) // 1000
+        self._seek_preview_bitmap.SetBitmap(wx.Bitmap(image))  # type: ignore[union-attr]
+        self._seek_preview_label.SetLabel(f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}")  # type: ignore[union-attr]
+        self._seek_preview.Fit()
+        # Centre the preview above the slider thumb.
+        slider_rect = self._seek_slider.GetScreenRect()
+        fraction = position_ms / self._seek_slider_duration if self._seek_slider_duration else 0.0
+        width, height = self._seek_preview.GetSize()
+        x = slider_rect.x + int(slider_rect.width * min(1.0, fraction)) - width // 2
+        self._seek_preview.Position(wx.Point(max(0, x), max(0, slider_rect.y - height - 4)), wx.Size(0, 0))
+        if not self._seek_preview.IsShown():
+            self._seek_preview.Show()
+
+    def _hide_seek_preview(self) -> None:
+        if self._seek_preview is not None and self._seek_preview.IsShown():
+            self._seek_preview.Hide()
+
+    def set_stream_result_callback(
+        self,
+        callback: Optional[Callable[[PlayableMedia, Optional[str]], None]],
+    ) -> None:
+        self._stream_result_callback = callback
+
+    def _report_stream_result(self, url: Optional[str]) -> None:
+        if not self._current or not self._stream_result_callback:
+            return
+        try:
+            self._stream_result_callback(self._current, url)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[Playback] Unable to record stream result: {exc}")
+
     def _current_duration(self) -> int:
         if not self._current:
             return 0
@@ -1317,20 +1647,12 @@ class PlaybackPanel(wx.Panel):
                     position = max(0, int(self._vlc_player.get_time()))
                 except Exception:
                     position = 0
-            self._start_timeline_poll()
             self._notify_timeline_state("playing", position, duration)
             self._maybe_seek_to_resume(initial=True)
         else:
-            self._cancel_timeline_poll()
             position = 1000 if duration else 0
             self._notify_timeline_state("playing", position, duration)
 
-    def _start_timeline_poll(self, delay_ms: int = 5000) -> None:
-        self._cancel_timeline_poll()
-        if self._mode != "libvlc":
-            return
-        self._timeline_timer = wx.CallLater(delay_ms, self._poll_timeline)
-
     def _maybe_seek_to_resume(self, initial: bool = False) -> None:
         if (
             self._resume_applied
@@ -1446,43 +1768,47 @@ class PlaybackPanel(wx.Panel):
         else:
             event.Skip()
 
-    def _cancel_timeline_poll(self) -> None:
-        if self._timeline_timer:
-            try:
-                self._timeline_timer.Stop()
-            except Exception:
-                pass
-        self._timeline_timer = None
+    def _apply_libvlc_time(self, token: int) -> None:
+        if token != self._playback_token:
+            return
+        self._vlc_time_pending = False
+        if not self._current or self._mode != "libvlc" or self._is_paused:
+            return
+        now = time.monotonic()
+        if now - self._timeline_ui_at < TIMELINE_UI_INTERVAL:
+            return
+        self._timeline_ui_at = now
+        position = max(0, self._vlc_event_time)
+        duration = self._current_duration()
+        self._maybe_seek_to_resume()
+        if duration and duration - position <= PREROLL_WINDOW_MS:
+            self._preroll_next()
+        if now - self._timeline_reported_at >= TIMELINE_REPORT_INTERVAL:
+            self._timeline_reported_at = now
+            self._sample_qos()
+            self._notify_timeline_state("playing", position, duration)
+        else:
+            self._set_seek_slider(position, duration)
 
-    def _poll_timeline(self) -> None:
-        self._timeline_timer = None
-        if not self._current or self._mode != "libvlc" or self._vlc_player is None or vlc is None:
+    def _apply_libvlc_state(self, token: int, state: str) -> None:
+        if token != self._playback_token:
+            return
+        if not self._current or self._mode != "libvlc" or self._vlc_player is None:
             return
-        try:
-            state = self._vlc_player.get_state()
-        except Exception:
-            state = None
         try:
             position = max(0, int(self._vlc_player.get_time()))
         except Exception:
-            position = 0
+            position = self._vlc_event_time
         duration = self._current_duration()
-        if state == vlc.State.Playing:
+        if state in ("playing", "paused"):
             self._maybe_seek_to_resume()
-            self._notify_timeline_state("playing", position, duration)
-            self._start_timeline_poll()
-        elif state == vlc.State.Paused:
-            self._maybe_seek_to_resume()
-            self._notify_timeline_state("paused", position, duration)
-            self._start_timeline_poll()
-        elif state in (vlc.State.Ended, vlc.State.Stopped):
-            self._notify_timeline_state("stopped", duration or position, duration)
-            wx.CallAfter(self.stop)
-        elif state == vlc.State.Error:
-            self._notify_timeline_state("stopped", position, duration)
-            wx.CallAfter(self._handle_libvlc_failure, "LibVLC reported an error while streaming.", False, True)
-        else:
-            self._start_timeline_poll()
+            # start, pause() and resume() already reported this; only report changes made inside LibVLC.
+            if state != self._last_timeline_state:
+                self._notify_timeline_state(state, position, duration)
+            return
+        # Ended or stopped underneath us: report the final position right away so autoplay can start.
+        final_position = (duration or position) if state == "ended" else position
+        self._end_playback(state, final_position)
 
     def _notify_timeline_state(self, state: str, position: int, duration: int, *, sync: bool = False) -> None:
         duration = max(0, duration or self._current_duration())
@@ -1498,6 +1824,7 @@ class PlaybackPanel(wx.Panel):
             return
         self._last_timeline_state = state
         self._last_timeline_position = position
+        self._timeline_reported_at = time.monotonic()
         try:
             callback = self._timeline_callback
             if sync:
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import hashlib
 import json
 import os
 import re
@@ -8,7 +7,6 @@ import shutil
 import subprocess
 import sys
 import threading
-import zipfile
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +16,7 @@ import requests
 import wx
 
 from .config import ConfigStore
+from .resumable_download import DownloadError, download_file, extract_zip, sha256_file
 from .version import APP_NAME, APP_USER_AGENT, APP_VERSION
 
 
@@ -72,15 +71,6 @@ def _get_update_root() -> Path:
     return root / APP_NAME / "updates"
 
 
-def _safe_extract(archive: zipfile.ZipFile, target_dir: Path) -> None:
-    target_dir = target_dir.resolve()
-    for member in archive.infolist():
-        member_path = (target_dir / member.filename).resolve()
-        if member_path != target_dir and target_dir not in member_path.parents:
-            raise UpdateError("Update archive contains an unsafe path.")
-    archive.extractall(target_dir)
-
-
 def _find_app_dir(staging_dir: Path) -> Path:
     if (staging_dir / APP_EXE_NAME).exists():
         return staging_dir
@@ -91,14 +81,6 @@ def _find_app_dir(staging_dir: Path) -> Path:
     raise UpdateError(f"Updated {APP_EXE_NAME} not found in extracted files.")
 
 
-def _sha256_file(path: Path) -> str:
-    hasher = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
-
-
 def _normalize_thumbprint(value: Optional[str]) -> str:
     if not value:
         return ""
@@ -312,21 +294,30 @@ class UpdateManager:
 
         archive_path = download_dir / info.asset_name
         self._set_status("Downloading update package...")
-        with requests.get(info.download_url, stream=True, timeout=60, headers={"User-Agent": APP_USER_AGENT}) as resp:
-            resp.raise_for_status()
-            with archive_path.open("wb") as handle:
-                for chunk in resp.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        handle.write(chunk)
-
-        self._set_status("Verifying update package...")
-        actual_hash = _sha256_file(archive_path)
-        if actual_hash.lower() != info.sha256.lower():
-            raise UpdateError("Downloaded update failed SHA-256 verification.")
+
+        last_percent = [-1]
+
+        def report(received: int, total: Optional[int]) -> None:
+            if not total:
+                return
+            percent = received * 100 // total
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self._set_status(f"Downloading update package... {percent}%")
+
+        try:
+            # An interrupted download resumes from its .part file; the hash is checked while streaming.
+            if not archive_path.exists() or sha256_file(archive_path).lower() != info.sha256.lower():
+                archive_path.unlink(missing_ok=True)
+                download_file(info.download_url, archive_path, sha256=info.sha256, progress=report)
+        except DownloadError as exc:
+            raise UpdateError(str(exc)) from exc
 
         self._set_status("Extracting update package...")
-        with zipfile.ZipFile(archive_path) as archive:
-            _safe_extract(archive, staging_root)
+        try:
+            extract_zip(archive_path, staging_root)
+        except DownloadError as exc:
+            raise UpdateError("Update archive contains an unsafe path.") from exc
 
         app_dir = _find_app_dir(staging_root)
         exe_path = app_dir / APP_EXE_NAME
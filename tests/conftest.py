@@ -362,4 +362,61 @@ def plex_service(mock_account, mock_config, mock_server, mock_resource):
         service._server = mock_server
         service._resources = [mock_resource]
         service._current_resource_id = mock_resource.clientIdentifier
+        service._stream_planner.meter.measure_async = MagicMock()
         return service
+
+
+def _music_tag(name):
+    tag = MagicMock()
+    tag.tag = name
+    return tag
+
+
+def _music_album(rating_key, year, genres):
+    album = MagicMock()
+    album.ratingKey = rating_key
+    album.year = year
+    album.titleSort = f"Album {rating_key}"
+    album.parentRatingKey = 0
+    album.addedAt = None
+    album.genres = [_music_tag(g) for g in genres]
+    return album
+
+
+def _music_track(rating_key, album_key, artist_key, title, view_count=0):
+    track = MagicMock()
+    track.ratingKey = rating_key
+    track.title = title
+    track.titleSort = track.title
+    track.duration = 1000
+    track.parentRatingKey = album_key
+    track.grandparentRatingKey = artist_key
+    track.grandparentTitle = f"Artist {artist_key}"
+    track.year = None
+    track.parentYear = None
+    track.genres = []
+    track.viewCount = view_count
+    track.lastViewedAt = None
+    track.addedAt = None
+    return track
+
+
+@pytest.fixture
+def music_index():
+    """Create a small built MusicIndex with three albums and four tracks."""
+    from plex_client.music_index import MusicIndex
+
+    index = MusicIndex("music")
+    index.add_albums([
+        _music_album(100, 1994, ["Rock"]),
+        _music_album(200, 1995, ["Rock", "Grunge"]),
+        _music_album(300, 2015, ["Jazz"]),
+    ])
+    index.add_tracks([
+        _music_track(1, 100, 10, "Bravo"),
+        _music_track(2, 100, 10, "alpha"),
+        _music_track(3, 200, 20, "\u00c9clair", view_count=5),
+        _music_track(4, 300, 30, "99 Problems"),
+    ])
+    index.mark_built()
+    return index
@@ -0,0 +1,199 @@
+"""Tests for the disk-backed audio cache."""
+from __future__ import annotations
+
+import time
+
+from unittest.mock import MagicMock, patch
+
+
+def _fake_download(payload):
+    def download(url, dest, **kwargs):
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(payload)
+        return dest
+
+    return download
+
+
+def _wait_idle(cache, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cache._worker is None:
+            return
+        time.sleep(0.01)
+
+
+class TestAudioCache:
+    """Test LRU storage and validation of cached tracks."""
+
+    def test_fetch_then_lookup(self, tmp_path):
+        """Test that a fetched track is served when part key and size match."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=100)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"abcd")):
+            assert cache.fetch("srv", "1", "/library/parts/1/file.flac", 4, "http://s/p")
+            _wait_idle(cache)
+
+        path = cache.lookup("srv", "1", "/library/parts/1/file.flac", 4)
+        assert path is not None and path.read_bytes() == b"abcd"
+        assert path.suffix == ".flac"
+
+    def test_lookup_rejects_changed_part(self, tmp_path):
+        """Test that a replaced media part drops the stale cached copy."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=100)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"abcd")):
+            cache.fetch("srv", "1", "/p/1.mp3", 4, "http://s/p")
+            _wait_idle(cache)
+
+        assert cache.lookup("srv", "1", "/p/2.mp3", 4) is None
+        assert not cache.contains("srv", "1")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that exceeding the byte budget evicts the oldest track."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=10)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"12345")):
+            cache.fetch("srv", "1", "/p/1.mp3", 5, "http://s/1")
+            _wait_idle(cache)
+            cache.fetch("srv", "2", "/p/2.mp3", 5, "http://s/2")
+            _wait_idle(cache)
+            assert cache.lookup("srv", "1", "/p/1.mp3", 5) is not None
+            cache.fetch("srv", "3", "/p/3.mp3", 5, "http://s/3")
+            _wait_idle(cache)
+
+        assert cache.contains("srv", "1")
+        assert not cache.contains("srv", "2")
+        assert cache.contains("srv", "3")
+        assert cache.total_bytes() == 10
+
+    def test_rejects_tracks_larger_than_budget(self, tmp_path):
+        """Test that a track that can never fit is not fetched."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=10)
+        assert not cache.fetch("srv", "1", "/p/1.mp3", 11, "http://s/1")
+
+    def test_index_survives_restart(self, tmp_path):
+        """Test that cached entries are reloaded from the index file."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=100)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"xyz")):
+            cache.fetch("srv", "9", "/p/9.ogg", 3, "http://s/9")
+            _wait_idle(cache)
+
+        reloaded = AudioCache(tmp_path, budget_bytes=100)
+        assert reloaded.lookup("srv", "9", "/p/9.ogg", 3) is not None
+
+    def test_lookup_defers_index_writes(self, tmp_path):
+        """Test that cache hits update recency in memory until flush."""
+        from plex_client.audio_cache import AudioCache
+
+        cache = AudioCache(tmp_path, budget_bytes=100)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"abcd")):
+            cache.fetch("srv", "1", "/p/1.mp3", 4, "http://s/1")
+            _wait_idle(cache)
+
+        with patch.object(cache, "_save_locked") as save:
+            for _ in range(5):
+                assert cache.lookup("srv", "1", "/p/1.mp3", 4) is not None
+            save.assert_not_called()
+            cache.flush()
+            save.assert_called_once()
+
+    def test_close_with_purge_removes_files(self, tmp_path):
+        """Test that purging deletes cached tracks and refuses new work."""
+        from plex_client.audio_cache import AudioCache
+
+        root = tmp_path / "audio"
+        cache = AudioCache(root, budget_bytes=100)
+        with patch("plex_client.audio_cache.download_file", side_effect=_fake_download(b"abcd")):
+            cache.fetch("srv", "1", "/p/1.mp3", 4, "http://s/1")
+            _wait_idle(cache)
+
+        cache.close(purge=True)
+
+        assert not root.exists()
+        assert cache.lookup("srv", "1", "/p/1.mp3", 4) is None
+        assert not cache.fetch("srv", "2", "/p/2.mp3", 4, "http://s/2")
+
+
+class TestAudioCacheService:
+    """Test PlexService use of the audio cache."""
+
+    def test_to_playable_serves_cached_track(self, plex_service, tmp_path):
+        """Test that a cached track plays from disk."""
+        cached = tmp_path / "track.flac"
+        cached.write_bytes(b"data")
+        cache = MagicMock()
+        cache.lookup.return_value = cached
+        plex_service.audio_cache = MagicMock(return_value=cache)
+        part = MagicMock()
+        part.key = "/library/parts/5/file.flac"
+        part.size = 4
+        node = MagicMock()
+        node.type = "track"
+        node.title = "Song"
+        node.key = "/library/metadata/5"
+        node.ratingKey = "5"
+        node.viewOffset = 0
+        node.media = [MagicMock(parts=[part])]
+
+        media = plex_service.to_playable(node)
+
+        assert media.stream_url == cached.resolve().as_uri()
+        cache.lookup.assert_called_once_with("server123", "5", "/library/parts/5/file.flac", 4)
+
+    def test_cache_audio_ignores_video(self, plex_service):
+        """Test that only music is copied into the cache."""
+        from plex_client.plex_service import PlayableMedia
+
+        plex_service.audio_cache = MagicMock()
+        media = PlayableMedia(
+            title="Movie",
+            media_type="movie",
+            key="/library/metadata/1",
+            stream_url="http://s/1",
+            browser_url="http://s/1",
+            resume_offset=0,
+            item=MagicMock(),
+        )
+
+        assert not plex_service.cache_audio(media)
+        plex_service.audio_cache.assert_not_called()
+
+    def test_budget_change_reaches_loaded_cache(self, plex_service):
+        """Test that a new size is stored and applied to the open cache."""
+        cache = MagicMock()
+        plex_service._audio_cache = cache
+        plex_service._config.get_audio_cache_budget.return_value = 512 * 1024 * 1024
+
+        plex_service.set_audio_cache_budget(512)
+
+        plex_service._config.set_audio_cache_budget_mb.assert_called_once_with(512)
+        cache.set_budget.assert_called_once_with(512 * 1024 * 1024)
+
+    def test_reenable_waits_for_purge(self, plex_service, tmp_path):
+        """Test that no new cache opens on the root while the disabled one is still being deleted."""
+        import threading
+
+        release = threading.Event()
+        old_cache = MagicMock()
+        old_cache.close.side_effect = lambda purge: release.wait(5)
+        plex_service._audio_cache = old_cache
+        plex_service._config.cache_dir.return_value = tmp_path
+        plex_service._config.get_audio_cache_enabled.return_value = True
+        plex_service._config.get_audio_cache_budget.return_value = 1024
+
+        plex_service.set_audio_cache_enabled(False)
+        assert plex_service.audio_cache() is None
+
+        release.set()
+        plex_service._audio_cache_purge.join(5)
+        assert plex_service.audio_cache() is not None
+        old_cache.close.assert_called_once_with(purge=True)
+        plex_service.audio_cache().close()
@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import MagicMock, patch, mock_open
 import json
 import os
+import time
 
 
 class TestConfigStore:
@@ -46,6 +47,59 @@ class TestConfigStore:
         assert hasattr(ConfigStore, 'get_selected_server')
 
 
+class TestConfigWriteBehind:
+    """Test debounced and batched configuration writes."""
+
+    def _store(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PLEXIBLE_CONFIG_DIR", str(tmp_path))
+        from plex_client.config import ConfigStore
+
+        return ConfigStore()
+
+    def test_set_is_written_after_delay(self, tmp_path, monkeypatch):
+        """Test that a burst of updates is saved once, after the debounce delay."""
+        store = self._store(tmp_path, monkeypatch)
+        store.SAVE_DELAY = 0.05
+        with patch.object(store, "_save_to_disk", wraps=store._save_to_disk) as save:
+            store.set_vlc_path("C:/vlc")
+            store.set_selected_server("abc")
+            assert not (tmp_path / "config.json").exists()
+            deadline = time.monotonic() + 5
+            while save.call_count == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert save.call_count == 1
+        saved = json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+        assert saved["vlc_path"] == "C:/vlc"
+        assert saved["selected_server"] == "abc"
+
+    def test_flush_writes_immediately(self, tmp_path, monkeypatch):
+        """Test that flush saves pending changes without waiting."""
+        store = self._store(tmp_path, monkeypatch)
+        store.set_selected_server_name("Den")
+        store.flush()
+
+        saved = json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+        assert saved["selected_server_name"] == "Den"
+
+    def test_batch_writes_once_and_rolls_back(self, tmp_path, monkeypatch):
+        """Test that a batch commits with one write and discards changes when it fails."""
+        store = self._store(tmp_path, monkeypatch)
+        with patch.object(store, "_save_to_disk") as save:
+            with store.batch():
+                store.set_selected_server("abc")
+                store.promote_preferred_server("abc", "Den")
+            assert save.call_count == 1
+
+            with pytest.raises(RuntimeError):
+                with store.batch():
+                    store.set_selected_server("other")
+                    raise RuntimeError("connect failed")
+            assert save.call_count == 1
+
+        assert store.get_selected_server() == "abc"
+
+
 class TestAuthManager:
     """Test AuthManager functionality."""
 
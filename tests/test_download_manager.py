@@ -0,0 +1,186 @@
+"""Tests for the offline download manager."""
+from __future__ import annotations
+
+import threading
+import time
+
+from unittest.mock import MagicMock, patch
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestDownloadManager:
+    """Test queueing, scheduling and persistence of offline downloads."""
+
+    def test_completed_job_is_served_locally(self, tmp_path):
+        """Test that a finished download is reported through local_path."""
+        from plex_client.download_manager import DONE, DownloadManager
+
+        def fake_download(url, dest, **kwargs):
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(b"12345")
+            return dest
+
+        resolver = MagicMock(return_value="http://server/part?download=1")
+        with patch("plex_client.download_manager.download_file", side_effect=fake_download):
+            manager = DownloadManager(tmp_path, resolver)
+            job = manager.enqueue("srv", "42", "Pilot", "/library/parts/1/file.mkv", "Pilot.mkv", 5)
+            assert _wait_for(lambda: job.status == DONE)
+
+        path = manager.local_path("srv", "42", "/library/parts/1/file.mkv")
+        assert path is not None and path.read_bytes() == b"12345"
+        assert manager.local_path("srv", "42", "/library/parts/2/other.mkv") is None
+        resolver.assert_called_once_with(job)
+
+    def test_local_path_rejects_size_mismatch(self, tmp_path):
+        """Test that a truncated local file is not treated as playable."""
+        from plex_client.download_manager import DONE, DownloadManager
+
+        manager = DownloadManager(tmp_path, MagicMock(return_value=None))
+        with patch.object(manager, "_schedule"):
+            job = manager.enqueue("srv", "7", "Song", "/p/7", "song.flac", 10)
+        job.status = DONE
+        dest = manager.destination(job)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(b"short")
+
+        assert manager.local_path("srv", "7") is None
+
+    def test_per_server_limit(self, tmp_path):
+        """Test that no more than per_server jobs run against one server at a time."""
+        from plex_client.download_manager import QUEUED, RUNNING, DownloadManager
+
+        release = threading.Event()
+
+        def blocking_download(url, dest, **kwargs):
+            release.wait(5)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(b"x")
+            return dest
+
+        with patch("plex_client.download_manager.download_file", side_effect=blocking_download):
+            manager = DownloadManager(tmp_path, MagicMock(return_value="http://s/p"), per_server=1, max_total=4)
+            first = manager.enqueue("a", "1", "One", "/p/1", "one.mp3")
+            second = manager.enqueue("a", "2", "Two", "/p/2", "two.mp3")
+            other = manager.enqueue("b", "3", "Three", "/p/3", "three.mp3")
+
+            assert first.status == RUNNING
+            assert second.status == QUEUED
+            assert other.status == RUNNING
+            release.set()
+            assert _wait_for(lambda: all(job.status == "done" for job in manager.jobs()))
+
+    def test_unresolved_job_waits_for_server(self, tmp_path):
+        """Test that jobs for a disconnected server are parked until it is back."""
+        from plex_client.download_manager import WAITING, DownloadManager
+
+        manager = DownloadManager(tmp_path, MagicMock(return_value=None))
+        job = manager.enqueue("srv", "1", "Movie", "/p/1", "movie.mkv")
+
+        assert _wait_for(lambda: job.status == WAITING)
+
+    def test_running_jobs_are_requeued_after_restart(self, tmp_path):
+        """Test that the persisted queue survives a restart and interrupted jobs resume."""
+        from plex_client.download_manager import QUEUED, RUNNING, DownloadManager
+
+        manager = DownloadManager(tmp_path, MagicMock(return_value=None))
+        with patch.object(manager, "_schedule"):
+            job = manager.enqueue("srv", "5", "Episode", "/p/5", "ep.mkv", 100)
+        job.status = RUNNING
+        manager._save()
+
+        reloaded = DownloadManager(tmp_path, MagicMock(return_value=None))
+
+        restored = reloaded.job("srv:5")
+        assert restored is not None
+        assert restored.status == QUEUED
+        assert restored.size == 100
+
+    def test_enqueue_deduplicates(self, tmp_path):
+        """Test that queueing the same part twice returns the existing job."""
+        from plex_client.download_manager import DownloadManager
+
+        manager = DownloadManager(tmp_path, MagicMock(return_value=None))
+        with patch.object(manager, "_schedule"):
+            first = manager.enqueue("srv", "9", "Track", "/p/9", "t.mp3")
+            second = manager.enqueue("srv", "9", "Track", "/p/9", "t.mp3")
+
+        assert first is second
+        assert len(manager.jobs()) == 1
+
+
+class TestBandwidthLimiter:
+    """Test the shared download throttle."""
+
+    def test_unlimited_does_not_sleep(self):
+        """Test that no rate limit never blocks."""
+        from plex_client.download_manager import BandwidthLimiter
+
+        limiter = BandwidthLimiter(None)
+        with patch("plex_client.download_manager.time.sleep") as sleep:
+            limiter.consume(10 * 1024 * 1024)
+        sleep.assert_not_called()
+
+    def test_limited_rate_sleeps(self):
+        """Test that exceeding the budget delays the caller."""
+        from plex_client.download_manager import BandwidthLimiter
+
+        limiter = BandwidthLimiter(8)  # 1000 bytes per second
+        with patch("plex_client.download_manager.time.sleep") as sleep:
+            limiter.consume(1500)
+        assert sleep.called
+
+
+class TestOfflinePlayback:
+    """Test PlexService integration with offline downloads."""
+
+    def test_to_playable_prefers_local_file(self, plex_service, tmp_path):
+        """Test that a completed download is played from disk without probing the server."""
+        local = tmp_path / "movie.mkv"
+        local.write_bytes(b"data")
+        manager = MagicMock()
+        manager.local_path.return_value = local
+        plex_service.download_manager = MagicMock(return_value=manager)
+        part = MagicMock()
+        part.key = "/library/parts/1/file.mkv"
+        node = MagicMock()
+        node.type = "movie"
+        node.title = "Movie"
+        node.key = "/library/metadata/1"
+        node.ratingKey = "1"
+        node.viewOffset = 0
+        node.media = [MagicMock(parts=[part])]
+
+        media = plex_service.to_playable(node)
+
+        assert media.stream_url == local.resolve().as_uri()
+        assert media.preferred_url == media.stream_url
+        manager.local_path.assert_called_once_with("server123", "1", "/library/parts/1/file.mkv")
+
+    def test_offline_items_expands_season(self, plex_service):
+        """Test that a season is expanded into its episodes."""
+        episode = MagicMock()
+        episode.type = "episode"
+        season = MagicMock()
+        season.type = "season"
+        season.episodes.return_value = [episode]
+
+        assert plex_service.offline_items(season) == [episode]
+
+    def test_probe_accepts_local_file(self, tmp_path):
+        """Test that file URLs are probed on disk instead of over HTTP."""
+        from plex_client.stream_probe import describe_stream, probe_stream
+
+        local = tmp_path / "song.flac"
+        local.write_bytes(b"x")
+
+        assert probe_stream(local.as_uri())
+        assert not probe_stream((tmp_path / "missing.flac").as_uri())
+        assert describe_stream(local.as_uri()) == "Local"
@@ -0,0 +1,101 @@
+"""Tests for the per-show episode index."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+
+def _episode(rating_key, season, index, view_count=0, view_offset=0, show_key="show"):
+    episode = MagicMock()
+    episode.type = "episode"
+    episode.ratingKey = rating_key
+    episode.grandparentRatingKey = show_key
+    episode.parentRatingKey = f"season{season}"
+    episode.parentIndex = season
+    episode.index = index
+    episode.viewCount = view_count
+    episode.viewOffset = view_offset
+    return episode
+
+
+class TestEpisodeIndex:
+    """Test ordering and next-episode lookups."""
+
+    def test_records_are_in_play_order(self):
+        """Test that episodes are ordered by season, then episode number."""
+        from plex_client.episode_index import EpisodeIndex
+
+        index = EpisodeIndex("show", [_episode("c", 2, 1), _episode("b", 1, 2), _episode("a", 1, 1)])
+
+        assert [record.rating_key for record in index.records] == ["a", "b", "c"]
+        assert index.next_after("b").rating_key == "c"
+        assert index.next_after("c") is None
+        assert "season2" in set(index.keys())
+
+    def test_next_skips_watched_episodes(self):
+        """Test that already watched episodes are skipped unless every later one is watched."""
+        from plex_client.episode_index import EpisodeIndex
+
+        index = EpisodeIndex(
+            "show",
+            [_episode("a", 1, 1), _episode("b", 1, 2, view_count=1), _episode("c", 1, 3)],
+        )
+        assert index.next_after("a").rating_key == "c"
+
+        rewatch = EpisodeIndex("show", [_episode("a", 1, 1), _episode("b", 1, 2, view_count=1)])
+        assert rewatch.next_after("a").rating_key == "b"
+
+
+class TestServiceEpisodeIndex:
+    """Test PlexService use of the episode index."""
+
+    def test_next_episode_from_one_listing(self, plex_service, mock_server):
+        """Test that repeated lookups are answered from one allLeaves request."""
+        episodes = [_episode("1", 1, 1), _episode("2", 1, 2), _episode("3", 2, 1)]
+        mock_server.fetchItems = MagicMock(return_value=episodes)
+
+        assert plex_service.find_next_episode(episodes[0]) is episodes[1]
+        assert plex_service.find_next_episode(episodes[1]) is episodes[2]
+        assert plex_service.find_next_episode(episodes[2]) is None
+
+        mock_server.fetchItems.assert_called_once_with("/library/metadata/show/allLeaves")
+        episodes[0].show.assert_not_called()
+
+    def test_timeline_alert_invalidates_owner_show(self, plex_service, mock_server):
+        """Test that an alert for one episode drops its show's index."""
+        episodes = [_episode("1", 1, 1), _episode("2", 1, 2)]
+        mock_server.fetchItems = MagicMock(return_value=episodes)
+        plex_service.find_next_episode(episodes[0])
+
+        plex_service._dispatch_alert({"type": "timeline", "TimelineEntry": [{"type": 4, "itemID": "2"}]})
+        plex_service.find_next_episode(episodes[0])
+
+        assert mock_server.fetchItems.call_count == 2
+
+    def test_change_during_listing_only_discards_that_show(self, plex_service, mock_server):
+        """Test that an invalidation racing one show's listing leaves other shows cached."""
+        other = [_episode("9", 1, 1, show_key="other")]
+        episodes = [_episode("1", 1, 1), _episode("2", 1, 2)]
+
+        def fetch(path):
+            if path.startswith("/library/metadata/other"):
+                return other
+            plex_service._invalidate_episode_index("2")
+            return episodes
+
+        mock_server.fetchItems = MagicMock(side_effect=fetch)
+        plex_service._episode_index("other")
+        plex_service._episode_index("show")
+
+        assert "other" in plex_service._episode_indexes
+        assert "show" not in plex_service._episode_indexes
+
+    def test_mark_watched_invalidates_after_the_server_call(self, plex_service, mock_server):
+        """Test that an index rebuilt while marking watched is dropped once the change lands."""
+        episodes = [_episode("1", 1, 1), _episode("2", 1, 2)]
+        mock_server.fetchItems = MagicMock(return_value=episodes)
+        episodes[0].markWatched.side_effect = lambda: plex_service._episode_index("show")
+
+        plex_service.mark_watched(episodes[0])
+
+        episodes[0].markWatched.assert_called_once_with()
+        assert "show" not in plex_service._episode_indexes
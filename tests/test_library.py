@@ -180,3 +180,36 @@ class TestLibraryDiscovery:
         
         assert len(hubs) == 1
         mock_library_section.hubs.assert_called_once()
+
+
+class TestWatchQueues:
+    """Test building the Continue Watching and Up Next queues."""
+
+    def _episode(self, rating_key, show):
+        episode = MagicMock()
+        episode.type = "episode"
+        episode.ratingKey = rating_key
+        episode.grandparentRatingKey = show.ratingKey
+        episode.parentRatingKey = f"season-{show.ratingKey}"
+        episode.viewOffset = 1000
+        episode.duration = 60000
+        episode.show = MagicMock(return_value=show)
+        return episode
+
+    def test_shared_show_lookups_and_stable_order(self, plex_service, mock_server):
+        """Test that episodes of one show share lookups and the queues keep deck order."""
+        show = MagicMock()
+        show.ratingKey = "s1"
+        upcoming = MagicMock()
+        upcoming.ratingKey = "next"
+        show.onDeck = MagicMock(return_value=upcoming)
+        deck = [self._episode(str(key), show) for key in range(8)]
+        mock_server.library.onDeck.return_value = deck
+        plex_service.to_playable = MagicMock(side_effect=lambda item, decide=True: item.ratingKey)
+
+        continue_items, up_next = plex_service.watch_queues()
+
+        assert continue_items == [str(key) for key in range(8)]
+        assert up_next == ["next"]
+        show.onDeck.assert_called_once()
+        assert sum(episode.show.call_count for episode in deck) == 1
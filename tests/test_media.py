@@ -174,3 +174,248 @@ class TestDownload:
         
         assert result == "/path/to/logs.zip"
         mock_server.downloadLogs.assert_called_once()
+
+
+class TestStreamResolutionCache:
+    """Test memoized stream resolution."""
+
+    def _track(self, rating_key="42"):
+        part = MagicMock()
+        part.key = "/library/parts/7/file.flac"
+        media = MagicMock()
+        media.parts = [part]
+        track = MagicMock()
+        track.type = "track"
+        track.title = "Song"
+        track.key = f"/library/metadata/{rating_key}"
+        track.ratingKey = rating_key
+        track.viewOffset = 0
+        track.media = [media]
+        track.getStreamURL = MagicMock(return_value="http://localhost:32400/audio/:/transcode/universal/start.m3u8?offset=0")
+        return track
+
+    def test_replay_skips_resolution(self, plex_service, mock_server):
+        """Test that a second resolution reuses the cached URLs."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        track = self._track()
+
+        first = plex_service.to_playable(track)
+        second = plex_service.to_playable(track)
+
+        assert second.stream_url == first.stream_url
+        assert track.getStreamURL.call_count == 1
+
+    def test_successful_candidate_is_preferred(self, plex_service, mock_server):
+        """Test that the last working URL is offered first on replay."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        track = self._track()
+        media = plex_service.to_playable(track)
+
+        plex_service.record_stream_result(media, media.browser_url)
+        assert plex_service.to_playable(track).preferred_url == media.browser_url
+
+        plex_service.record_stream_result(media, None)
+        assert plex_service.to_playable(track).preferred_url is None
+
+    def test_token_change_invalidates(self, plex_service, mock_server):
+        """Test that a new server token forces a fresh resolution."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        track = self._track()
+        plex_service.to_playable(track)
+
+        mock_server._token = "rotated"
+        media = plex_service.to_playable(track)
+
+        assert track.getStreamURL.call_count == 2
+        assert "X-Plex-Token=rotated" in media.stream_url
+
+    def test_resume_offset_is_refreshed(self, plex_service, mock_server):
+        """Test that cached transcode URLs follow the current resume offset."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        track = self._track()
+        plex_service.to_playable(track)
+
+        track.viewOffset = 5000
+        media = plex_service.to_playable(track)
+
+        assert "offset=5000" in media.browser_url
+        assert media.resume_offset == 5000
+
+
+class TestTimelineConfirmation:
+    """Test the split timeline push and background confirmation."""
+
+    def _media(self, item):
+        from plex_client.plex_service import PlayableMedia
+
+        return PlayableMedia(
+            title=item.title,
+            media_type=item.type,
+            key=item.key,
+            stream_url="http://server/stream",
+            browser_url=None,
+            resume_offset=0,
+            item=item,
+        )
+
+    def _container(self, offset):
+        element = MagicMock()
+        element.attrib = {"viewOffset": str(offset)}
+        container = MagicMock()
+        container.__len__.return_value = 1
+        container.__getitem__.return_value = element
+        return container
+
+    def test_push_does_not_reload(self, plex_service, mock_video):
+        """Test that pushing progress sends the update without polling the item."""
+        media = self._media(mock_video)
+
+        push = plex_service.push_timeline(media, "paused", 60000, 7200000)
+
+        assert push.accepted
+        assert push.send_state == "paused"
+        mock_video.updateTimeline.assert_called_once_with(60000, state="paused", duration=7200000)
+        mock_video.reload.assert_not_called()
+
+    def test_stop_before_end_is_sent_as_paused(self, plex_service, mock_video):
+        """Test that stopping part way keeps the item resumable."""
+        push = plex_service.push_timeline(self._media(mock_video), "stopped", 60000, 7200000)
+
+        assert push.send_state == "paused"
+        assert not push.near_completion
+
+    def test_confirmation_backs_off_until_offset_matches(self, plex_service, mock_video):
+        """Test that confirmation retries the lightweight query and resolves the future."""
+        from unittest.mock import patch
+
+        media = self._media(mock_video)
+        push = plex_service.push_timeline(media, "paused", 60000, 7200000)
+        plex_service._server.query = MagicMock(side_effect=[self._container(1000), self._container(60000)])
+        received = []
+
+        with patch.object(plex_service._timeline_confirm_stop, "wait") as sleep:
+            future = plex_service.confirm_timeline(media, push, received.append)
+            assert future.result(timeout=5) == 60000
+
+        sleep.assert_called_once_with(0.25)
+        assert plex_service._server.query.call_args[0][0] == "/library/metadata/12345"
+        assert received == [60000]
+        mock_video.reload.assert_not_called()
+
+    def test_newer_push_supersedes_confirmation(self, plex_service, mock_video):
+        """Test that an older confirmation resolves to None once a newer push exists."""
+        from unittest.mock import patch
+
+        media = self._media(mock_video)
+        push = plex_service.push_timeline(media, "paused", 60000, 7200000)
+        plex_service._server.query = MagicMock(return_value=self._container(1000))
+
+        def bump(_delay):
+            plex_service._timeline_confirm_generation["12345"] += 1
+
+        received = []
+        with patch.object(plex_service._timeline_confirm_stop, "wait", side_effect=bump):
+            assert plex_service.confirm_timeline(media, push, received.append).result(timeout=5) is None
+
+        assert plex_service._server.query.call_count == 1
+        assert received == []
+
+    def test_shutdown_abandons_confirmations(self, plex_service, mock_video):
+        """Test that shutting down stops the executor and later confirmations resolve to None."""
+        media = self._media(mock_video)
+        push = plex_service.push_timeline(media, "paused", 60000, 7200000)
+        plex_service._server.query = MagicMock(return_value=self._container(1000))
+
+        plex_service.shutdown_timeline_confirmations()
+
+        assert plex_service._timeline_confirm_executor is None
+        assert plex_service.confirm_timeline(media, push).result(timeout=1) is None
+        plex_service._server.query.assert_not_called()
+
+
+class TestProgressByKey:
+    """Test sending cached progress without loading the item."""
+
+    def _container(self, offset):
+        element = MagicMock()
+        element.attrib = {"viewOffset": str(offset)}
+        container = MagicMock()
+        container.__len__.return_value = 1
+        container.__getitem__.return_value = element
+        return container
+
+    def test_sends_timeline_without_fetching(self, plex_service, mock_server):
+        """Test that progress goes to the timeline endpoint and only viewOffset is read back."""
+        mock_server.query = MagicMock(return_value=self._container(60000))
+        plex_service.fetch_item = MagicMock()
+
+        state, offset = plex_service.update_progress_by_key("12345", 60000, 7200000, "stopped")
+
+        assert (state, offset) == ("paused", 60000)
+        plex_service.fetch_item.assert_not_called()
+        paths = [call.args[0] for call in mock_server.query.call_args_list]
+        assert paths == ["/:/timeline", "/:/progress", "/library/metadata/12345"]
+        params = mock_server.query.call_args_list[0].kwargs["params"]
+        assert params["ratingKey"] == "12345"
+        assert params["state"] == "paused"
+
+    def test_stale_offset_is_not_confirmed(self, plex_service, mock_server):
+        """Test that reading back the old offset reports the update as unconfirmed."""
+        mock_server.query = MagicMock(return_value=self._container(1000))
+
+        _state, offset = plex_service.update_progress_by_key("12345", 60000, 7200000, "paused")
+
+        assert offset == 0
+
+    def test_near_completion_scrobbles(self, plex_service, mock_server):
+        """Test that finishing an item marks it watched instead of saving a resume point."""
+        mock_server.query = MagicMock(return_value=self._container(0))
+
+        state, offset = plex_service.update_progress_by_key("12345", 7100000, 7200000, "stopped")
+
+        assert (state, offset) == ("stopped", 7200000)
+        paths = [call.args[0] for call in mock_server.query.call_args_list]
+        assert "/:/scrobble" in paths
+        assert "/:/progress" not in paths
+
+
+class TestPlayableByKey:
+    """Test the short-lived resolution cache used by the queue merge."""
+
+    def _resolve(self, plex_service, mock_server, mock_video):
+        from plex_client.plex_service import PlayableMedia
+
+        mock_server.fetchItem = MagicMock(return_value=mock_video)
+        plex_service.to_playable = MagicMock(
+            return_value=PlayableMedia(
+                title=mock_video.title,
+                media_type=mock_video.type,
+                key=mock_video.key,
+                stream_url="http://server/stream",
+                browser_url=None,
+                resume_offset=0,
+                item=mock_video,
+            )
+        )
+
+    def test_repeated_lookups_fetch_once(self, plex_service, mock_server, mock_video):
+        """Test that resolving the same key twice issues one metadata request."""
+        self._resolve(plex_service, mock_server, mock_video)
+
+        first = plex_service.playable_by_key("12345")
+        first.resume_offset = 999
+        second = plex_service.playable_by_key("12345")
+
+        assert mock_server.fetchItem.call_count == 1
+        assert second is not first
+        assert second.resume_offset == 0
+
+    def test_timeline_alert_forces_refetch(self, plex_service, mock_server, mock_video):
+        """Test that an alert about the item drops its cached resolution."""
+        self._resolve(plex_service, mock_server, mock_video)
+        plex_service.playable_by_key("12345")
+
+        plex_service._dispatch_alert({"type": "timeline", "TimelineEntry": [{"type": 1, "itemID": "12345"}]})
+        plex_service.playable_by_key("12345")
+
+        assert mock_server.fetchItem.call_count == 2
@@ -0,0 +1,253 @@
+"""Tests for the columnar music index."""
+from __future__ import annotations
+
+import pytest
+from unittest.mock import MagicMock
+
+
+class TestMusicIndexBrowsing:
+    """Test local letter buckets, counts, sorting and filtering."""
+
+    def test_letter_buckets_follow_title_order(self, music_index):
+        """Test that tracks are grouped by first letter, accents folded."""
+        buckets = {letter: list(keys) for letter, keys in music_index.letter_buckets("tracks")}
+
+        assert list(buckets) == ["#", "A", "B", "E"]
+        assert buckets["A"] == [2]
+        assert buckets["E"] == [3]
+
+    def test_count_and_filter(self, music_index):
+        """Test counting with genre and decade filters."""
+        assert music_index.count("tracks") == 4
+        assert music_index.count("albums") == 3
+        assert music_index.count("tracks", genre="Rock") == 3
+        assert music_index.count("tracks", decade=2010) == 1
+        assert music_index.count("tracks", genre="polka") == 0
+
+    def test_sorted_rating_keys(self, music_index):
+        """Test sorting by title and by a numeric column."""
+        assert music_index.sorted_rating_keys("tracks") == [4, 2, 1, 3]
+        assert music_index.sorted_rating_keys("tracks", sort="year", descending=True)[0] == 4
+
+
+class TestMusicIndexPersistence:
+    """Test memory-mapped persistence of the index."""
+
+    def test_save_and_load_round_trip(self, music_index, tmp_path):
+        """Test that a saved index loads back with the same contents."""
+        music_index.save(tmp_path)
+
+        from plex_client.music_index import MusicIndex
+        loaded = MusicIndex.load(tmp_path)
+
+        assert loaded is not None
+        assert len(loaded) == 4
+        assert loaded.get(3) == music_index.get(3)
+        assert loaded.count("tracks", genre="grunge") == 1
+        assert [list(keys) for _, keys in loaded.letter_buckets("albums")] == [[100, 200, 300]]
+
+    def test_close_unmaps_and_prune_removes_old_generations(self, music_index, tmp_path):
+        """Test that a closed index reads as empty and replaced generations are deleted."""
+        from plex_client.music_index import MusicIndex
+
+        music_index.save(tmp_path)
+        loaded = MusicIndex.load(tmp_path)
+        assert loaded.count("tracks", letter="B") == 1
+        music_index.built_at += 1
+        music_index.save(tmp_path)
+
+        loaded.close()
+        MusicIndex.prune(tmp_path)
+
+        assert len(loaded) == 0
+        assert len(list(tmp_path.glob("gen-*"))) == 1
+
+    def test_load_missing_returns_none(self, tmp_path):
+        """Test that loading from an empty directory yields nothing."""
+        from plex_client.music_index import MusicIndex
+
+        assert MusicIndex.load(tmp_path) is None
+
+
+class TestMusicIndexUpdates:
+    """Test folding changed albums and tracks into a new index generation."""
+
+    def _track(self, rating_key, album_key, title):
+        track = MagicMock()
+        track.ratingKey = rating_key
+        track.title = title
+        track.titleSort = title
+        track.duration = 1000
+        track.parentRatingKey = album_key
+        track.grandparentRatingKey = 10
+        track.grandparentTitle = "Artist 10"
+        track.year = None
+        track.parentYear = None
+        track.genres = []
+        track.viewCount = 0
+        track.lastViewedAt = None
+        track.addedAt = None
+        return track
+
+    def test_updated_replaces_and_adds_rows(self, music_index):
+        """Test that changed tracks replace their rows, new ones are added and the rest are kept."""
+        updated = music_index.updated(
+            [], [self._track(1, 100, "Bravo Remix"), self._track(5, 200, "Delta")], built_at=123.0
+        )
+
+        assert len(updated) == 5
+        assert updated.get(1).title == "Bravo Remix"
+        assert set(updated.get(5).genres) == {"rock", "grunge"}
+        assert updated.get(3) == music_index.get(3)
+        assert updated.count("tracks", genre="Rock") == 4
+        assert updated.built_at == 123.0
+        assert updated.full_built_at == music_index.full_built_at
+
+    def test_loaded_index_finds_rows_by_rating_key(self, music_index, tmp_path):
+        """Test that lookups on a mapped index find every key and miss unknown ones."""
+        from plex_client.music_index import MusicIndex
+
+        music_index.save(tmp_path)
+        loaded = MusicIndex.load(tmp_path)
+
+        assert [loaded.get(key).title for key in (4, 1, 3, 2)] == ["99 Problems", "Bravo", "\u00c9clair", "alpha"]
+        assert loaded.get(6) is None
+
+
+class TestServiceMusicIndex:
+    """Test PlexService use of the music index."""
+
+    def test_alpha_buckets_served_from_index(self, plex_service, mock_music_section, mock_server, music_index):
+        """Test that track buckets come from the index without a server round trip."""
+        plex_service._music_indexes[plex_service._radio_cache_key(mock_music_section)] = music_index
+        plex_service._fetch_first_character_entries = MagicMock()
+
+        buckets = plex_service._music_alpha_buckets(mock_music_section, "tracks")
+
+        plex_service._fetch_first_character_entries.assert_not_called()
+        assert [bucket.character for bucket in buckets] == ["#", "A", "B", "E"]
+        assert buckets[1].count == 1
+
+        item = MagicMock(ratingKey=2)
+        mock_server.fetchItems.return_value = [item]
+        assert plex_service._music_alpha_bucket_items(buckets[1]) == [item]
+        mock_server.fetchItems.assert_called_once_with("/library/metadata/2")
+
+    def test_stale_index_is_updated_incrementally(self, plex_service, mock_music_section, music_index):
+        """Test that a stale index only fetches items updated since it was built."""
+        plex_service._music_index_dir = MagicMock(return_value=None)
+        plex_service._build_music_index = MagicMock()
+        plex_service._section_total = MagicMock(side_effect=lambda section, libtype: 4 if libtype == 10 else 3)
+        plex_service._iter_section_items = MagicMock(return_value=iter(()))
+
+        updated = plex_service._refresh_music_index(mock_music_section, music_index)
+
+        plex_service._build_music_index.assert_not_called()
+        assert len(updated) == 4
+        filters = plex_service._iter_section_items.call_args.kwargs["filters"]
+        assert filters.startswith("&updatedAt>>=")
+
+    def test_count_mismatch_rebuilds_index(self, plex_service, mock_music_section, music_index):
+        """Test that a deletion, visible only as a lower total, triggers a full rebuild."""
+        plex_service._music_index_dir = MagicMock(return_value=None)
+        plex_service._build_music_index = MagicMock(return_value="rebuilt")
+        plex_service._section_total = MagicMock(return_value=2)
+        plex_service._iter_section_items = MagicMock(return_value=iter(()))
+
+        assert plex_service._refresh_music_index(mock_music_section, music_index) == "rebuilt"
+
+    def test_old_index_is_rebuilt_from_scratch(self, plex_service, mock_music_section, music_index):
+        """Test that an index past the rebuild age skips the incremental path."""
+        plex_service._build_music_index = MagicMock(return_value="rebuilt")
+        plex_service._iter_section_items = MagicMock()
+        music_index.full_built_at = 1.0
+
+        assert plex_service._refresh_music_index(mock_music_section, music_index) == "rebuilt"
+        plex_service._iter_section_items.assert_not_called()
+
+
+class TestMusicBucketPaging:
+    """Test paged loading of alpha bucket contents."""
+
+    def _bucket(self, section, count, rating_keys=()):
+        from plex_client.plex_service import MusicAlphaBucket
+
+        return MusicAlphaBucket(
+            identifier="music:tracks:S",
+            title=f"S ({count})",
+            key="/library/sections/2/all?type=10&firstCharacter=S",
+            category="tracks",
+            libtype="track",
+            section=section,
+            count=count,
+            character="S",
+            rating_keys=rating_keys,
+        )
+
+    def test_first_page_ends_with_more_marker(self, plex_service, mock_music_section):
+        """Test that a large bucket returns one page plus a marker for the next."""
+        from plex_client.plex_service import MusicBucketPage
+
+        mock_music_section.fetchItems = MagicMock(return_value=[MagicMock() for _ in range(200)])
+        bucket = self._bucket(mock_music_section, 450)
+
+        children = plex_service.list_children(bucket)
+
+        assert len(children) == 201
+        marker = children[-1]
+        assert isinstance(marker, MusicBucketPage)
+        assert marker.start == 200
+        mock_music_section.fetchItems.assert_called_once_with(
+            bucket.key, container_start=0, container_size=200, maxresults=200
+        )
+
+    def test_last_page_has_no_marker(self, plex_service, mock_music_section):
+        """Test that the final page is returned without a marker."""
+        from plex_client.plex_service import MusicBucketPage
+
+        mock_music_section.fetchItems = MagicMock(return_value=[MagicMock() for _ in range(50)])
+        bucket = self._bucket(mock_music_section, 450)
+        page = MusicBucketPage(identifier="p", title="More...", bucket=bucket, start=400)
+
+        children = plex_service.list_children(page)
+
+        assert len(children) == 50
+        assert not any(isinstance(child, MusicBucketPage) for child in children)
+        mock_music_section.fetchItems.assert_called_once_with(
+            bucket.key, container_start=400, container_size=200, maxresults=200
+        )
+
+    def test_short_page_keeps_marker_when_more_remain(self, plex_service, mock_music_section):
+        """Test that a page missing items still offers the next page of a larger bucket."""
+        from plex_client.plex_service import MusicBucketPage
+
+        mock_music_section.fetchItems = MagicMock(return_value=[MagicMock() for _ in range(190)])
+        bucket = self._bucket(mock_music_section, 450)
+
+        children = plex_service.list_children(bucket)
+
+        assert len(children) == 191
+        assert isinstance(children[-1], MusicBucketPage)
+
+    def test_unsized_bucket_uses_container_total(self, plex_service, mock_music_section, mock_server):
+        """Test that a bucket without a count is sized from the container totalSize."""
+        from plex_client.plex_service import MusicBucketPage
+
+        mock_music_section.fetchItems = MagicMock(return_value=[MagicMock() for _ in range(120)])
+        mock_server.query.return_value = MagicMock(attrib={"totalSize": "300"})
+        bucket = self._bucket(mock_music_section, 0)
+
+        children = plex_service.list_children(bucket)
+
+        assert isinstance(children[-1], MusicBucketPage)
+        assert mock_server.query.call_args[1]["params"]["X-Plex-Container-Size"] == 0
+
+    def test_indexed_bucket_pages_by_rating_key(self, plex_service, mock_music_section, mock_server):
+        """Test that indexed buckets fetch only the requested slice of rating keys."""
+        bucket = self._bucket(mock_music_section, 3, rating_keys=[7, 8, 9])
+        mock_server.fetchItems.return_value = [MagicMock(ratingKey=9), MagicMock(ratingKey=7), MagicMock(ratingKey=8)]
+
+        children = plex_service.list_children(bucket)
+
+        assert [child.ratingKey for child in children] == [7, 8, 9]
+        mock_server.fetchItems.assert_called_once_with("/library/metadata/7,8,9")
@@ -0,0 +1,86 @@
+"""Tests for the client-side local radio engine."""
+from __future__ import annotations
+
+import random
+
+import pytest
+from unittest.mock import MagicMock
+
+
+class TestLocalTrackIndex:
+    """Test the track records the local radio engine reads."""
+
+    def test_tracks_inherit_album_metadata(self, music_index):
+        """Test that tracks pick up year and genres from their album."""
+        track = music_index.get(3)
+
+        assert track.year == 1995
+        assert track.decade == 1990
+        assert track.genres == ("rock", "grunge")
+
+    def test_artist_similarity_uses_genres(self, music_index):
+        """Test artist similarity based on shared genres."""
+        assert music_index.artist_similarity("10", "10") == 1.0
+        assert music_index.artist_similarity("10", "20") == pytest.approx(0.5)
+        assert music_index.artist_similarity("10", "30") == 0.0
+
+
+class TestLocalRadioSampler:
+    """Test weighted sampling for local radio."""
+
+    def test_sample_never_repeats_tracks(self, music_index):
+        """Test that a sampler does not return the same track twice."""
+        from plex_client.music_radio import LocalRadioSampler
+
+        sampler = LocalRadioSampler(music_index, "library_radio", rng=random.Random(1))
+        picks = sampler.sample(10)
+
+        keys = [track.rating_key for track in picks]
+        assert len(keys) == 4
+        assert len(set(keys)) == 4
+
+    def test_similar_tracks_weigh_more(self, music_index):
+        """Test that genre, decade and artist similarity raise the weight."""
+        from plex_client.music_radio import LocalRadioSampler
+
+        seed = music_index.get(1)
+        sampler = LocalRadioSampler(music_index, "library_radio", seed=seed)
+
+        assert sampler.weight(seed) == 0.0
+        assert sampler.weight(music_index.get(3)) > sampler.weight(music_index.get(4))
+
+
+class TestLocalRadioQueue:
+    """Test the PlayQueue stand-in used by local radio."""
+
+    def test_refresh_appends_resolved_items(self, music_index):
+        """Test that refresh resolves sampled tracks into queue items."""
+        from plex_client.music_radio import LocalRadioQueue, LocalRadioSampler
+
+        sampler = LocalRadioSampler(music_index, "shuffle_radio", rng=random.Random(2))
+        resolver = MagicMock(side_effect=lambda key: f"item-{key}")
+        queue = LocalRadioQueue(sampler, resolver)
+
+        queue.refresh()
+
+        assert len(queue.items) == 4
+        with pytest.raises(RuntimeError):
+            queue.refresh()
+
+
+class TestServiceLocalRadio:
+    """Test PlexService integration with the local radio engine."""
+
+    def test_synthetic_radio_uses_local_index(self, plex_service, mock_music_section, music_index):
+        """Test that synthetic radio starts from a ready local index."""
+        plex_service._music_indexes[plex_service._radio_cache_key(mock_music_section)] = music_index
+        plex_service.fetch_item = MagicMock(side_effect=lambda key: MagicMock(ratingKey=key, type="track"))
+        plex_service.to_playable = MagicMock(return_value=MagicMock())
+
+        media, session = plex_service._start_synthetic_radio(
+            mock_music_section, "library_radio", "Library Radio", seed_rating_key="3"
+        )
+
+        assert session.kind == "library_radio"
+        assert session.metadata["source_uri"].startswith("local://radio/")
+        plex_service.fetch_item.assert_any_call("3")
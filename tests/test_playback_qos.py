@@ -0,0 +1,113 @@
+"""Tests for playback QoS instrumentation."""
+from __future__ import annotations
+
+import json
+
+from unittest.mock import MagicMock, patch
+
+
+class TestPlaybackQosRecorder:
+    """Test per-session QoS collection."""
+
+    def test_startup_latency_and_stalls(self):
+        """Test that startup latency and mid-play buffering are tracked separately."""
+        from plex_client.playback_qos import PlaybackQosRecorder
+
+        recorder = PlaybackQosRecorder()
+        with patch("plex_client.playback_qos.time.monotonic", side_effect=[10.0, 10.5, 10.8, 20.0, 21.5]):
+            recorder.begin("Film", "9", server="Home", connection_type="relay")
+            recorder.buffering(40.0)
+            recorder.mark_started("HLS")
+            recorder.buffering(10.0)
+            recorder.buffering(100.0)
+        session = recorder.end("stopped")
+
+        assert session.startup_ms == 800
+        assert session.buffering_events == 1
+        assert session.buffering_ms == 1500
+        assert session.stream_kind == "HLS"
+
+    def test_stats_samples_are_averaged(self):
+        """Test that LibVLC bitrates are converted to kbps and averaged."""
+        from plex_client.playback_qos import PlaybackQosRecorder
+
+        recorder = PlaybackQosRecorder()
+        recorder.begin("Film", "9")
+        recorder.sample(MagicMock(input_bitrate=0.5, demux_bitrate=0.25, lost_pictures=1, displayed_pictures=10))
+        recorder.sample(MagicMock(input_bitrate=0.25, demux_bitrate=0.25, lost_pictures=3, displayed_pictures=20))
+        session = recorder.end()
+
+        assert session.input_kbps_avg == 3000.0
+        assert session.input_kbps_min == 2000.0
+        assert session.lost_pictures == 3
+        assert session.outcome == "abandoned"
+
+    def test_summary_groups_by_connection(self):
+        """Test aggregation per connection type."""
+        from plex_client.playback_qos import PlaybackQosRecorder
+
+        recorder = PlaybackQosRecorder()
+        for connection, outcome in (("local", "stopped"), ("relay", "failed"), ("relay", "stopped")):
+            recorder.begin("Item", None, connection_type=connection)
+            if outcome != "failed":
+                recorder.mark_started("Direct")
+            recorder.end(outcome)
+
+        summaries = {summary.connection_type: summary for summary in recorder.summary_by_connection()}
+
+        assert summaries["local"].sessions == 1
+        assert summaries["relay"].sessions == 2
+        assert summaries["relay"].failures == 1
+
+    def test_sessions_are_logged_and_exported_as_jsonl(self, tmp_path):
+        """Test the persistent log and the export file."""
+        from plex_client.playback_qos import PlaybackQosRecorder
+
+        log_path = tmp_path / "qos.jsonl"
+        recorder = PlaybackQosRecorder(log_path)
+        recorder.begin("First", "1", connection_type="local")
+        recorder.begin("Second", "2", connection_type="local")
+        recorder.end()
+
+        exported = tmp_path / "export" / "out.jsonl"
+        assert recorder.export(exported) == 2
+        records = [json.loads(line) for line in exported.read_text().splitlines()]
+        assert [record["title"] for record in records] == ["First", "Second"]
+        assert records[0]["outcome"] == "abandoned"
+        assert "_buffering_since" not in records[0]
+        assert len(log_path.read_text().splitlines()) == 2
+
+    def test_log_rolls_over_at_size_limit(self, tmp_path):
+        """Test that the session log is rotated to one backup instead of growing without bound."""
+        from plex_client.playback_qos import PlaybackQosRecorder
+
+        log_path = tmp_path / "qos.jsonl"
+        recorder = PlaybackQosRecorder(log_path, max_log_bytes=1000)
+        for index in range(12):
+            recorder.begin(f"Title {index}", str(index), connection_type="local")
+            recorder.end()
+
+        backup = tmp_path / "qos.jsonl.1"
+        assert log_path.stat().st_size <= 1000
+        assert backup.stat().st_size <= 1000
+        assert json.loads(log_path.read_text().splitlines()[-1])["title"] == "Title 11"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["qos.jsonl", "qos.jsonl.1"]
+
+
+class TestConnectionType:
+    """Test classification of the active server connection."""
+
+    def test_relay_connection(self, plex_service, mock_server, mock_resource):
+        """Test that a relay URI is reported as relay."""
+        relay = MagicMock(uri="https://relay.plex.direct:8443", httpuri="http://1.2.3.4:8443", relay=True, local=False)
+        mock_resource.connections = [relay]
+        mock_server._baseurl = "https://relay.plex.direct:8443"
+
+        assert plex_service.connection_type() == "relay"
+
+    def test_local_connection(self, plex_service, mock_server, mock_resource):
+        """Test that a LAN URI is reported as local."""
+        lan = MagicMock(uri="http://localhost:32400", httpuri="http://localhost:32400", relay=False, local=True)
+        mock_resource.connections = [lan]
+
+        assert plex_service.connection_type() == "local"
@@ -104,3 +104,65 @@ class TestPlaylistFeatures:
         plex_service.playlist_copy_to_user(mock_playlist, "friend@example.com")
         
         mock_playlist.copyToUser.assert_called_once_with("friend@example.com")
+
+
+class TestPlaylistIndex:
+    """Test the cached per-server playlist index."""
+
+    def test_listing_is_cached(self, plex_service, mock_server, mock_playlist):
+        """Test that repeated lookups reuse a single server listing."""
+        mock_server.playlists.return_value = [mock_playlist]
+
+        plex_service.playlists()
+        plex_service.playlists()
+
+        mock_server.playlists.assert_called_once_with()
+
+    def test_type_filter_applied_locally(self, plex_service, mock_server):
+        """Test filtering the cached listing by playlist type."""
+        audio = MagicMock(playlistType="audio", librarySectionID=None)
+        video = MagicMock(playlistType="video", librarySectionID=None)
+        mock_server.playlists.return_value = [audio, video]
+
+        assert plex_service.playlists(playlist_type="audio") == [audio]
+
+    def test_music_playlists_filtered_from_one_listing(self, plex_service, mock_server, mock_music_section):
+        """Test that audio playlists are narrowed to the section without walking the listing twice."""
+        mock_music_section.librarySectionID = mock_music_section.key
+        mine = MagicMock(playlistType="audio", librarySectionID=mock_music_section.key)
+        other = MagicMock(playlistType="audio", librarySectionID="999")
+        mock_server.playlists.return_value = [mine, other]
+        plex_service._indexed_playlists = MagicMock(wraps=plex_service._indexed_playlists)
+
+        assert plex_service._music_audio_playlists(mock_music_section) == [mine]
+        plex_service._indexed_playlists.assert_called_once_with(playlist_type="audio")
+
+    def test_mutations_invalidate_index(self, plex_service, mock_server, mock_playlist, mock_plex_object):
+        """Test that editing a playlist through the service drops the cached listing."""
+        mock_server.playlists.return_value = [mock_playlist]
+        plex_service.playlists()
+
+        plex_service.playlist_add_items(mock_playlist, [mock_plex_object])
+        plex_service.playlists()
+
+        assert mock_server.playlists.call_count == 2
+
+    def test_playlist_alert_invalidates_index(self, plex_service, mock_server, mock_playlist):
+        """Test that a playlist timeline alert drops the cached listing."""
+        mock_server.playlists.return_value = [mock_playlist]
+        plex_service.playlists()
+
+        plex_service._dispatch_alert({"type": "timeline", "TimelineEntry": [{"type": 15, "itemID": "9"}]})
+        plex_service.playlists()
+
+        assert mock_server.playlists.call_count == 2
+
+    def test_unrelated_alert_keeps_index(self, plex_service, mock_server, mock_playlist):
+        """Test that non-playlist alerts leave the cache alone."""
+        mock_server.playlists.return_value = [mock_playlist]
+        plex_service.playlists()
+
+        plex_service._dispatch_alert({"type": "timeline", "TimelineEntry": [{"type": 1, "itemID": "9"}]})
+        plex_service.playlists()
+
+        mock_server.playlists.assert_called_once_with()
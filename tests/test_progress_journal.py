@@ -0,0 +1,126 @@
+"""Tests for the pending progress journal."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+
+class TestProgressJournal:
+    """Test appending, replaying and compacting pending progress."""
+
+    def test_replay_restores_latest_state(self, tmp_path):
+        """Test that a reopened journal holds the last value per item."""
+        from plex_client.progress_journal import ProgressJournal
+
+        path = tmp_path / "progress.journal"
+        journal = ProgressJournal(path)
+        journal.upsert("1", 1000, 60000, "playing")
+        journal.upsert("1", 5000, 60000, "paused")
+        journal.upsert("2", 2000, 60000, "playing")
+        journal.remove("2")
+        journal.close()
+
+        reopened = ProgressJournal(path)
+        assert reopened.snapshot() == {"1": {"position": 5000, "duration": 60000, "state": "paused"}}
+
+    def test_appends_do_not_rewrite_file(self, tmp_path):
+        """Test that each change adds one line instead of rewriting the journal."""
+        from plex_client.progress_journal import ProgressJournal
+
+        path = tmp_path / "progress.journal"
+        journal = ProgressJournal(path)
+        journal.upsert("1", 1000, 60000, "playing")
+        journal.upsert("1", 2000, 60000, "playing")
+        journal.sync()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["position"] for line in lines] == [1000, 2000]
+
+    def test_torn_final_line_is_ignored(self, tmp_path):
+        """Test that a half-written record from a crash is dropped on replay."""
+        from plex_client.progress_journal import ProgressJournal
+
+        path = tmp_path / "progress.journal"
+        path.write_text(
+            '{"op": "set", "key": "1", "position": 3000, "duration": 9000, "state": "paused"}\n{"op": "set", "ke',
+            encoding="utf-8",
+        )
+
+        journal = ProgressJournal(path)
+        journal.upsert("2", 1000, 9000, "playing")
+        journal.close()
+
+        assert set(ProgressJournal(path).snapshot()) == {"1", "2"}
+
+    def test_compaction_keeps_one_record_per_item(self, tmp_path, monkeypatch):
+        """Test that a long journal is rewritten down to its live entries."""
+        from plex_client import progress_journal
+        from plex_client.progress_journal import ProgressJournal
+
+        monkeypatch.setattr(progress_journal, "JOURNAL_COMPACT_MIN", 8)
+        path = tmp_path / "progress.journal"
+        journal = ProgressJournal(path)
+        for position in range(1000, 9000, 1000):
+            journal.upsert("1", position, 60000, "playing")
+        journal.close()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["position"] == 8000
+
+    def test_unsynced_append_is_synced_by_timer(self, tmp_path, monkeypatch):
+        """Test that a lone append is fsynced after the batch window without further writes."""
+        from plex_client import progress_journal
+        from plex_client.progress_journal import ProgressJournal
+
+        monkeypatch.setattr(progress_journal, "JOURNAL_SYNC_INTERVAL", 0.05)
+        journal = ProgressJournal(tmp_path / "progress.journal")
+        synced = threading.Event()
+        original = journal.sync
+
+        def sync():
+            original()
+            synced.set()
+
+        monkeypatch.setattr(journal, "sync", sync)
+        journal._synced_at = time.monotonic()
+        journal.upsert("1", 1000, 60000, "playing")
+
+        assert synced.wait(5)
+        assert journal._unsynced == 0
+        journal.close()
+
+
+class TestConfigPendingProgress:
+    """Test ConfigStore use of the progress journal."""
+
+    def test_legacy_pending_progress_moves_to_journal(self, tmp_path, monkeypatch):
+        """Test that progress stored in config.json is imported once and removed from it."""
+        monkeypatch.setenv("PLEXIBLE_CONFIG_DIR", str(tmp_path))
+        legacy = {"client_id": "abc", "pending_progress": {"7": {"position": 4000, "duration": 8000, "state": "paused"}}}
+        (tmp_path / "config.json").write_text(json.dumps(legacy), encoding="utf-8")
+        from plex_client.config import ConfigStore
+
+        store = ConfigStore()
+
+        assert store.get_pending_entry("7")["position"] == 4000
+        store.flush()
+        assert "pending_progress" not in json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+        assert ConfigStore().get_pending_progress() == store.get_pending_progress()
+
+    def test_progress_updates_leave_config_file_alone(self, tmp_path, monkeypatch):
+        """Test that caching progress does not rewrite config.json."""
+        monkeypatch.setenv("PLEXIBLE_CONFIG_DIR", str(tmp_path))
+        from plex_client.config import ConfigStore
+
+        store = ConfigStore()
+        store.set_auto_check_updates(True)
+        store.flush()
+        before = (tmp_path / "config.json").stat().st_mtime_ns
+
+        store.upsert_pending_progress("9", 1500, 9000, "playing")
+        store.remove_pending_progress("9")
+
+        assert (tmp_path / "config.json").stat().st_mtime_ns == before
+        assert store.get_pending_progress() == {}
@@ -0,0 +1,65 @@
+"""Tests for progress outbox backoff and connectivity tracking."""
+from __future__ import annotations
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressOutbox:
+    """Test per-server and per-entry retry state."""
+
+    def test_offline_backoff_doubles_and_caps(self):
+        """Test that each failed probe doubles the wait before the next one."""
+        from plex_client.progress_outbox import SERVER_RETRY_MAX, ProgressOutbox
+
+        clock = _Clock()
+        outbox = ProgressOutbox(clock=clock)
+
+        assert outbox.probe_delay("srv") is None
+        assert outbox.mark_offline("srv") == 10.0
+        assert outbox.mark_offline("srv") == 20.0
+        assert outbox.probe_delay("srv") == 20.0
+        clock.now += 25
+        assert outbox.probe_delay("srv") == 0.0
+        for _ in range(10):
+            outbox.mark_offline("srv")
+        assert outbox.probe_delay("srv") == SERVER_RETRY_MAX
+
+    def test_servers_are_tracked_separately(self):
+        """Test that one unreachable server does not pause another."""
+        from plex_client.progress_outbox import ProgressOutbox
+
+        outbox = ProgressOutbox(clock=_Clock())
+        outbox.mark_offline("a")
+
+        assert not outbox.is_online("a")
+        assert outbox.is_online("b")
+
+    def test_coming_online_clears_entry_backoff(self):
+        """Test that reconnecting makes every entry due immediately."""
+        from plex_client.progress_outbox import ProgressOutbox
+
+        outbox = ProgressOutbox(clock=_Clock())
+        assert outbox.entry_failed("1") == 5.0
+        assert outbox.entry_failed("1") == 10.0
+        outbox.mark_offline("srv")
+
+        assert outbox.mark_online("srv")
+        assert not outbox.mark_online("srv")
+        assert outbox.entry_delay("1") == 0.0
+
+    def test_offline_error_classification(self):
+        """Test that connection failures are told apart from rejected requests."""
+        import requests
+
+        from plex_client.progress_outbox import is_offline_error
+
+        assert is_offline_error(requests.ConnectionError("refused"))
+        assert is_offline_error(requests.Timeout("slow"))
+        assert not is_offline_error(requests.HTTPError("404"))
+        assert not is_offline_error(ValueError("bad"))
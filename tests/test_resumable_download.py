@@ -0,0 +1,162 @@
+"""Tests for the shared resumable download component."""
+from __future__ import annotations
+
+import hashlib
+import zipfile
+
+import pytest
+from unittest.mock import MagicMock
+
+
+def _response(status, body, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.iter_content = MagicMock(return_value=[body] if body else [])
+    resp.__enter__ = MagicMock(return_value=resp)
+    resp.__exit__ = MagicMock(return_value=False)
+    return resp
+
+
+class TestDownloadFile:
+    """Test resumable, verified downloads."""
+
+    def test_resumes_from_partial_file(self, tmp_path):
+        """Test that an existing .part file is continued with a Range request."""
+        from plex_client.resumable_download import download_file
+
+        payload = b"hello world"
+        dest = tmp_path / "file.zip"
+        (tmp_path / "file.zip.part").write_bytes(payload[:5])
+        session = MagicMock()
+        session.get.return_value = _response(206, payload[5:], {"Content-Range": "bytes 5-10/11"})
+        progress = MagicMock()
+
+        download_file(
+            "http://x/file.zip",
+            dest,
+            sha256=hashlib.sha256(payload).hexdigest(),
+            session=session,
+            progress=progress,
+        )
+
+        assert dest.read_bytes() == payload
+        assert session.get.call_args[1]["headers"]["Range"] == "bytes=5-"
+        progress.assert_called_with(11, 11)
+        assert not (tmp_path / "file.zip.part").exists()
+
+    def test_full_response_restarts_partial(self, tmp_path):
+        """Test that a 200 reply to a Range request rewrites the file from zero."""
+        from plex_client.resumable_download import download_file
+
+        dest = tmp_path / "file.bin"
+        (tmp_path / "file.bin.part").write_bytes(b"stale")
+        session = MagicMock()
+        session.get.return_value = _response(200, b"fresh data", {"Content-Length": "10"})
+
+        download_file("http://x/file.bin", dest, sha256=hashlib.sha256(b"fresh data").hexdigest(), session=session)
+
+        assert dest.read_bytes() == b"fresh data"
+
+    def test_checksum_mismatch_discards_download(self, tmp_path):
+        """Test that a failed verification leaves no file behind."""
+        from plex_client.resumable_download import DownloadError, download_file
+
+        dest = tmp_path / "file.bin"
+        session = MagicMock()
+        session.get.return_value = _response(200, b"corrupt", {"Content-Length": "7"})
+
+        with pytest.raises(DownloadError):
+            download_file("http://x/file.bin", dest, sha256="0" * 64, session=session)
+
+        assert not dest.exists()
+        assert not (tmp_path / "file.bin.part").exists()
+
+    def test_interrupted_stream_is_retried_with_resume(self, tmp_path, monkeypatch):
+        """Test that a short read keeps the partial data and resumes it."""
+        from plex_client import resumable_download
+
+        monkeypatch.setattr(resumable_download.time, "sleep", MagicMock())
+        dest = tmp_path / "file.bin"
+        session = MagicMock()
+        session.get.side_effect = [
+            _response(200, b"abc", {"Content-Length": "6", "ETag": '"v1"'}),
+            _response(206, b"def", {"Content-Range": "bytes 3-5/6"}),
+        ]
+
+        resumable_download.download_file("http://x/file.bin", dest, session=session)
+
+        assert dest.read_bytes() == b"abcdef"
+        second_headers = session.get.call_args_list[1][1]["headers"]
+        assert second_headers["Range"] == "bytes=3-"
+        assert second_headers["If-Range"] == '"v1"'
+
+    def test_client_error_fails_without_retry(self, tmp_path, monkeypatch):
+        """Test that a 4xx reply raises at once instead of backing off and retrying."""
+        import requests
+        from plex_client import resumable_download
+
+        sleep = MagicMock()
+        monkeypatch.setattr(resumable_download.time, "sleep", sleep)
+        resp = _response(404, b"")
+        resp.raise_for_status.side_effect = requests.HTTPError("404", response=resp)
+        session = MagicMock()
+        session.get.return_value = resp
+
+        with pytest.raises(resumable_download.DownloadError):
+            resumable_download.download_file("http://x/file.bin", tmp_path / "file.bin", session=session)
+
+        assert session.get.call_count == 1
+        sleep.assert_not_called()
+
+    def test_server_error_is_retried(self, tmp_path, monkeypatch):
+        """Test that a 5xx reply is treated as transient."""
+        import requests
+        from plex_client import resumable_download
+
+        monkeypatch.setattr(resumable_download.time, "sleep", MagicMock())
+        failed = _response(503, b"")
+        failed.raise_for_status.side_effect = requests.HTTPError("503", response=failed)
+        session = MagicMock()
+        session.get.side_effect = [failed, _response(200, b"data", {"Content-Length": "4"})]
+
+        resumable_download.download_file("http://x/file.bin", tmp_path / "file.bin", session=session)
+
+        assert (tmp_path / "file.bin").read_bytes() == b"data"
+
+
+class TestExtractZip:
+    """Test atomic archive extraction."""
+
+    def test_extracts_and_replaces_target(self, tmp_path):
+        """Test that extraction swaps in a complete directory."""
+        from plex_client.resumable_download import extract_zip
+
+        archive = tmp_path / "a.zip"
+        with zipfile.ZipFile(archive, "w") as handle:
+            handle.writestr("app/file.txt", "data")
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "old.txt").write_text("old")
+
+        extract_zip(archive, target)
+
+        assert (target / "app" / "file.txt").read_text() == "data"
+        assert not (target / "old.txt").exists()
+
+    def test_unsafe_paths_leave_target_untouched(self, tmp_path):
+        """Test that a path-traversal archive is rejected before anything is replaced."""
+        from plex_client.resumable_download import DownloadError, extract_zip
+
+        archive = tmp_path / "bad.zip"
+        with zipfile.ZipFile(archive, "w") as handle:
+            handle.writestr("../escape.txt", "nope")
+        target = tmp_path / "target"
+        target.mkdir()
+        (target / "keep.txt").write_text("keep")
+
+        with pytest.raises(DownloadError):
+            extract_zip(archive, target)
+
+        assert (target / "keep.txt").exists()
+        assert not (tmp_path / "escape.txt").exists()
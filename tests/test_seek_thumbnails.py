@@ -0,0 +1,114 @@
+"""Tests for BIF seek thumbnail indexes."""
+from __future__ import annotations
+
+import struct
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+def _write_bif(path, frames, interval=1000):
+    header = bytearray(64)
+    header[:8] = b"\x89BIF\r\n\x1a\n"
+    struct.pack_into("<III", header, 8, 0, len(frames), interval)
+    offset = 64 + 8 * (len(frames) + 1)
+    table = bytearray()
+    for index, frame in enumerate(frames):
+        table += struct.pack("<II", index * 10, offset)
+        offset += len(frame)
+    table += struct.pack("<II", 0xFFFFFFFF, offset)
+    path.write_bytes(bytes(header) + bytes(table) + b"".join(frames))
+
+
+class TestBifIndex:
+    """Test parsing and frame lookup."""
+
+    def test_frame_at_picks_preceding_frame(self, tmp_path):
+        """Test that a position maps to the last frame at or before it."""
+        from plex_client.seek_thumbnails import BifIndex
+
+        path = tmp_path / "index.bif"
+        _write_bif(path, [b"frame0", b"frame1", b"frame2"])
+        index = BifIndex(path)
+        try:
+            assert len(index) == 3
+            assert index.frame_at(0) == b"frame0"
+            assert index.frame_at(15000) == b"frame1"
+            assert index.frame_at(999999) == b"frame2"
+        finally:
+            index.close()
+
+    def test_rejects_non_bif(self, tmp_path):
+        """Test that other files raise BifError."""
+        from plex_client.seek_thumbnails import BifError, BifIndex
+
+        path = tmp_path / "bad.bif"
+        path.write_bytes(b"x" * 80)
+        with pytest.raises(BifError):
+            BifIndex(path)
+
+    def test_load_bif_uses_cached_file(self, tmp_path):
+        """Test that an index already on disk is not downloaded again."""
+        from plex_client.seek_thumbnails import load_bif
+
+        path = tmp_path / "cached.bif"
+        _write_bif(path, [b"a"])
+        with patch("plex_client.seek_thumbnails.download_file") as download:
+            index = load_bif("http://server/library/parts/1/indexes/sd", path)
+        download.assert_not_called()
+        assert index is not None
+        index.close()
+
+    def test_prune_drops_least_recently_used(self, tmp_path):
+        """Test that the sweep removes old and least recently used indexes but keeps the current one."""
+        import os
+        import time
+
+        from plex_client.seek_thumbnails import prune_bif_cache
+
+        now = time.time()
+        paths = {}
+        for name, age in (("expired", 90 * 86400), ("oldest", 300), ("older", 200), ("current", 400), ("newest", 0)):
+            paths[name] = tmp_path / f"{name}.bif"
+            paths[name].write_bytes(b"x" * 100)
+            os.utime(paths[name], (now - age, now - age))
+
+        prune_bif_cache(tmp_path, keep=paths["current"], max_bytes=250)
+
+        assert sorted(path.stem for path in tmp_path.glob("*.bif")) == ["current", "newest"]
+
+    def test_cache_path_ignores_token(self, tmp_path):
+        """Test that the cache file name does not depend on the token."""
+        from plex_client.seek_thumbnails import bif_cache_path
+
+        first = bif_cache_path(tmp_path, "http://s/library/parts/1/indexes/sd?X-Plex-Token=a")
+        second = bif_cache_path(tmp_path, "http://s/library/parts/1/indexes/sd?X-Plex-Token=b")
+        assert first == second
+
+
+class TestSeekIndexUrl:
+    """Test PlexService discovery of preview thumbnail indexes."""
+
+    def test_url_for_part_with_sd_index(self, plex_service):
+        """Test that parts advertising an sd index get a BIF URL."""
+        plex_service._server.url = MagicMock(side_effect=lambda key: f"http://server{key}")
+        part = MagicMock()
+        part.id = 77
+        part.indexes = "sd"
+        node = MagicMock()
+        node.media = [MagicMock(parts=[part])]
+
+        url = plex_service._seek_index_url(node)
+
+        assert url.startswith("http://server/library/parts/77/indexes/sd")
+        assert "X-Plex-Token=test_token" in url
+
+    def test_no_url_without_index(self, plex_service):
+        """Test that parts without generated thumbnails get no URL."""
+        part = MagicMock()
+        part.id = 77
+        part.indexes = ""
+        node = MagicMock()
+        node.media = [MagicMock(parts=[part])]
+
+        assert plex_service._seek_index_url(node) is None
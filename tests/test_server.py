@@ -227,3 +227,36 @@ class TestBandwidth:
         
         assert len(stats) == 1
         mock_server.bandwidth.assert_called_once()
+
+
+class TestConnectivity:
+    """Test the lightweight reachability helpers."""
+
+    def test_ping_queries_identity(self, plex_service, mock_server):
+        """Test that a ping is a single identity request."""
+        mock_server.query = MagicMock()
+
+        plex_service.ping_server()
+
+        mock_server.query.assert_called_once()
+        assert mock_server.query.call_args[0][0] == "/identity"
+
+    def test_alert_error_allows_restart(self, plex_service):
+        """Test that a failed alert listener is forgotten so it can be started again."""
+        plex_service._alert_listener = MagicMock()
+
+        plex_service._handle_alert_error(ConnectionError("closed"))
+
+        assert plex_service._alert_listener is None
+
+    def test_dead_listener_is_restarted(self, plex_service, mock_server):
+        """Test that a listener whose thread already exited is replaced."""
+        dead = MagicMock()
+        dead.is_alive.return_value = False
+        plex_service._alert_listener = dead
+        fresh = MagicMock()
+        mock_server.startAlertListener = MagicMock(return_value=fresh)
+
+        plex_service.ensure_alert_listener()
+
+        assert plex_service._alert_listener is fresh
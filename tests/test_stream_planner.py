@@ -0,0 +1,172 @@
+"""Tests for bandwidth-aware stream planning."""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+from unittest.mock import MagicMock
+
+
+def _decision_xml(part_decision, direct_play_code=3000):
+    return ET.fromstring(
+        f'<MediaContainer generalDecisionCode="1001" generalDecisionText="Bitrate too high" '
+        f'directPlayDecisionCode="{direct_play_code}">'
+        f'<Video><Media><Part decision="{part_decision}"/></Media></Video></MediaContainer>'
+    )
+
+
+class TestStreamPlanner:
+    """Test the playback planner decisions."""
+
+    def test_unknown_throughput_measures_and_direct_plays(self):
+        """Test that the first play keeps direct play and samples the link."""
+        from plex_client.stream_planner import DIRECT_PLAY, StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.measure_async = MagicMock()
+
+        plan = planner.plan(MagicMock(), "srv", "/library/metadata/1", audio=False, media_bitrate=20000, sample_url="http://x/part")
+
+        assert plan.decision == DIRECT_PLAY
+        planner.meter.measure_async.assert_called_once_with("srv", "http://x/part")
+
+    def test_preview_plan_does_not_sample(self):
+        """Test that a plan made with decide=False never starts a throughput sample."""
+        from plex_client.stream_planner import StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.measure_async = MagicMock()
+
+        planner.plan(
+            MagicMock(), "srv", "/library/metadata/1", audio=False, media_bitrate=20000,
+            sample_url="http://x/part", decide=False,
+        )
+
+        planner.meter.measure_async.assert_not_called()
+
+    def test_fast_link_keeps_direct_play(self):
+        """Test that a link with headroom does not consult the transcoder."""
+        from plex_client.stream_planner import DIRECT_PLAY, StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.record("srv", 50000)
+        server = MagicMock()
+
+        plan = planner.plan(server, "srv", "/library/metadata/1", audio=False, media_bitrate=20000)
+
+        assert plan.decision == DIRECT_PLAY
+        server.query.assert_not_called()
+
+    def test_slow_link_asks_for_capped_transcode(self):
+        """Test that a slow link picks a ladder bitrate and asks the decision endpoint."""
+        from plex_client.stream_planner import TRANSCODE, StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.record("srv", 5000)
+        server = MagicMock()
+        server.query.return_value = _decision_xml("transcode")
+
+        plan = planner.plan(server, "srv", "/library/metadata/1", audio=False, media_bitrate=20000)
+
+        assert plan.decision == TRANSCODE
+        assert (plan.max_bitrate, plan.resolution) == (3000, "1280x720")
+        endpoint = server.query.call_args[0][0]
+        assert endpoint == "/video/:/transcode/universal/decision"
+        assert server.query.call_args[1]["params"]["maxVideoBitrate"] == 3000
+
+    def test_copy_decision_means_direct_stream(self):
+        """Test that a copy decision ranks the remuxed stream first."""
+        from plex_client.stream_planner import DIRECT_STREAM, StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.record("srv", 5000)
+        server = MagicMock()
+        server.query.return_value = _decision_xml("copy")
+
+        plan = planner.plan(server, "srv", "/library/metadata/1", audio=False, media_bitrate=20000)
+
+        assert plan.decision == DIRECT_STREAM
+
+    def test_deferred_plan_skips_decision_call(self):
+        """Test that listing paths get a capped plan without asking the server."""
+        from plex_client.stream_planner import TRANSCODE, StreamPlanner
+
+        planner = StreamPlanner()
+        planner.meter.record("srv", 5000)
+        server = MagicMock()
+
+        plan = planner.plan(server, "srv", "/library/metadata/1", audio=False, media_bitrate=20000, decide=False)
+
+        assert plan.decision == TRANSCODE
+        assert plan.deferred
+        server.query.assert_not_called()
+
+    def test_measure_times_from_first_body_byte(self):
+        """Test that the wait for the first byte is not counted as transfer time."""
+        from unittest.mock import patch
+
+        from plex_client.stream_planner import ThroughputMeter
+
+        chunk = b"x" * (64 * 1024)
+        response = MagicMock(status_code=206)
+        response.iter_content.return_value = [chunk] * 5
+        session = MagicMock()
+        session.get.return_value = response
+        # First byte arrives at t=10 after a slow handshake; the next four chunks take one second.
+        clock = iter([10.0, 10.25, 10.5, 10.75, 11.0])
+        meter = ThroughputMeter(sample_bytes=4 * len(chunk))
+
+        with patch("plex_client.stream_planner.shared_session", return_value=session), patch(
+            "plex_client.stream_planner.time.perf_counter", side_effect=lambda: next(clock)
+        ):
+            kbps = meter.measure("srv", "http://x/part")
+
+        assert kbps == int(4 * len(chunk) * 8 / 1000)
+        assert meter.estimate("srv") == kbps
+
+
+class TestRankedCandidates:
+    """Test ranked candidate lists from PlexService."""
+
+    def _movie(self):
+        part = MagicMock()
+        part.key = "/library/parts/9/file.mkv"
+        media = MagicMock()
+        media.parts = [part]
+        media.bitrate = 20000
+        movie = MagicMock()
+        movie.type = "movie"
+        movie.title = "Film"
+        movie.key = "/library/metadata/9"
+        movie.ratingKey = "9"
+        movie.viewOffset = 0
+        movie.media = [media]
+        movie.getStreamURL = MagicMock(
+            side_effect=lambda **kw: "http://localhost:32400/video/:/transcode/universal/start.m3u8?"
+            + ("maxVideoBitrate=%s" % kw["maxVideoBitrate"] if "maxVideoBitrate" in kw else "offset=0")
+        )
+        return movie
+
+    def test_slow_link_ranks_transcode_first(self, plex_service, mock_server):
+        """Test that a capped transcode outranks the original file on a slow link."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        mock_server.query.return_value = _decision_xml("transcode")
+        plex_service._stream_planner.meter.record("server123", 4000)
+
+        media = plex_service.to_playable(self._movie())
+
+        assert "maxVideoBitrate=2000" in media.stream_url
+        assert media.candidates[-1].startswith("http://localhost:32400/library/parts/9/")
+        assert len(media.candidates) == 3
+
+    def test_provisional_plan_is_replaced_once_measured(self, plex_service, mock_server):
+        """Test that a plan made before measuring is redone when throughput arrives."""
+        mock_server.url = MagicMock(side_effect=lambda path: f"http://localhost:32400{path}")
+        mock_server.query.return_value = _decision_xml("transcode")
+        movie = self._movie()
+
+        first = plex_service.to_playable(movie)
+        plex_service._stream_planner.meter.record("server123", 4000)
+        second = plex_service.to_playable(movie)
+
+        assert "/library/parts/" in first.stream_url
+        assert "maxVideoBitrate" in second.stream_url
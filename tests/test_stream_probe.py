@@ -0,0 +1,69 @@
+"""Tests for concurrent stream probing."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+def _response(status, length=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = {"Content-Length": length} if length else {}
+    return resp
+
+
+class TestProbeStream:
+    """Test single-URL probing."""
+
+    def test_ranged_request_through_shared_session(self):
+        """Test that probes ask for the first bytes over the pooled session."""
+        from plex_client import stream_probe
+
+        session = MagicMock()
+        session.get.return_value = _response(206, "1024")
+        with patch.object(stream_probe, "shared_session", return_value=session):
+            assert stream_probe.probe_stream("http://server/part.mkv") is True
+
+        _, kwargs = session.get.call_args
+        assert kwargs["headers"]["Range"] == "bytes=0-1023"
+        assert kwargs["stream"] is True
+
+    def test_error_status_fails(self):
+        """Test that a non-success status fails the probe."""
+        from plex_client import stream_probe
+
+        session = MagicMock()
+        session.get.return_value = _response(404)
+        with patch.object(stream_probe, "shared_session", return_value=session):
+            assert stream_probe.probe_stream("http://server/part.mkv") is False
+
+    def test_shared_session_is_reused(self):
+        """Test that the keep-alive session is created once."""
+        from plex_client import stream_probe
+
+        assert stream_probe.shared_session() is stream_probe.shared_session()
+
+
+class TestProbeInOrder:
+    """Test concurrent probing with ranked results."""
+
+    def test_results_follow_rank_order(self):
+        """Test that a slow best candidate is still reported first."""
+        from plex_client import stream_probe
+
+        release = threading.Event()
+
+        def fake_probe(url, timeout):
+            if url == "direct":
+                release.wait(1)
+                return False
+            release.set()
+            return True
+
+        with patch.object(stream_probe, "probe_stream", side_effect=fake_probe):
+            results = list(stream_probe.probe_in_order(["direct", "hls"]))
+
+        assert results == [("direct", False), ("hls", True)]
+        assert release.is_set()
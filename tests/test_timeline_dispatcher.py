@@ -0,0 +1,98 @@
+"""Tests for the coalescing timeline dispatcher."""
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TestTimelineDispatcher:
+    """Test merging, ordering and shutdown flushing of timeline updates."""
+
+    def test_latest_update_per_item_wins(self):
+        """Test that queued updates for the same item collapse into the newest one."""
+        from plex_client.timeline_dispatcher import TimelineDispatcher
+
+        dispatcher = TimelineDispatcher()
+        gate = threading.Event()
+        sent = []
+        dispatcher.submit("blocker", lambda: gate.wait(5))
+        dispatcher.submit("1", lambda: sent.append("paused"))
+        dispatcher.submit("1", lambda: sent.append("playing"))
+        dispatcher.submit("2", lambda: sent.append("other"))
+        gate.set()
+
+        assert dispatcher.flush(5.0)
+        assert sent == ["playing", "other"]
+        assert dispatcher.merged == 1
+
+    def test_flush_waits_for_worker_to_drain(self):
+        """Test that flush returns once the worker has sent everything queued."""
+        from plex_client.timeline_dispatcher import TimelineDispatcher
+
+        dispatcher = TimelineDispatcher()
+        gate = threading.Event()
+        sent = []
+        dispatcher.submit("slow", lambda: gate.wait(5))
+        dispatcher.submit("a", lambda: sent.append(threading.current_thread().name))
+        threading.Timer(0.05, gate.set).start()
+
+        assert dispatcher.flush(5.0)
+        assert sent == ["PlexTimelineDispatch"]
+        assert dispatcher.pending() == 0
+
+    def test_flush_respects_deadline(self):
+        """Test that flush gives up when an update is still running at the deadline."""
+        from plex_client.timeline_dispatcher import TimelineDispatcher
+
+        dispatcher = TimelineDispatcher()
+        gate = threading.Event()
+        dispatcher.submit("stuck", lambda: gate.wait(5))
+
+        started = time.monotonic()
+        assert not dispatcher.flush(0.1)
+        assert time.monotonic() - started < 1.0
+        gate.set()
+
+    def test_run_now_replaces_queued_update(self):
+        """Test that a synchronous update drops the queued one for the same item."""
+        from plex_client.timeline_dispatcher import TimelineDispatcher
+
+        dispatcher = TimelineDispatcher()
+        gate = threading.Event()
+        sent = []
+        dispatcher.submit("blocker", lambda: gate.wait(5))
+        dispatcher.submit("1", lambda: sent.append("queued"))
+
+        assert dispatcher.run_now("1", lambda: sent.append("stopped"))
+        gate.set()
+        dispatcher.flush(5.0)
+
+        assert sent == ["stopped"]
+
+    def test_run_now_queues_behind_in_flight_update(self):
+        """Test that a timed-out synchronous update is queued rather than run concurrently."""
+        from plex_client.timeline_dispatcher import TimelineDispatcher
+
+        dispatcher = TimelineDispatcher()
+        started = threading.Event()
+        gate = threading.Event()
+        running = []
+        overlap = []
+
+        def slow():
+            running.append("slow")
+            started.set()
+            gate.wait(5)
+            running.remove("slow")
+
+        def stop():
+            overlap.append(list(running))
+
+        dispatcher.submit("1", slow)
+        assert started.wait(5)
+
+        assert not dispatcher.run_now("1", stop, timeout=0.05)
+        assert overlap == []
+        gate.set()
+        assert dispatcher.flush(5.0)
+        assert overlap == [[]]